@@ -45,6 +45,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'rentals.middleware.PerformanceMiddleware',  # outermost, so it times the whole stack
     'corsheaders.middleware.CorsMiddleware',  # CORS middleware added at the top
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -61,6 +62,8 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],  # Updated to include templates directory
+        # Django wraps these loaders in the cached loader (also in DEBUG, where it reloads
+        # changed files); rentals/template_warmup.py fills it at worker start
         'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
@@ -73,6 +76,10 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'config.wsgi.application'
+ASGI_APPLICATION = 'config.asgi.application'
+
+# 'wsgi' (gthread workers) or 'asgi' (uvicorn workers + async payment views); read by gunicorn.conf.py too
+SERVER_MODE = env('SERVER_MODE', default='wsgi')
 
 # Database
 # Uses DATABASE_URL environment variable or defaults to SQLite
@@ -80,6 +87,84 @@ DATABASES = {
     'default': env.db('DATABASE_URL', default=f"sqlite:///{BASE_DIR / 'db.sqlite3'}")
 }
 
+# SQLite has no row locks: take the write lock when a transaction starts so
+# concurrent booking transactions queue instead of failing with "database is locked"
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DATABASES['default'].setdefault('OPTIONS', {}).setdefault('transaction_mode', 'IMMEDIATE')
+
+# Connection reuse. DB_POOL=True uses the psycopg 3 connection pool (PostgreSQL only,
+# sized per worker process); otherwise each worker keeps its connection open for
+# DB_CONN_MAX_AGE seconds (0 = reconnect every request) and checks it before reuse.
+# Under ASGI each request's sync work can land on a different thread, so persistent
+# connections are off by default there; use the pool instead.
+DB_POOL = env.bool('DB_POOL', default=False)
+if DB_POOL and DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+        'min_size': env.int('DB_POOL_MIN_SIZE', default=2),
+        'max_size': env.int('DB_POOL_MAX_SIZE', default=10),
+        'timeout': env.int('DB_POOL_TIMEOUT', default=10),
+    }
+    DATABASES['default']['CONN_MAX_AGE'] = 0  # the pool owns connection lifetime
+else:
+    DATABASES['default']['CONN_MAX_AGE'] = env.int('DB_CONN_MAX_AGE', default=0 if SERVER_MODE == 'asgi' else 60)
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = env.bool('DB_CONN_HEALTH_CHECKS', default=True)
+
+# Cache (CACHE_URL, e.g. redis://..., defaults to in-process locmem)
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
+# Vehicle catalog API response cache (invalidated by Vehicle/VehicleImage signals)
+CATALOG_CACHE_ALIAS = env('CATALOG_CACHE_ALIAS', default='default')
+CATALOG_CACHE_TIMEOUT = env.int('CATALOG_CACHE_TIMEOUT', default=300)
+# Cache-Control max-age for clients; 0 means "revalidate with If-None-Match every time"
+CATALOG_HTTP_MAX_AGE = env.int('CATALOG_HTTP_MAX_AGE', default=0)
+
+# Whole-response cache for the frontend shell pages (rentals/frontend_views.py). They hold no
+# per-user data; the prefix changes with each Render deploy so a shared cache never serves old markup
+FRONTEND_CACHE_ALIAS = env('FRONTEND_CACHE_ALIAS', default='default')
+FRONTEND_CACHE_TIMEOUT = env.int('FRONTEND_CACHE_TIMEOUT', default=300)
+FRONTEND_CACHE_KEY_PREFIX = 'frontend:' + env('RENDER_GIT_COMMIT', default='')[:12]
+
+# Pricing rules applied on top of the hourly/daily base price (see rentals/pricing.py);
+# both multipliers default to neutral
+PRICING_RULES = env.list('PRICING_RULES', default=['rentals.pricing.weekend_rule', 'rentals.pricing.surge_rule'])
+PRICING_WEEKEND_MULTIPLIER = env('PRICING_WEEKEND_MULTIPLIER', default='1.00')
+# per vehicle type, e.g. PRICING_SURGE_MULTIPLIERS=bike=1.2,car=1.1
+PRICING_SURGE_MULTIPLIERS = env.dict('PRICING_SURGE_MULTIPLIERS', default={})
+
+# Per vehicle-day busy intervals behind /api/vehicles/{id}/calendar/ (invalidated on booking changes);
+# one entry per vehicle per day, so the locmem default (300 entries) needs ?MAX_ENTRIES= raised or redis
+CALENDAR_CACHE_ALIAS = env('CALENDAR_CACHE_ALIAS', default='default')
+CALENDAR_CACHE_TIMEOUT = env.int('CALENDAR_CACHE_TIMEOUT', default=3600)
+
+# JWT-authenticated users are resolved from this cache (invalidated on User save/delete);
+# with the locmem default other workers may serve a stale user for up to the timeout
+AUTH_USER_CACHE_ALIAS = env('AUTH_USER_CACHE_ALIAS', default='default')
+AUTH_USER_CACHE_TIMEOUT = env.int('AUTH_USER_CACHE_TIMEOUT', default=60)
+
+# Unpaid (PENDING) bookings stop holding the vehicle after this many minutes;
+# released by `manage.py expire_pending_bookings`
+BOOKING_PENDING_HOLD_MINUTES = env.int('BOOKING_PENDING_HOLD_MINUTES', default=30)
+
+# Bearer token required to scrape /metrics; without one the endpoint only answers when DEBUG is on
+METRICS_TOKEN = env('METRICS_TOKEN', default='')
+
+# Structured (one JSON object per line) logs on stdout
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'rentals.logging_utils.JsonFormatter'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'json'},
+    },
+    'loggers': {
+        'rentals': {'handlers': ['console'], 'level': env('LOG_LEVEL', default='INFO'), 'propagate': False},
+    },
+}
+
 # Custom user model
 AUTH_USER_MODEL = 'rentals.User'
 
@@ -112,17 +197,34 @@ STATIC_URL = '/static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# collectstatic writes content-hashed names plus .gz copies; rentals.media_views serves both
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'rentals.storage.CompressedManifestStaticFilesStorage'},
+}
+
+# Media is served by rentals.media_views after the permission check. Behind nginx set
+# MEDIA_OFFLOAD=x-accel-redirect (with an `internal` location at MEDIA_ACCEL_REDIRECT_PREFIX
+# aliased to MEDIA_ROOT), behind Apache/lighttpd x-sendfile; empty streams from Django.
+MEDIA_OFFLOAD = env('MEDIA_OFFLOAD', default='')
+MEDIA_ACCEL_REDIRECT_PREFIX = env('MEDIA_ACCEL_REDIRECT_PREFIX', default='/protected-media/')
+# media sub-directories only their owner (or staff) may download
+MEDIA_PRIVATE_PREFIXES = ('licenses/',)
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Django REST Framework configuration with JWT Authentication
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'rentals.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
-    )
+    ),
+    # keyset pagination; ?limit= is capped by the pagination class
+    'DEFAULT_PAGINATION_CLASS': 'rentals.pagination.CreatedAtCursorPagination',
+    'PAGE_SIZE': env.int('API_PAGE_SIZE', default=20),
 }
 
 # CORS settings for development - allow these origins
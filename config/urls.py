@@ -15,10 +15,10 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django.conf import settings
-from django.conf.urls.static import static
+from rentals.media_views import serve_media, serve_static
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -31,5 +31,12 @@ urlpatterns = [
     path('', include('rentals.urls')),   # ✅ frontend gets /login/, /register/, etc.
 ]
 
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+# media always goes through the view: license documents need the permission check
+urlpatterns += [
+    re_path(r'^%s(?P<path>.+)$' % settings.MEDIA_URL.lstrip('/'), serve_media, name='media'),
+]
+if not settings.DEBUG:
+    # in DEBUG runserver's staticfiles handler serves the app directories directly
+    urlpatterns += [
+        re_path(r'^%s(?P<path>.+)$' % settings.STATIC_URL.lstrip('/'), serve_static, name='static'),
+    ]
@@ -0,0 +1,41 @@
+# gunicorn.conf.py
+# Sizing and worker class for `gunicorn -c gunicorn.conf.py`; every value can be
+# overridden from the environment. SERVER_MODE must match the Django setting.
+import multiprocessing
+import os
+
+server_mode = os.environ.get('SERVER_MODE', 'wsgi')
+cpus = multiprocessing.cpu_count()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+if server_mode == 'asgi':
+    # one event loop per core; concurrency comes from async views, not threads
+    wsgi_app = 'config.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+    workers = int(os.environ.get('WEB_CONCURRENCY', cpus))
+else:
+    # threads keep a worker responsive while one request waits on Stripe/SMTP/the DB
+    wsgi_app = 'config.wsgi:application'
+    worker_class = 'gthread'
+    workers = int(os.environ.get('WEB_CONCURRENCY', cpus * 2 + 1))
+    threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# recycle workers now and then to cap slow memory growth; jitter avoids restarting all at once
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+# request logs come from rentals.middleware as JSON; gunicorn only reports its own errors
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def post_worker_init(worker):
+    # the cached template loader is per process: fill it before the worker takes traffic
+    from rentals.template_warmup import warm_templates
+    compiled, failed = warm_templates()
+    worker.log.info("compiled %d template(s), %d failed", compiled, failed)
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, Vehicle, VehicleImage, Booking, Payment
+from .models import User, Vehicle, VehicleImage, Booking, Payment, EmailOutbox
 
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
@@ -9,6 +9,9 @@ class UserAdmin(BaseUserAdmin):
 class VehicleImageInline(admin.TabularInline):
     model = VehicleImage
     extra = 1
+    # give a source URL or upload a file; `manage.py ingest_vehicle_images` renders the variants
+    fields = ('image', 'file', 'width', 'height')
+    readonly_fields = ('width', 'height')
 
 @admin.register(Vehicle)
 class VehicleAdmin(admin.ModelAdmin):
@@ -31,4 +34,8 @@ class PaymentAdmin(admin.ModelAdmin):
         'stripe_payment_intent',
         'created_at',
     )
-    
\ No newline at end of file
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'attempts', 'next_attempt_at', 'sent_at', 'created_at')
+    list_filter = ['status']
@@ -0,0 +1,256 @@
+# rentals/analytics.py
+"""
+Fleet utilization and revenue, computed by the database in one grouped query
+per report. Utilization counts only the part of each booking that falls inside
+the requested range, so long bookings crossing the range edges are clipped.
+
+For long ranges, dashboards read the BookingDailyStats rollup instead
+(daily_report), which `manage.py rollup_stats` keeps current.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import (
+    Count, DateTimeField, DecimalField, DurationField, ExpressionWrapper, F, FloatField, Q, Sum, Value, Window,
+)
+from django.db.models.functions import Cast, Coalesce, Greatest, Least, NullIf, Rank
+from django.utils import timezone
+
+from .models import Booking, BookingDailyStats, BookingTombstone, RollupWatermark, Vehicle
+
+# bookings that actually took the vehicle off the market
+BUSY_STATUSES = ('CONFIRMED', 'ONGOING', 'COMPLETED')
+
+VEHICLE_ORDERINGS = {
+    'revenue': 'revenue',
+    'utilization': 'booked',
+    'bookings': 'booking_count',
+    'cancellation_rate': 'cancellation_rate',
+}
+
+
+def _aggregates(start, end):
+    in_range = Q(bookings__start_time__lt=end, bookings__end_time__gt=start)
+    clipped = ExpressionWrapper(
+        Least('bookings__end_time', Value(end, output_field=DateTimeField()))
+        - Greatest('bookings__start_time', Value(start, output_field=DateTimeField())),
+        output_field=DurationField(),
+    )
+    money = DecimalField(max_digits=14, decimal_places=2)
+    zero = Value(Decimal('0.00'), output_field=money)
+    return {
+        'booking_count': Count('bookings', filter=in_range),
+        'cancelled_count': Count('bookings', filter=in_range & Q(bookings__status='CANCELLED')),
+        'late_cancel_count': Count('bookings', filter=in_range & Q(bookings__payment__penalty_amount__gt=0)),
+        'booked': Sum(clipped, filter=in_range & Q(bookings__status__in=BUSY_STATUSES)),
+        # paid bookings, plus what was kept from refunded late cancellations
+        'paid': Coalesce(Sum('bookings__payment__amount', filter=in_range & Q(bookings__payment__status='SUCCESS')),
+                         zero, output_field=money),
+        'penalties': Coalesce(Sum('bookings__payment__penalty_amount', filter=in_range), zero, output_field=money),
+    }
+
+
+def _with_rates(queryset):
+    return queryset.annotate(
+        revenue=F('paid') + F('penalties'),
+        cancellation_rate=Cast('cancelled_count', FloatField()) / NullIf(Cast('booking_count', FloatField()), 0.0),
+    )
+
+
+def _row(values, capacity_seconds):
+    booked = values.pop('booked')
+    booked_seconds = booked.total_seconds() if booked else 0.0
+    values.pop('paid')
+    values['booked_hours'] = round(booked_seconds / 3600, 2)
+    values['utilization_pct'] = round(100 * booked_seconds / capacity_seconds, 2) if capacity_seconds else 0.0
+    values['cancellation_rate'] = round(values['cancellation_rate'] or 0.0, 4)
+    return values
+
+
+def vehicle_report(start, end, vehicle_type=None, order_by='-revenue', limit=100):
+    """Per-vehicle rows, ranked by revenue within their vehicle type."""
+    queryset = Vehicle.objects.all()
+    if vehicle_type:
+        queryset = queryset.filter(vehicle_type=vehicle_type)
+    queryset = _with_rates(queryset.annotate(**_aggregates(start, end))).annotate(
+        revenue_rank_in_type=Window(Rank(), partition_by=F('vehicle_type'), order_by=F('revenue').desc()),
+    )
+    field = F(VEHICLE_ORDERINGS[order_by.lstrip('-')])
+    queryset = queryset.order_by(field.desc(nulls_last=True) if order_by.startswith('-') else field.asc(nulls_first=True), 'id')
+
+    capacity = (end - start).total_seconds()
+    rows = queryset.values(
+        'id', 'brand', 'model_name', 'vehicle_type', 'booking_count', 'cancelled_count', 'late_cancel_count',
+        'booked', 'paid', 'penalties', 'revenue', 'cancellation_rate', 'revenue_rank_in_type',
+    )[:limit]
+    return [_row(dict(values), capacity) for values in rows]
+
+
+def type_report(start, end):
+    """One row per vehicle type; utilization is against the whole fleet of that type."""
+    queryset = _with_rates(
+        Vehicle.objects.values('vehicle_type')
+        .annotate(vehicles=Count('id', distinct=True), **_aggregates(start, end))
+    ).order_by('vehicle_type')
+
+    seconds = (end - start).total_seconds()
+    return [
+        _row(dict(values), seconds * values['vehicles'])
+        for values in queryset.values(
+            'vehicle_type', 'vehicles', 'booking_count', 'cancelled_count', 'late_cancel_count',
+            'booked', 'paid', 'penalties', 'revenue', 'cancellation_rate',
+        )
+    ]
+
+
+# -------------------------
+# Daily rollup
+# -------------------------
+ROLLUP_NAME = 'booking_daily_stats'
+# a transaction that commits late can carry an updated_at older than the last
+# run; re-reading this far back is safe because touched days are recomputed whole
+ROLLUP_OVERLAP = timedelta(minutes=5)
+# vehicles per recompute query; each adds an OR branch (SQLite caps expression depth at 1000)
+ROLLUP_VEHICLES_PER_QUERY = 200
+ROLLUP_FIELDS = ('vehicle_id', 'start_time', 'end_time', 'status',
+                 'payment__status', 'payment__amount', 'payment__penalty_amount')
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _day_slices(start, end):
+    """(local date, seconds) for every calendar day the window [start, end) covers."""
+    current, end = timezone.localtime(start), timezone.localtime(end)
+    while current < end:
+        slice_end = min(end, _day_start(current.date() + timedelta(days=1)))
+        yield current.date(), (slice_end - current).total_seconds()
+        current = slice_end
+
+
+def _accumulate(totals, row, days=None):
+    """Add one booking to totals[(vehicle_id, day)] = [bookings, cancellations, seconds, revenue]."""
+    vehicle_id, start, end, status, payment_status, amount, penalty = row
+    start_day = timezone.localdate(start)
+    if days is None or start_day in days:
+        total = totals[(vehicle_id, start_day)]
+        total[0] += 1
+        if status == 'CANCELLED':
+            total[1] += 1
+        if payment_status == 'SUCCESS':
+            total[3] += amount
+        total[3] += penalty or 0
+    if status in BUSY_STATUSES:
+        for day, seconds in _day_slices(start, end):
+            if days is None or day in days:
+                totals[(vehicle_id, day)][2] += seconds
+
+
+def _new_totals():
+    return defaultdict(lambda: [0, 0, 0.0, Decimal('0.00')])
+
+
+def _stats_rows(totals):
+    return [
+        BookingDailyStats(vehicle_id=vehicle_id, day=day, bookings=bookings, cancellations=cancellations,
+                          booked_hours=Decimal(seconds / 3600).quantize(Decimal('0.01')), revenue=revenue)
+        for (vehicle_id, day), (bookings, cancellations, seconds, revenue) in totals.items()
+    ]
+
+
+def _full_rollup(chunk_size):
+    BookingDailyStats.objects.all().delete()
+    totals, written, scanned, vehicle_id = _new_totals(), 0, 0, None
+    rows = Booking.objects.order_by('vehicle_id').values_list(*ROLLUP_FIELDS).iterator(chunk_size=chunk_size)
+    for row in rows:
+        # a vehicle's days are complete once the next vehicle starts
+        if row[0] != vehicle_id and len(totals) >= chunk_size:
+            written += len(BookingDailyStats.objects.bulk_create(_stats_rows(totals)))
+            totals = _new_totals()
+        vehicle_id = row[0]
+        _accumulate(totals, row)
+        scanned += 1
+    written += len(BookingDailyStats.objects.bulk_create(_stats_rows(totals)))
+    return scanned, written
+
+
+def _touched_days(since):
+    """
+    {vehicle_id: {local days}} for bookings (or their payments) changed since
+    `since`, and for the windows bookings have moved away from or been deleted from.
+    """
+    touched = defaultdict(set)
+    # separate index scans rather than one OR across the join
+    for changed in (Booking.objects.filter(updated_at__gte=since),
+                    Booking.objects.filter(payment__updated_at__gte=since),
+                    BookingTombstone.objects.filter(recorded_at__gte=since)):
+        for vehicle_id, start, end in changed.values_list('vehicle_id', 'start_time', 'end_time').iterator():
+            days = touched[vehicle_id]
+            days.add(timezone.localdate(start))
+            days.update(day for day, _ in _day_slices(start, end))
+    return touched
+
+
+def _incremental_rollup(since, chunk_size):
+    touched = _touched_days(since)
+    scanned = written = 0
+    vehicle_ids = sorted(touched)
+    for i in range(0, len(vehicle_ids), ROLLUP_VEHICLES_PER_QUERY):
+        chunk = {vehicle_id: touched[vehicle_id] for vehicle_id in vehicle_ids[i:i + ROLLUP_VEHICLES_PER_QUERY]}
+        window = Q()
+        stale = Q()
+        for vehicle_id, days in chunk.items():
+            window |= Q(vehicle_id=vehicle_id, start_time__lt=_day_start(max(days) + timedelta(days=1)),
+                        end_time__gt=_day_start(min(days)))
+            stale |= Q(vehicle_id=vehicle_id, day__in=days)
+
+        totals = _new_totals()
+        for row in Booking.objects.filter(window).values_list(*ROLLUP_FIELDS).iterator(chunk_size=chunk_size):
+            _accumulate(totals, row, chunk[row[0]])
+            scanned += 1
+        BookingDailyStats.objects.filter(stale).delete()
+        written += len(BookingDailyStats.objects.bulk_create(_stats_rows(totals)))
+    return scanned, written
+
+
+def rollup_daily_stats(full=False, chunk_size=2000, overlap=ROLLUP_OVERLAP):
+    """
+    Bring BookingDailyStats up to date. The first run (or full=True) rebuilds the
+    table; later runs recompute only the vehicle-days of bookings changed since the
+    previous run. Returns a summary dict.
+    """
+    started = timezone.now()
+    with transaction.atomic():
+        # the row lock keeps two runners from interleaving
+        watermark = RollupWatermark.objects.select_for_update().filter(name=ROLLUP_NAME).first()
+        if full or watermark is None:
+            mode, (scanned, written) = 'full', _full_rollup(chunk_size)
+        else:
+            mode, (scanned, written) = 'incremental', _incremental_rollup(
+                watermark.processed_until - overlap, chunk_size
+            )
+        RollupWatermark.objects.update_or_create(name=ROLLUP_NAME, defaults={'processed_until': started})
+        # the next run starts at started - overlap; older tombstones are done with
+        BookingTombstone.objects.filter(recorded_at__lt=started - overlap).delete()
+    return {'mode': mode, 'bookings_scanned': scanned, 'rows_written': written, 'processed_until': started}
+
+
+def daily_report(start_day, end_day, vehicle_type=None, vehicle_id=None):
+    """Fleet totals per day in [start_day, end_day], read from the rollup."""
+    queryset = BookingDailyStats.objects.filter(day__gte=start_day, day__lte=end_day)
+    if vehicle_type:
+        queryset = queryset.filter(vehicle__vehicle_type=vehicle_type)
+    if vehicle_id:
+        queryset = queryset.filter(vehicle_id=vehicle_id)
+    rows = queryset.values('day').annotate(
+        total_bookings=Sum('bookings'), total_cancellations=Sum('cancellations'),
+        total_hours=Sum('booked_hours'), total_revenue=Sum('revenue'),
+    ).order_by('day')
+    return [
+        {'day': row['day'], 'booking_count': row['total_bookings'], 'cancelled_count': row['total_cancellations'],
+         'booked_hours': row['total_hours'], 'revenue': row['total_revenue']}
+        for row in rows
+    ]
@@ -2,10 +2,10 @@
 from rest_framework import viewsets, generics, status, permissions
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django.contrib.auth import get_user_model
-from django.db import transaction
-import math
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 
 from .models import Vehicle, Booking, Payment
@@ -13,6 +13,8 @@ from .serializers import (
     VehicleSerializer, BookingSerializer,
     UserRegisterSerializer, UserSerializer
 )
+from .upload_handlers import StreamingLicenseUploadMixin
+from .booking_utils import calculate_total_price, has_overlap, is_overlap_violation, uses_overlap_constraint
 
 User = get_user_model()
 
@@ -20,23 +22,24 @@ User = get_user_model()
 # Vehicle endpoints
 # -------------------------
 class VehicleViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Vehicle.objects.filter(is_active=True).order_by('-created_at')
+    queryset = Vehicle.objects.filter(is_active=True).prefetch_related('images').order_by('-created_at', '-id')
     serializer_class = VehicleSerializer
     permission_classes = [AllowAny]
 
 # -------------------------
 # User registration & profile
 # -------------------------
-class RegisterView(generics.CreateAPIView):
+class RegisterView(StreamingLicenseUploadMixin, generics.CreateAPIView):
     serializer_class = UserRegisterSerializer
     permission_classes = [AllowAny]
 
-class ProfileView(generics.RetrieveUpdateAPIView):
+class ProfileView(StreamingLicenseUploadMixin, generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
 
     def get_object(self):
-        return self.request.user
+        # request.user only carries the cached auth fields
+        return User.objects.get(pk=self.request.user.pk)
 
 # -------------------------
 # Booking endpoints
@@ -47,9 +50,10 @@ class BookingViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
+        queryset = Booking.objects.select_related('vehicle')
         if user.is_staff:
-            return Booking.objects.all().order_by('-created_at')
-        return Booking.objects.filter(user=user).order_by('-created_at')
+            return queryset.order_by('-created_at', '-id')
+        return queryset.filter(user=user).order_by('-created_at', '-id')
 
     def perform_create(self, serializer):
         user = self.request.user
@@ -57,19 +61,27 @@ class BookingViewSet(viewsets.ModelViewSet):
         start = serializer.validated_data['start_time']
         end = serializer.validated_data['end_time']
 
-        hours = (end - start).total_seconds() / 3600.0
-        total_price = vehicle.price_per_hour * math.ceil(hours)
+        total_price = calculate_total_price(vehicle, start, end)
 
+        if uses_overlap_constraint():
+            # PostgreSQL: no pre-lock. A cheap unlocked check fails the common
+            # case fast; the exclusion constraint rejects any insert that races it.
+            if has_overlap(vehicle.pk, start, end):
+                raise ValidationError({"detail": "Vehicle not available in this time range."})
+            try:
+                with transaction.atomic():
+                    booking = serializer.save(user=user, total_price=total_price, status='PENDING')
+                    Payment.objects.create(booking=booking, amount=total_price, status='PENDING')
+            except IntegrityError as e:
+                if not is_overlap_violation(e):
+                    raise
+                raise ValidationError({"detail": "Vehicle not available in this time range."})
+            return
+
+        # portable fallback: serialize on the vehicle row, then check
         with transaction.atomic():
-            v = Vehicle.objects.select_for_update().get(pk=vehicle.pk)
-            overlapping_exists = Booking.objects.filter(
-                vehicle=v,
-                status__in=['PENDING','CONFIRMED','ONGOING'],
-                start_time__lt=end,
-                end_time__gt=start
-            ).exists()
-            if overlapping_exists:
-                from rest_framework.exceptions import ValidationError
+            Vehicle.objects.select_for_update().get(pk=vehicle.pk)
+            if has_overlap(vehicle.pk, start, end):
                 raise ValidationError({"detail": "Vehicle not available in this time range."})
 
             booking = serializer.save(user=user, total_price=total_price, status='PENDING')
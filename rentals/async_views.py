@@ -0,0 +1,83 @@
+# rentals/async_views.py
+"""
+Async payment endpoints, routed instead of the DRF versions in views.py when
+SERVER_MODE=asgi. DRF views are sync-only, so authentication is done here
+with the same JWT class. The Stripe API call runs in the thread pool
+(thread_sensitive=False) so a slow Stripe response ties up neither the event
+loop nor the request's database thread.
+"""
+import logging
+
+import stripe
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework.exceptions import APIException
+
+from .authentication import CachedJWTAuthentication
+from .models import Booking, Payment
+from .stripe_utils import (
+    STRIPE_PUBLISHABLE_KEY, STRIPE_WEBHOOK_SECRET, create_booking_checkout_session, handle_stripe_event,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def _authenticate(request):
+    """(user, None) for a valid bearer token, else (None, 401 response)."""
+    try:
+        result = await sync_to_async(CachedJWTAuthentication().authenticate)(request)
+    except APIException as e:
+        result, detail = None, e.detail
+    else:
+        detail = "Authentication credentials were not provided."
+    if result is None:
+        response = JsonResponse({"detail": str(detail)}, status=401)
+        response['WWW-Authenticate'] = 'Bearer realm="api"'
+        return None, response
+    return result[0], None
+
+
+@csrf_exempt  # bearer-token API, no cookies
+@require_POST
+async def create_checkout_session(request, booking_id):
+    user, error = await _authenticate(request)
+    if error:
+        return error
+
+    try:
+        booking = await Booking.objects.select_related('vehicle', 'payment').aget(pk=booking_id, user=user)
+    except Booking.DoesNotExist:
+        return JsonResponse({"detail": "Booking not found."}, status=404)
+
+    if booking.status != 'PENDING':
+        return JsonResponse({"detail": "Booking must be PENDING to pay."}, status=400)
+
+    payment = booking.payment
+    try:
+        session = await sync_to_async(create_booking_checkout_session, thread_sensitive=False)(booking, payment)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+    await Payment.objects.filter(pk=payment.pk).aupdate(stripe_session_id=session.id)
+
+    return JsonResponse({'sessionId': session.id, 'publishableKey': STRIPE_PUBLISHABLE_KEY})
+
+
+@csrf_exempt  # Stripe sends requests, not users
+@require_POST
+async def stripe_webhook(request):
+    sig_header = request.META.get('HTTP_STRIPE_SIGNATURE', '')
+
+    try:
+        event = stripe.Webhook.construct_event(request.body, sig_header, STRIPE_WEBHOOK_SECRET)
+    except Exception as e:
+        logger.warning("stripe_webhook.invalid", extra={"error": str(e)})
+        return HttpResponse(status=400)
+
+    logger.info("stripe_webhook.received", extra={"event_id": event['id'], "event_type": event['type']})
+
+    # transactions and row locks need a sync connection
+    await sync_to_async(handle_stripe_event)(event)
+    return HttpResponse(status=200)
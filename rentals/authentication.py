@@ -0,0 +1,56 @@
+# rentals/authentication.py
+from django.conf import settings
+from django.core.cache import caches
+from django.db import router
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+
+# the user state permission checks and views need; anything else loads lazily on access
+CACHED_USER_FIELDS = ('id', 'username', 'email', 'is_staff', 'is_superuser', 'is_active', 'is_verified_driver')
+
+
+def _cache():
+    return caches[settings.AUTH_USER_CACHE_ALIAS]
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def invalidate_cached_user(user_id):
+    _cache().delete(user_cache_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the token's user from the cache instead of
+    reading the users table on every request. The cached instance only has
+    CACHED_USER_FIELDS loaded; views that update the user must fetch the full row.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN or api_settings.USER_ID_FIELD != 'id':
+            # revocation compares the password hash, which is never cached
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken("Token contained no recognizable user identification") from e
+
+        key = user_cache_key(user_id)
+        state = _cache().get(key)
+        if state is None:
+            user = super().get_user(validated_token)
+            _cache().set(key, {name: getattr(user, name) for name in CACHED_USER_FIELDS},
+                         settings.AUTH_USER_CACHE_TIMEOUT)
+            return user
+
+        fields = [f.attname for f in User._meta.concrete_fields if f.attname in state]
+        user = User.from_db(router.db_for_read(User), fields, [state[name] for name in fields])
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        return user
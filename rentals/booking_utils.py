@@ -0,0 +1,100 @@
+# rentals/booking_utils.py
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Booking, Payment
+from .pricing import quote
+from .stripe_utils import expire_checkout_session
+from .transitions import bulk_transition
+
+# PostgreSQL-only EXCLUDE constraint added in migration 0010: no two live
+# bookings of one vehicle may have overlapping [start_time, end_time) ranges.
+BOOKING_OVERLAP_CONSTRAINT = 'booking_no_overlap'
+# Checkout sessions closed at once by the pending-booking sweep
+STRIPE_EXPIRE_THREADS = 8
+
+
+def calculate_total_price(vehicle, start, end):
+    """Price of a booking, as quoted by the pricing rules (see pricing.quote)."""
+    return quote(vehicle, start, end)['total_price']
+
+
+def uses_overlap_constraint():
+    """True when the database itself rejects overlapping bookings (PostgreSQL)."""
+    return connections[router.db_for_write(Booking)].vendor == 'postgresql'
+
+
+def has_overlap(vehicle_id, start, end):
+    return Booking.objects.filter(
+        vehicle_id=vehicle_id,
+        status__in=Booking.ACTIVE_STATUSES,
+        start_time__lt=end,
+        end_time__gt=start,
+    ).exists()
+
+
+def is_overlap_violation(exc):
+    """Whether an IntegrityError was raised by the booking overlap constraint."""
+    diag = getattr(exc.__cause__, 'diag', None)
+    if diag is not None and getattr(diag, 'constraint_name', None):
+        return diag.constraint_name == BOOKING_OVERLAP_CONSTRAINT
+    return BOOKING_OVERLAP_CONSTRAINT in str(exc)
+
+
+def _expire_sessions(session_ids, threads):
+    """{session_id: closed} for Checkout sessions, with up to `threads` Stripe calls in flight."""
+    if not session_ids:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(threads, len(session_ids))) as pool:
+        return dict(zip(session_ids, pool.map(expire_checkout_session, session_ids)))
+
+
+def expire_pending_bookings(hold=None, batch_size=1000, now=None, stripe_threads=STRIPE_EXPIRE_THREADS):
+    """
+    Cancel PENDING bookings created more than `hold` ago (default
+    BOOKING_PENDING_HOLD_MINUTES) and fail their pending payments, in batches
+    of `batch_size` read through the (status, created_at) index.
+    A booking with a Checkout session is only expired once Stripe has closed
+    the session; each batch's sessions are closed `stripe_threads` at a time
+    before its transaction. One that was paid (or cannot be checked) is left
+    for the webhook and the next sweep. Returns the number of bookings expired.
+    """
+    if hold is None:
+        hold = timedelta(minutes=settings.BOOKING_PENDING_HOLD_MINUTES)
+    cutoff = (now or timezone.now()) - hold
+    expired = 0
+    after = Q()
+    while True:
+        # keyset over (created_at, id): rows left PENDING are passed over, not carried along
+        batch = list(
+            Booking.objects.filter(after, status='PENDING', created_at__lt=cutoff)
+            .order_by('created_at', 'id')
+            .values_list('id', 'vehicle_id', 'payment__stripe_session_id', 'created_at')[:batch_size]
+        )
+        if not batch:
+            break
+        # an open session could still be paid after the booking is cancelled
+        closed = _expire_sessions([session_id for _, _, session_id, _ in batch if session_id], stripe_threads)
+        rows = [
+            (booking_id, vehicle_id) for booking_id, vehicle_id, session_id, _ in batch
+            if not session_id or closed[session_id]
+        ]
+        if rows:
+            ids = [booking_id for booking_id, _ in rows]
+            with transaction.atomic():
+                # re-check status: a payment may have confirmed a booking since the read
+                changed_at = timezone.now()
+                expired += bulk_transition(rows, 'PENDING', 'CANCELLED', changed_at)
+                Payment.objects.filter(booking_id__in=ids, booking__status='CANCELLED', status='PENDING').update(
+                    status='FAILED', updated_at=changed_at
+                )
+        if len(batch) < batch_size:
+            break
+        last_id, last_created_at = batch[-1][0], batch[-1][3]
+        after = Q(created_at__gt=last_created_at) | Q(created_at=last_created_at, id__gt=last_id)
+    return expired
@@ -0,0 +1,68 @@
+# rentals/catalog_cache.py
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.cache import get_conditional_response, patch_cache_control
+from rest_framework.response import Response
+
+# Every cached catalog response is keyed under the current generation;
+# invalidation bumps the generation instead of hunting down individual keys.
+GENERATION_KEY = 'catalog:generation'
+
+
+def _cache():
+    return caches[settings.CATALOG_CACHE_ALIAS]
+
+
+def catalog_generation():
+    cache = _cache()
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # start from the clock so a lost counter never reuses an old generation
+        cache.add(GENERATION_KEY, int(time.time() * 1000), timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def invalidate_catalog():
+    cache = _cache()
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, int(time.time() * 1000), timeout=None)
+
+
+def catalog_cache_key(request):
+    # host is part of the key because paginated responses embed absolute next/previous links
+    params = sorted((k, v) for k, values in request.query_params.lists() for v in values)
+    raw = json.dumps([request.get_host(), request.path, params, request.accepted_renderer.format])
+    return f"catalog:{catalog_generation()}:{hashlib.sha256(raw.encode()).hexdigest()}"
+
+
+def compute_etag(data):
+    payload = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder).encode()
+    return f'"{hashlib.sha256(payload).hexdigest()[:32]}"'
+
+
+def cached_catalog_response(request, build_response):
+    """
+    Serve a catalog GET from cache, building it with build_response() on a miss.
+    Sets a strong ETag and answers a matching If-None-Match with 304.
+    """
+    cache = _cache()
+    key = catalog_cache_key(request)
+    entry = cache.get(key)
+    if entry is None:
+        response = build_response()
+        if response.status_code != 200:
+            return response
+        entry = {'data': response.data, 'etag': compute_etag(response.data)}
+        cache.set(key, entry, settings.CATALOG_CACHE_TIMEOUT)
+
+    response = Response(entry['data'], headers={'ETag': entry['etag']})
+    patch_cache_control(response, public=True, max_age=settings.CATALOG_HTTP_MAX_AGE)
+    return get_conditional_response(request, etag=entry['etag'], response=response)
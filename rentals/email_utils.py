@@ -1,8 +1,22 @@
 # rentals/email_utils.py
-from django.core.mail import send_mail
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection, send_mail
 from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
 
-def send_booking_confirmation_email(booking):
+from .metrics import track_external
+from .models import EmailOutbox
+
+# retry schedule for the outbox worker: 30s, 1m, 2m, ... capped at 1h
+OUTBOX_BACKOFF_BASE = timedelta(seconds=30)
+OUTBOX_BACKOFF_MAX = timedelta(hours=1)
+# a claimed row is hidden from other workers this long; if its worker dies, it is sent again after
+OUTBOX_LEASE = timedelta(minutes=10)
+
+
+def _booking_confirmation_message(booking):
     subject = f"Booking Confirmed: {booking.vehicle.brand} {booking.vehicle.model_name}"
     message = (
         f"Hi {booking.user.username},\n\n"
@@ -13,10 +27,9 @@ def send_booking_confirmation_email(booking):
         f"Total Price: ₹{booking.total_price}\n\n"
         "Thank you for using ScootyGo!"
     )
-    recipient = [booking.user.email]
-    send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, recipient)
+    return subject, message
 
-def send_booking_cancelled_email(booking, refund_amount=None):
+def _booking_cancelled_message(booking, refund_amount=None):
     subject = f"Booking Cancelled: {booking.vehicle.brand} {booking.vehicle.model_name}"
     message = (
         f"Hi {booking.user.username},\n\n"
@@ -25,5 +38,85 @@ def send_booking_cancelled_email(booking, refund_amount=None):
     if refund_amount is not None:
         message += f"Refund Amount: ₹{refund_amount}\n\n"
     message += "We hope to see you again soon!"
+    return subject, message
+
+def send_booking_confirmation_email(booking):
+    subject, message = _booking_confirmation_message(booking)
+    recipient = [booking.user.email]
+    send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, recipient)
+
+def send_booking_cancelled_email(booking, refund_amount=None):
+    subject, message = _booking_cancelled_message(booking, refund_amount)
     recipient = [booking.user.email]
     send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, recipient)
+
+
+# -------------------------
+# Outbox (queued delivery)
+# -------------------------
+def queue_email(subject, message, recipient):
+    """Store an email for the outbox worker; call inside the transaction that triggers it."""
+    return EmailOutbox.objects.create(
+        subject=subject, body=message, from_email=settings.DEFAULT_FROM_EMAIL, to=list(recipient)
+    )
+
+def queue_booking_confirmation_email(booking):
+    subject, message = _booking_confirmation_message(booking)
+    return queue_email(subject, message, [booking.user.email])
+
+def queue_booking_cancelled_email(booking, refund_amount=None):
+    subject, message = _booking_cancelled_message(booking, refund_amount)
+    return queue_email(subject, message, [booking.user.email])
+
+def outbox_backoff(attempts):
+    return min(OUTBOX_BACKOFF_BASE * (2 ** (attempts - 1)), OUTBOX_BACKOFF_MAX)
+
+def _claim_due_emails(batch_size):
+    """Lease a batch of due rows in one short transaction, so no lock is held while sending."""
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status='PENDING', next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        EmailOutbox.objects.filter(pk__in=[email.pk for email in batch]).update(next_attempt_at=now + OUTBOX_LEASE)
+    return batch
+
+def send_queued_emails(batch_size=100, max_attempts=5, connection=None):
+    """
+    Deliver one batch of due outbox emails over a single backend connection.
+    Failed sends are retried with exponential backoff until max_attempts.
+    Returns (sent, failed) counts for the batch.
+    """
+    connection = connection or get_connection()
+    sent = failed = 0
+
+    batch = _claim_due_emails(batch_size)
+    if not batch:
+        return sent, failed
+
+    try:
+        for email in batch:
+            message = EmailMessage(email.subject, email.body, email.from_email, email.to, connection=connection)
+            attempts = email.attempts + 1
+            try:
+                with track_external('smtp'):
+                    connection.open()  # no-op while the connection is up
+                    message.send()
+            except Exception as e:
+                connection.close()  # reconnect on the next message
+                if attempts >= max_attempts:
+                    outcome = {'status': 'FAILED'}
+                else:
+                    outcome = {'next_attempt_at': timezone.now() + outbox_backoff(attempts)}
+                outcome['last_error'] = str(e)
+                failed += 1
+            else:
+                outcome = {'status': 'SENT', 'sent_at': timezone.now(), 'last_error': ''}
+                sent += 1
+            # each result on its own, so a crash later in the batch cannot resend this one
+            EmailOutbox.objects.filter(pk=email.pk).update(attempts=attempts, **outcome)
+    finally:
+        connection.close()
+    return sent, failed
@@ -0,0 +1,94 @@
+# rentals/exports.py
+"""
+Booking/payment dumps for finance. Rows come straight from one joined
+values_list() query read through iterator(), so memory stays flat however many
+bookings are exported (on PostgreSQL that is a server-side cursor).
+"""
+import csv
+import io
+import json
+from datetime import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Booking
+
+# (column name, ORM lookup); booking columns first, then the joined tables
+EXPORT_COLUMNS = (
+    ('booking_id', 'id'),
+    ('created_at', 'created_at'),
+    ('status', 'status'),
+    ('start_time', 'start_time'),
+    ('end_time', 'end_time'),
+    ('total_price', 'total_price'),
+    ('user_id', 'user_id'),
+    ('username', 'user__username'),
+    ('email', 'user__email'),
+    ('vehicle_id', 'vehicle_id'),
+    ('vehicle_type', 'vehicle__vehicle_type'),
+    ('brand', 'vehicle__brand'),
+    ('model_name', 'vehicle__model_name'),
+    ('payment_status', 'payment__status'),
+    ('payment_amount', 'payment__amount'),
+    ('penalty_amount', 'payment__penalty_amount'),
+    ('refund_amount', 'payment__refund_amount'),
+    ('transaction_id', 'payment__transaction_id'),
+    ('stripe_payment_intent', 'payment__stripe_payment_intent'),
+)
+EXPORT_CHUNK_SIZE = 2000
+# rows per chunk handed to the server; one write per row is needlessly chatty
+ROWS_PER_WRITE = 500
+# cells a spreadsheet would evaluate as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def export_rows(start=None, end=None):
+    """Tuples in EXPORT_COLUMNS order for bookings created in [start, end)."""
+    queryset = Booking.objects.all()
+    if start:
+        queryset = queryset.filter(created_at__gte=start)
+    if end:
+        queryset = queryset.filter(created_at__lt=end)
+    lookups = [lookup for _, lookup in EXPORT_COLUMNS]
+    return queryset.order_by('id').values_list(*lookups).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def _csv_cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def stream_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in EXPORT_COLUMNS])
+    for count, row in enumerate(rows, 1):
+        writer.writerow([_csv_cell(value) for value in row])
+        if count % ROWS_PER_WRITE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def stream_ndjson(rows):
+    names = [name for name, _ in EXPORT_COLUMNS]
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(names, row)), cls=DjangoJSONEncoder))
+        if len(lines) == ROWS_PER_WRITE:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+EXPORT_FORMATS = {
+    'csv': (stream_csv, 'text/csv; charset=utf-8'),
+    'ndjson': (stream_ndjson, 'application/x-ndjson'),
+}
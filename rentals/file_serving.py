@@ -0,0 +1,141 @@
+# rentals/file_serving.py
+"""
+Serving files from disk without the slow paths: conditional GETs (ETag and
+Last-Modified, answered with 304), single byte ranges (206/416), and
+optionally handing the transfer to the web server via X-Accel-Redirect
+(nginx) or X-Sendfile (Apache/lighttpd) once Django has authorized it.
+"""
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+
+from .streaming import stream_for
+
+CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def file_etag(stat):
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def parse_range(header, size):
+    """
+    (start, end) inclusive for a single-range header, or None to send the
+    whole file (absent, malformed or multi-range headers; RFC 9110 lets a
+    server ignore those). Raises RangeNotSatisfiable.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first == '':  # suffix: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise RangeNotSatisfiable()
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise RangeNotSatisfiable()
+    return start, end
+
+
+def _if_range_matches(request, etag, mtime):
+    value = request.headers.get('If-Range')
+    if not value:
+        return True
+    if value.startswith('"') or value.startswith('W/'):
+        return value == etag  # strong comparison only
+    date = parse_http_date_safe(value)
+    return date is not None and int(mtime) <= date
+
+
+def _read_range(path, start, length):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _offload(response, name, full_path):
+    mode = settings.MEDIA_OFFLOAD
+    if mode == 'x-accel-redirect':
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip('/') + '/' + name
+    elif mode == 'x-sendfile':
+        response['X-Sendfile'] = full_path
+    else:
+        return False
+    return True
+
+
+def serve_file(request, full_path, name, cache_control, encoding=None, vary=(), offload=False):
+    """
+    Response for the file at `full_path`; `name` is the path it is served
+    under, for the content type and X-Accel-Redirect. `encoding` marks a
+    pre-compressed copy. `offload` hands the body to the web server per
+    settings.MEDIA_OFFLOAD. The caller has already decided the request may
+    see the file; a missing file is the caller's 404 too.
+    """
+    stat = os.stat(full_path)
+    etag, mtime = file_etag(stat), stat.st_mtime
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+    def finish(response):
+        response['Cache-Control'] = cache_control
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(mtime)
+        response['Accept-Ranges'] = 'bytes'
+        if vary:
+            patch_vary_headers(response, vary)
+        return response
+
+    conditional = get_conditional_response(request, etag=etag, last_modified=int(mtime))
+    if isinstance(conditional, HttpResponseNotModified):
+        return finish(conditional)
+    if conditional is not None:  # 412
+        return conditional
+
+    # the web server streams the bytes and handles ranges itself
+    response = HttpResponse(content_type=content_type)
+    if offload and encoding is None and _offload(response, name, full_path):
+        return finish(response)
+
+    byte_range = None
+    if encoding is None and _if_range_matches(request, etag, mtime):
+        try:
+            byte_range = parse_range(request.headers.get('Range'), stat.st_size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return finish(response)
+
+    if byte_range is None:
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type, filename=os.path.basename(name))
+        if encoding:
+            response['Content-Encoding'] = encoding
+        response['Content-Length'] = stat.st_size
+        return finish(stream_for(request, response))
+
+    start, end = byte_range
+    length = end - start + 1
+    response = StreamingHttpResponse(
+        _read_range(full_path, start, length) if request.method != 'HEAD' else (),
+        status=206, content_type=content_type,
+    )
+    response['Content-Length'] = length
+    response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+    return finish(stream_for(request, response))
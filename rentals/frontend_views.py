@@ -1,30 +1,52 @@
 # rentals/frontend_views.py
+from django.conf import settings
 from django.shortcuts import render
+from django.views.decorators.cache import cache_control, cache_page
 
+
+def cached_shell(view):
+    """
+    Cache the whole response: these pages are static shells whose data is
+    fetched by JavaScript with the user's token, so every visitor gets the
+    same bytes. Rendering must not touch request.user or the session, or the
+    response would grow `Vary: Cookie` and be cached per visitor.
+    """
+    view = cache_control(public=True)(view)
+    return cache_page(settings.FRONTEND_CACHE_TIMEOUT, cache=settings.FRONTEND_CACHE_ALIAS,
+                      key_prefix=settings.FRONTEND_CACHE_KEY_PREFIX)(view)
+
+
+@cached_shell
 def index(request):
     """Homepage → show vehicles list"""
     return render(request, "vehicles_list.html")
 
+@cached_shell
 def vehicles_page(request):
     """Vehicles page"""
     return render(request, "vehicles_list.html")
 
+@cached_shell
 def login_page(request):
     """Login form"""
     return render(request, "auth_login.html")
 
+@cached_shell
 def register_page(request):
     """Register form"""
     return render(request, "auth_register.html")
 
+@cached_shell
 def profile_page(request):
     """User profile page"""
     return render(request, "profile.html")
 
+@cached_shell
 def user_bookings_page(request):
     """My bookings (frontend)"""
     return render(request, "user_bookings.html")
 
+@cached_shell
 def bookings_page(request):
     """Admin/user bookings list"""
     return render(request, "bookings_list.html")
@@ -0,0 +1,228 @@
+# rentals/image_pipeline.py
+"""
+Vehicle image ingestion: fetch (or accept) an image once, keep the original
+under MEDIA_ROOT and render WebP/JPEG variants at a few widths for srcset.
+
+render_variants() is the CPU-heavy part and only touches Pillow, so batch
+imports run it in a process pool; fetching happens in threads and all
+storage/database writes stay in the calling process.
+"""
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+
+import requests
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import ExifTags, Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+VARIANT_WIDTHS = (320, 640, 1280)
+# format -> (Pillow format, extension, save options)
+VARIANT_FORMATS = {
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+MAX_SOURCE_BYTES = 15 * 1024 * 1024
+FETCH_TIMEOUT = 10
+SOURCE_EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png', 'WEBP': 'webp', 'GIF': 'gif'}
+# EXIF orientations that turn the stored image by 90 degrees
+ROTATED_ORIENTATIONS = (5, 6, 7, 8)
+
+
+class ImageIngestError(Exception):
+    pass
+
+
+def fetch_image(url, max_bytes=MAX_SOURCE_BYTES, timeout=FETCH_TIMEOUT):
+    """Download `url`, refusing bodies over max_bytes without reading them whole."""
+    with requests.get(url, stream=True, timeout=timeout) as resp:
+        resp.raise_for_status()
+        if int(resp.headers.get('Content-Length') or 0) > max_bytes:
+            raise ImageIngestError(f"{url} is larger than {max_bytes} bytes")
+        data = bytearray()
+        for chunk in resp.iter_content(64 * 1024):
+            data += chunk
+            if len(data) > max_bytes:
+                raise ImageIngestError(f"{url} is larger than {max_bytes} bytes")
+    return bytes(data)
+
+
+def render_variants(data, widths=VARIANT_WIDTHS):
+    """
+    Decode `data` and encode every (format, width) variant. Never upscales:
+    widths above the original collapse into one variant at the original width.
+    Returns {'format', 'width', 'height', 'variants': {format: {width: bytes}}}
+    with the size as displayed, i.e. after EXIF rotation.
+    """
+    try:
+        image = Image.open(io.BytesIO(data))
+        source_format = image.format
+        full_width, full_height = image.size
+        if image.getexif().get(ExifTags.Base.Orientation) in ROTATED_ORIENTATIONS:
+            full_width, full_height = full_height, full_width
+        # JPEG can decode at 1/2, 1/4, 1/8 scale: skip pixels the largest variant will not use
+        image.draft('RGB', (max(widths), max(widths)))
+        image = ImageOps.exif_transpose(image)
+        if image.mode != 'RGB':
+            # flatten transparency onto white; neither variant format needs alpha
+            rgba = image.convert('RGBA')
+            image = Image.new('RGB', image.size, 'white')
+            image.paste(rgba, mask=rgba.getchannel('A'))
+
+        variants = {name: {} for name in VARIANT_FORMATS}
+        for width in sorted({min(width, full_width) for width in widths}, reverse=True):
+            height = max(1, round(full_height * width / full_width))
+            if image.size != (width, height):
+                image = image.resize((width, height), Image.Resampling.LANCZOS)  # the next width starts from this one
+            for name, (pil_format, _, options) in VARIANT_FORMATS.items():
+                out = io.BytesIO()
+                image.save(out, pil_format, **options)
+                variants[name][width] = out.getvalue()
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        raise ImageIngestError(f"not a readable image: {e}") from e
+    return {'format': source_format, 'width': full_width, 'height': full_height, 'variants': variants}
+
+
+def _hashed_name(stem, content, extension):
+    # a content hash in the name lets media_views cache the file for a year
+    return f'{stem}.{hashlib.sha256(content).hexdigest()[:12]}.{extension}'
+
+
+def _delete_variants(vehicle_image):
+    for names in vehicle_image.variants.values():
+        for name in names.values():
+            default_storage.delete(name)
+
+
+def store_rendered(vehicle_image, data, rendered):
+    """Save the original and its variants for `vehicle_image` and record them on the row."""
+    _delete_variants(vehicle_image)
+    if vehicle_image.file:
+        vehicle_image.file.delete(save=False)
+
+    stem = f'{vehicle_image.pk}'
+    extension = SOURCE_EXTENSIONS.get(rendered['format'], 'img')
+    vehicle_image.file.save(_hashed_name(stem, data, extension), ContentFile(data), save=False)
+    # the file field measured the stored bytes; record the size as displayed
+    vehicle_image.width, vehicle_image.height = rendered['width'], rendered['height']
+    base = os.path.dirname(vehicle_image.file.name)
+    variants = {}
+    for name, by_width in rendered['variants'].items():
+        _, variant_extension, _ = VARIANT_FORMATS[name]
+        variants[name] = {
+            str(width): default_storage.save(
+                f'{base}/{_hashed_name(f"{stem}-{width}", content, variant_extension)}', ContentFile(content),
+            )
+            for width, content in by_width.items()
+        }
+    vehicle_image.variants = variants
+    vehicle_image.save(update_fields=['file', 'width', 'height', 'variants'])
+    return vehicle_image
+
+
+def ingest_image(vehicle_image, data=None):
+    """Ingest one image in-process, from `data` or by fetching vehicle_image.image."""
+    if data is None:
+        data = fetch_image(vehicle_image.image)
+    return store_rendered(vehicle_image, data, render_variants(data))
+
+
+def _source_bytes(vehicle_image):
+    if vehicle_image.file:
+        with vehicle_image.file.open('rb') as f:
+            return f.read()
+    return fetch_image(vehicle_image.image)
+
+
+def _render_pool(workers):
+    # spawn, not fork: this process has fetch threads running and open database connections
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+
+def ingest_images(images, workers=None, fetch_threads=8, window=32, log=logger.info):
+    """
+    Ingest many VehicleImage rows: sources are fetched by `fetch_threads`
+    threads, variants rendered by a pool of `workers` processes (None: one
+    per CPU, 0: in this process). Images go through `window` at a time, so at
+    most that many sources and variant sets are held in memory whatever the
+    size of the catalog. Returns (ingested, failed) counts.
+    """
+    images = iter(images)
+    ingested = failed = 0
+    pool = _render_pool(workers) if workers != 0 else None
+    try:
+        with ThreadPoolExecutor(max_workers=fetch_threads) as fetcher:
+            while batch := list(islice(images, window)):
+                done, broken = _ingest_window(batch, fetcher, pool, log)
+                ingested += done
+                failed += len(batch) - done
+                if broken:
+                    # a worker died (killed, out of memory): the pool is unusable, start a new one
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    pool = _render_pool(workers)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return ingested, failed
+
+
+def _ingest_window(batch, fetcher, pool, log):
+    """Fetch, render and store one window of images. Returns (ingested, pool_broken)."""
+    ingested, broken = 0, False
+    fetches = {fetcher.submit(_source_bytes, image): image for image in batch}
+    renders = {}
+    for future in as_completed(fetches):
+        image = fetches.pop(future)
+        try:
+            data = future.result()
+        except (requests.RequestException, ImageIngestError, OSError) as e:
+            log(f"image {image.pk}: fetch failed: {e}")
+            continue
+        if pool is None:
+            renders[_completed(render_variants, data)] = (image, data)
+            continue
+        try:
+            renders[pool.submit(render_variants, data)] = (image, data)
+        except BrokenProcessPool as e:
+            broken = True
+            log(f"image {image.pk}: {e}")
+
+    for future in as_completed(renders):
+        # popped so the source bytes and variants are freed once stored
+        image, data = renders.pop(future)
+        try:
+            store_rendered(image, data, future.result())
+        except ImageIngestError as e:
+            log(f"image {image.pk}: {e}")
+            continue
+        except BrokenProcessPool as e:
+            broken = True
+            log(f"image {image.pk}: {e}")
+            continue
+        ingested += 1
+    return ingested, broken
+
+
+def _completed(fn, *args):
+    """A finished Future holding fn(*args), so in-process rendering shares the pool code path."""
+    future = Future()
+    try:
+        future.set_result(fn(*args))
+    except Exception as e:  # re-raised by future.result(), as for a pool
+        future.set_exception(e)
+    return future
+
+
+def variant_urls(vehicle_image):
+    """{format: [(width, url), ...]} smallest first."""
+    return {
+        name: sorted((int(width), default_storage.url(path)) for width, path in by_width.items())
+        for name, by_width in vehicle_image.variants.items()
+    }
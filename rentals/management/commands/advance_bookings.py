@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from rentals.transitions import advance_bookings
+
+
+class Command(BaseCommand):
+    help = "Move due bookings CONFIRMED -> ONGOING -> COMPLETED so only live rows stay in the active set"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Bookings per UPDATE")
+        parser.add_argument("--loop", action="store_true", help="Keep advancing instead of exiting after one pass")
+        parser.add_argument("--interval", type=float, default=60.0, help="Seconds between passes in --loop mode")
+
+    def handle(self, *args, **options):
+        while True:
+            started, completed = advance_bookings(batch_size=options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"✅ Started {started}, completed {completed} booking(s)"))
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
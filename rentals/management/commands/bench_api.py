@@ -0,0 +1,208 @@
+import json
+import logging
+import random
+import statistics
+import time
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from rentals.models import Booking, Payment, User
+from rentals.seeding import seed_fleet
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the booking/payment API against a throwaway test database: "
+        "latency percentiles, requests/sec and queries per request, compared with a stored baseline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--vehicles", type=int, default=200, help="Fleet size to seed")
+        parser.add_argument("--history", type=int, default=20, help="Past bookings seeded per vehicle")
+        parser.add_argument("--iterations", type=int, default=50, help="Requests per scenario")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed for request parameters")
+        parser.add_argument("--baseline", default=None,
+                            help="Baseline JSON file (default: benchmarks/baseline-<db vendor>.json)")
+        parser.add_argument("--save-baseline", action="store_true", help="Write this run as the new baseline")
+        parser.add_argument("--tolerance", type=float, default=0.5,
+                            help="Allowed p95 latency / throughput regression as a fraction of the baseline")
+        parser.add_argument("--query-tolerance", type=float, default=0.0,
+                            help="Allowed queries-per-request increase as a fraction of the baseline")
+        parser.add_argument("--keepdb", action="store_true", help="Reuse the test database between runs")
+        parser.add_argument("--json", action="store_true", help="Print results as JSON")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        if options["verbosity"] < 2:
+            logging.getLogger("rentals").setLevel(logging.WARNING)  # no per-request log lines
+
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options["keepdb"])
+        try:
+            self._seed(options["vehicles"], options["history"])
+            results = self._run(options["iterations"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options["keepdb"])
+            teardown_test_environment()
+
+        self._report(results, options["json"])
+        baseline_path = Path(options["baseline"] or settings.BASE_DIR / "benchmarks" / f"baseline-{connection.vendor}.json")
+        if options["save_baseline"]:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(results, indent=2, sort_keys=True))
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {baseline_path}"))
+        elif baseline_path.exists():
+            self._compare(results, json.loads(baseline_path.read_text()), options["tolerance"], options["query_tolerance"])
+        else:
+            self.stdout.write(f"No baseline at {baseline_path}; run with --save-baseline to create one.")
+
+    # -------------------------
+    # Data
+    # -------------------------
+    def _seed(self, n_vehicles, history):
+        self.password = "bench-pass"
+        self.user = User.objects.create_user(username="bench", password=self.password, email="bench@example.com")
+        # past-only history, so the future windows used by the scenarios below are always free
+        summary = seed_fleet(vehicles=n_vehicles, bookings=n_vehicles * history, users=10,
+                             seed=self.rng.randrange(2 ** 32), days=60, future_days=0, prefix="bench")
+        self.vehicle_ids = summary["vehicle_ids"]
+        self.next_slot = 0
+
+    def _future_slot(self):
+        """A two-hour window no other benchmark request uses."""
+        self.next_slot += 1
+        start = timezone.now() + timezone.timedelta(days=1, hours=3 * self.next_slot)
+        return start, start + timezone.timedelta(hours=2)
+
+    def _pending_booking(self):
+        start, end = self._future_slot()
+        booking = Booking.objects.create(user=self.user, vehicle_id=self.rng.choice(self.vehicle_ids),
+                                         start_time=start, end_time=end, total_price=Decimal("100.00"))
+        Payment.objects.create(booking=booking, amount=booking.total_price)
+        return booking
+
+    # -------------------------
+    # Scenarios
+    # -------------------------
+    def _run(self, iterations):
+        client = APIClient()
+        token = client.post("/api/token/", {"username": "bench", "password": self.password}, format="json").data["access"]
+        client.credentials(HTTP_AUTHORIZATION="Bearer " + token)
+        anonymous = APIClient()
+        webhook_client = APIClient()
+
+        def vehicle_list():
+            return anonymous.get("/api/vehicles/")
+
+        def availability(window):
+            start, end = window
+            return anonymous.get("/api/vehicles/available/", {"start": start.isoformat(), "end": end.isoformat()})
+
+        created = []
+
+        def booking_create(window):
+            start, end = window
+            resp = client.post("/api/bookings/", {"vehicle": self.rng.choice(self.vehicle_ids),
+                                                  "start_time": start.isoformat(), "end_time": end.isoformat()},
+                               format="json")
+            created.append(resp.data.get("id"))
+            return resp
+
+        def cancel():
+            return client.post(f"/api/bookings/{created.pop()}/cancel/")
+
+        def mock_pay():
+            return client.post(f"/api/payments/mock/{created.pop()}/", {"simulate": "success"}, format="json")
+
+        events = []
+
+        def new_event():
+            booking = self._pending_booking()
+            event = {"id": f"evt_bench_{booking.pk}", "type": "checkout.session.completed",
+                     "data": {"object": {"payment_intent": f"pi_bench_{booking.pk}",
+                                         "metadata": {"booking_id": str(booking.pk),
+                                                      "payment_id": str(booking.payment.pk)}}}}
+            events.append(event)
+            return event
+
+        def webhook(event):
+            return webhook_client.post("/api/payments/webhook/", data=json.dumps(event),
+                                       content_type="application/json", HTTP_STRIPE_SIGNATURE="bench")
+
+        # (name, request, count, untimed setup whose result is passed to the request)
+        scenarios = [
+            ("vehicle_list", vehicle_list, iterations, None),
+            ("availability", availability, iterations, self._future_slot),
+            ("booking_create", booking_create, iterations * 2, self._future_slot),
+            ("cancel", cancel, iterations, None),
+            ("mock_pay", mock_pay, iterations, None),
+            ("webhook", webhook, iterations, new_event),
+            ("webhook_duplicate", webhook, iterations, events.pop),
+        ]
+
+        # Stripe stand-in: the "signed" payload is the event itself
+        with mock.patch("rentals.views.stripe.Webhook.construct_event",
+                        side_effect=lambda payload, sig, secret: json.loads(payload)):
+            return {name: self._measure(name, fn, n, setup) for name, fn, n, setup in scenarios}
+
+    def _measure(self, name, fn, n, setup=None):
+        latencies, queries = [], []
+        for _ in range(n):
+            args = (setup(),) if setup else ()
+            with CaptureQueriesContext(connection) as ctx:
+                t0 = time.perf_counter()
+                resp = fn(*args)
+                latencies.append(time.perf_counter() - t0)
+            if resp.status_code >= 400:
+                raise CommandError(f"{name}: unexpected {resp.status_code} {getattr(resp, 'data', resp.content)!r}")
+            queries.append(len(ctx.captured_queries))
+        elapsed = sum(latencies)  # request time only, setup excluded
+
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive") if n > 1 else latencies * 99
+        return {
+            "requests": n,
+            "p50_ms": round(cuts[49] * 1000, 3),
+            "p95_ms": round(cuts[94] * 1000, 3),
+            "p99_ms": round(cuts[98] * 1000, 3),
+            "rps": round(n / elapsed, 1),
+            "queries_per_request": round(sum(queries) / n, 2),
+        }
+
+    # -------------------------
+    # Output
+    # -------------------------
+    def _report(self, results, as_json):
+        if as_json:
+            self.stdout.write(json.dumps(results, indent=2, sort_keys=True))
+            return
+        self.stdout.write(f"Database: {connection.vendor}")
+        self.stdout.write(f"{'scenario':<20}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}{'q/req':>8}")
+        for name, r in results.items():
+            self.stdout.write(f"{name:<20}{r['requests']:>6}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}"
+                              f"{r['p99_ms']:>10.2f}{r['rps']:>10.1f}{r['queries_per_request']:>8.2f}")
+
+    def _compare(self, results, baseline, tolerance, query_tolerance):
+        regressions = []
+        for name, r in results.items():
+            base = baseline.get(name)
+            if not base:
+                continue
+            if r["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+                regressions.append(f"{name}: p95 {r['p95_ms']}ms vs baseline {base['p95_ms']}ms")
+            if r["rps"] < base["rps"] / (1 + tolerance):
+                regressions.append(f"{name}: {r['rps']} req/s vs baseline {base['rps']} req/s")
+            if r["queries_per_request"] > base["queries_per_request"] * (1 + query_tolerance):
+                regressions.append(f"{name}: {r['queries_per_request']} queries/request "
+                                   f"vs baseline {base['queries_per_request']}")
+        if regressions:
+            raise CommandError("Benchmark regressed beyond baseline:\n  " + "\n  ".join(regressions))
+        self.stdout.write(self.style.SUCCESS("✅ Within baseline tolerance"))
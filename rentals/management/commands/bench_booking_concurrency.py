@@ -0,0 +1,95 @@
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from rentals.booking_utils import uses_overlap_constraint
+from rentals.models import Booking, Payment, Vehicle, User
+from rentals.views import BookingViewSet
+
+
+class Command(BaseCommand):
+    help = "Fire parallel booking requests at one vehicle and report throughput and overlap correctness"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=50, help="Booking requests per scenario")
+        parser.add_argument("--threads", type=int, default=10, help="Concurrent clients")
+        parser.add_argument("--mode", choices=["conflict", "disjoint", "both"], default="both",
+                            help="conflict: every request wants the same slot; disjoint: every request gets its own slot")
+        parser.add_argument("--keep", action="store_true", help="Keep the benchmark vehicle/user/bookings afterwards")
+
+    def handle(self, *args, **options):
+        strategy = "exclusion constraint" if uses_overlap_constraint() else "row lock"
+        self.stdout.write(f"Database: {connection.vendor} ({strategy}), "
+                          f"{options['requests']} requests x {options['threads']} threads")
+
+        user = User.objects.create_user(username=f"bench-{int(time.time() * 1000)}", password="bench")
+        vehicles = []
+        try:
+            modes = ["conflict", "disjoint"] if options["mode"] == "both" else [options["mode"]]
+            for mode in modes:
+                vehicle = Vehicle.objects.create(
+                    vehicle_type="scooty", brand="Bench", model_name=f"{mode} scooty",
+                    price_per_hour=50, price_per_day=400,
+                )
+                vehicles.append(vehicle)
+                self._run(mode, user, vehicle, options["requests"], options["threads"])
+        finally:
+            if not options["keep"]:
+                Payment.objects.filter(booking__vehicle__in=vehicles).delete()
+                Booking.objects.filter(vehicle__in=vehicles).delete()
+                Vehicle.objects.filter(pk__in=[v.pk for v in vehicles]).delete()
+                user.delete()
+
+    def _run(self, mode, user, vehicle, n, threads):
+        factory = APIRequestFactory()
+        view = BookingViewSet.as_view({"post": "create"})
+        base = timezone.now() + timezone.timedelta(days=1)
+
+        def book(i):
+            offset = timezone.timedelta(hours=2 * i) if mode == "disjoint" else timezone.timedelta(0)
+            request = factory.post("/api/bookings/", {
+                "vehicle": vehicle.pk,
+                "start_time": (base + offset).isoformat(),
+                "end_time": (base + offset + timezone.timedelta(hours=1)).isoformat(),
+            }, format="json")
+            force_authenticate(request, user=user)
+            started = time.perf_counter()
+            try:
+                return view(request).status_code, time.perf_counter() - started
+            except Exception as e:
+                return type(e).__name__, time.perf_counter() - started
+            finally:
+                connection.close()  # each worker thread has its own connection
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            results = list(pool.map(book, range(n)))
+        elapsed = time.perf_counter() - started
+
+        outcomes = Counter(code for code, _ in results)
+        latencies = sorted(lat for _, lat in results)
+        created = outcomes.get(201, 0)
+        expected = 1 if mode == "conflict" else n
+        overlaps = self._count_overlaps(vehicle)
+        correct = overlaps == 0 and created == expected
+
+        self.stdout.write(f"\n[{mode}]")
+        self.stdout.write(f"  throughput: {n / elapsed:.1f} req/s over {elapsed:.2f}s")
+        self.stdout.write(f"  latency: p50 {latencies[len(latencies) // 2] * 1000:.1f}ms, "
+                          f"max {latencies[-1] * 1000:.1f}ms")
+        self.stdout.write(f"  outcomes: {dict(outcomes)} (expected {expected} created)")
+        self.stdout.write(f"  overlapping live bookings: {overlaps}")
+        style = self.style.SUCCESS if correct else self.style.ERROR
+        self.stdout.write(style(f"  correctness: {'OK' if correct else 'FAILED'}"))
+
+    def _count_overlaps(self, vehicle):
+        windows = list(
+            Booking.objects.filter(vehicle=vehicle, status__in=Booking.ACTIVE_STATUSES)
+            .order_by("start_time").values_list("start_time", "end_time")
+        )
+        return sum(1 for (_, prev_end), (start, _) in zip(windows, windows[1:]) if start < prev_end)
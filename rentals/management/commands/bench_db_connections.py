@@ -0,0 +1,105 @@
+import copy
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.utils import load_backend
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-request database connection overhead: reconnect every request "
+        "(CONN_MAX_AGE=0) vs persistent connections vs the psycopg pool (PostgreSQL)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Simulated requests per mode")
+        parser.add_argument("--threads", type=int, default=1, help="Concurrent workers (gunicorn threads)")
+        parser.add_argument("--max-age", type=int, default=60, help="CONN_MAX_AGE for the persistent mode")
+        parser.add_argument("--pool-size", type=int, default=4, help="max_size for the pool mode")
+        parser.add_argument("--database", default="default", help="Database alias to benchmark")
+
+    def handle(self, *args, **options):
+        base = connections[options["database"]].settings_dict
+        self.stdout.write(f"Database: {base['ENGINE'].rsplit('.', 1)[-1]}, "
+                          f"{options['requests']} requests x {options['threads']} threads")
+
+        modes = [
+            ("per-request", {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False}, {}),
+            ("persistent", {"CONN_MAX_AGE": options["max_age"], "CONN_HEALTH_CHECKS": True}, {}),
+        ]
+        if base["ENGINE"] == "django.db.backends.postgresql":
+            try:
+                import psycopg_pool  # noqa: F401
+            except ImportError:
+                self.stdout.write("pool: skipped (psycopg_pool is not installed)")
+            else:
+                size = options["pool_size"]
+                modes.append(("pool", {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False},
+                              {"pool": {"min_size": min(2, size), "max_size": size}}))
+        else:
+            self.stdout.write("pool: skipped (only available on PostgreSQL)")
+
+        self.stdout.write(f"{'mode':<14}{'mean ms':>10}{'p95 ms':>10}{'req/s':>10}{'connects':>10}")
+        for name, overrides, options_overrides in modes:
+            settings_dict = copy.deepcopy(base)
+            settings_dict.update(overrides)
+            settings_dict["OPTIONS"] = {
+                k: v for k, v in settings_dict["OPTIONS"].items() if k != "pool"
+            } | options_overrides
+            r = self._run(f"bench_{name}", settings_dict, options["requests"], options["threads"])
+            self.stdout.write(f"{name:<14}{r['mean_ms']:>10.3f}{r['p95_ms']:>10.3f}"
+                              f"{r['rps']:>10.1f}{r['connects']:>10}")
+
+    def _run(self, alias, settings_dict, n, threads):
+        backend = load_backend(settings_dict["ENGINE"])
+        latencies = []
+        connects = 0
+        lock = threading.Lock()
+
+        def worker(count):
+            nonlocal connects
+            # one wrapper per thread, like Django's thread-local connections
+            conn = backend.DatabaseWrapper(settings_dict, alias)
+            try:
+                for _ in range(count):
+                    started = time.perf_counter()
+                    # what Django does around every request: request_started, a query, request_finished
+                    conn.close_if_unusable_or_obsolete()
+                    if conn.connection is None:
+                        with lock:
+                            connects += 1
+                    with conn.cursor() as cursor:
+                        cursor.execute("SELECT 1")
+                    conn.close_if_unusable_or_obsolete()
+                    latencies.append(time.perf_counter() - started)
+            finally:
+                conn.close()  # back to the pool, or disconnect
+
+        # warm up (pool creation, first connect), then measure
+        worker(1)
+        latencies.clear()
+        connects = 0
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            share, extra = divmod(n, threads)
+            futures = [executor.submit(worker, share + (1 if i < extra else 0)) for i in range(threads)]
+            for future in futures:
+                future.result()
+        elapsed = time.perf_counter() - started
+
+        if settings_dict["OPTIONS"].get("pool"):
+            # checkouts are not connects: report the sockets the pool actually opened
+            conn = backend.DatabaseWrapper(settings_dict, alias)
+            connects = conn.pool.get_stats().get("connections_num", connects)
+            conn.close_pool()
+
+        return {
+            "mean_ms": statistics.fmean(latencies) * 1000,
+            "p95_ms": statistics.quantiles(latencies, n=20)[18] * 1000 if len(latencies) > 1 else latencies[0] * 1000,
+            "rps": len(latencies) / elapsed,
+            "connects": connects,
+        }
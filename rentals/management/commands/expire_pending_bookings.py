@@ -0,0 +1,26 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from rentals.booking_utils import expire_pending_bookings
+
+
+class Command(BaseCommand):
+    help = "Cancel unpaid PENDING bookings older than the hold window so their vehicles become bookable again"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hold-minutes", type=int, default=None,
+                            help="Hold window (default: settings.BOOKING_PENDING_HOLD_MINUTES)")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Bookings per UPDATE")
+        parser.add_argument("--loop", action="store_true", help="Keep sweeping instead of exiting after one pass")
+        parser.add_argument("--interval", type=float, default=60.0, help="Seconds between sweeps in --loop mode")
+
+    def handle(self, *args, **options):
+        hold = timedelta(minutes=options["hold_minutes"]) if options["hold_minutes"] is not None else None
+        while True:
+            expired = expire_pending_bookings(hold=hold, batch_size=options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"✅ Expired {expired} pending booking(s)"))
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from rentals.image_pipeline import ingest_images
+from rentals.models import VehicleImage
+
+
+class Command(BaseCommand):
+    help = "Fetch vehicle images into MEDIA_ROOT and render their WebP/JPEG variants"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true",
+                            help="Re-render images that already have variants (default: only new ones)")
+        parser.add_argument("--vehicle", type=int, action="append", help="Only this vehicle id (repeatable)")
+        parser.add_argument("--workers", type=int, default=None,
+                            help="Rendering processes (default: one per CPU, 0: render in this process)")
+        parser.add_argument("--fetch-threads", type=int, default=8, help="Concurrent downloads")
+        parser.add_argument("--window", type=int, default=32,
+                            help="Images fetched and rendered at a time; bounds memory use")
+
+    def handle(self, *args, **options):
+        images = VehicleImage.objects.order_by("id")
+        if not options["all"]:
+            images = images.filter(variants={})
+        if options["vehicle"]:
+            images = images.filter(vehicle_id__in=options["vehicle"])
+
+        started = time.perf_counter()
+        ingested, failed = ingest_images(
+            images, workers=options["workers"], fetch_threads=options["fetch_threads"],
+            window=options["window"],
+            log=lambda message: self.stderr.write(f"⚠️ {message}"),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Ingested {ingested} image(s), {failed} failed in {time.perf_counter() - started:.1f}s"
+        ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from rentals.models import Payment
+from rentals.stripe_utils import refund_payment
+
+
+class Command(BaseCommand):
+    help = "Retry Stripe refunds for payments captured after their booking was cancelled (status REFUND_DUE)"
+
+    def handle(self, *args, **options):
+        due = list(Payment.objects.filter(status='REFUND_DUE').values_list('id', flat=True))
+        refunded = sum(refund_payment(payment_id) for payment_id in due)
+        self.stdout.write(self.style.SUCCESS(f"✅ Refunded {refunded} of {len(due)} payment(s)"))
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from rentals.analytics import rollup_daily_stats
+
+
+class Command(BaseCommand):
+    help = "Update the BookingDailyStats rollup, reprocessing only the vehicle-days touched since the last run"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true",
+                            help="Rebuild the whole table (also needed after bookings are deleted)")
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Rows per read/insert batch")
+        parser.add_argument("--loop", action="store_true", help="Keep rolling up instead of exiting after one pass")
+        parser.add_argument("--interval", type=float, default=300.0, help="Seconds between passes in --loop mode")
+
+    def handle(self, *args, **options):
+        full = options["full"]
+        while True:
+            started = time.perf_counter()
+            summary = rollup_daily_stats(full=full, chunk_size=options["chunk_size"])
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ {summary['mode'].capitalize()} rollup: {summary['bookings_scanned']} booking(s) read, "
+                f"{summary['rows_written']} daily row(s) written in {time.perf_counter() - started:.1f}s"
+            ))
+            if not options["loop"]:
+                break
+            full = False
+            time.sleep(options["interval"])
@@ -1,18 +1,67 @@
-from django.core.management.base import BaseCommand
+import time
+
+from django.core.management.base import BaseCommand, CommandError
 from rentals.models import Booking, Payment, VehicleImage, Vehicle
+from rentals.seeding import parse_mix, seed_fleet
 
 
 class Command(BaseCommand):
-    help = "Seed demo vehicles for ScootyGo project"
+    help = (
+        "Seed demo vehicles for ScootyGo project. With --vehicles/--bookings, generate a synthetic "
+        "fleet and booking history instead (e.g. --vehicles 50000 --bookings 5000000)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--vehicles", type=int, default=0, help="Synthetic vehicles to generate")
+        parser.add_argument("--bookings", type=int, default=0, help="Synthetic bookings (with payments) to generate")
+        parser.add_argument("--users", type=int, default=100, help="Customers the bookings are spread over")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed; same seed, same data")
+        parser.add_argument("--days", type=int, default=365, help="Days of booking history")
+        parser.add_argument("--future-days", type=int, default=30, help="Days of upcoming bookings")
+        parser.add_argument("--cancel-rate", type=float, default=0.15, help="Fraction of bookings cancelled")
+        parser.add_argument("--type-mix", default="scooty=0.6,bike=0.4", help="Vehicle type weights")
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Rows per bulk insert")
+        parser.add_argument("--prefix", default=None, help="Username prefix (default: seed<seed>)")
+        parser.add_argument("--append", action="store_true", help="Keep existing data instead of wiping it")
+
+    def handle(self, *args, **options):
+        if not options["append"]:
+            # Clean existing data
+            self.stdout.write("Deleting old data…")
+            Payment.objects.all().delete()
+            Booking.objects.all().delete()
+            VehicleImage.objects.all().delete()
+            Vehicle.objects.all().delete()
+
+        if options["vehicles"] or options["bookings"]:
+            self._seed_synthetic(options)
+        else:
+            self._seed_demo()
+
+    def _seed_synthetic(self, options):
+        if options["bookings"] and not options["vehicles"]:
+            raise CommandError("--bookings needs --vehicles: bookings are generated for the new vehicles only")
+        try:
+            type_mix = parse_mix(options["type_mix"], dict(Vehicle.TYPE_CHOICES))
+        except ValueError as e:
+            raise CommandError(f"--type-mix: {e}")
 
-    def handle(self, *args, **kwargs):
-        # Clean existing data
-        self.stdout.write("Deleting old data…")
-        Payment.objects.all().delete()
-        Booking.objects.all().delete()
-        VehicleImage.objects.all().delete()
-        Vehicle.objects.all().delete()
+        started = time.perf_counter()
+        # committed chunk by chunk: a multi-million-row run in one transaction would keep
+        # the whole dataset in the WAL and lose all of it to one late failure
+        summary = seed_fleet(
+            vehicles=options["vehicles"], bookings=options["bookings"], users=options["users"],
+            seed=options["seed"], days=options["days"], future_days=options["future_days"],
+            cancel_rate=options["cancel_rate"], type_mix=type_mix, chunk_size=options["chunk_size"],
+            prefix=options["prefix"], log=self.stdout.write if options["verbosity"] > 1 else lambda msg: None,
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Seeded {summary['vehicles']} vehicles, {summary['users']} users, "
+            f"{summary['bookings']} bookings, {summary['payments']} payments in {elapsed:.1f}s"
+        ))
 
+    def _seed_demo(self):
         demo_vehicles = [
             {
                 "vehicle_type": "scooty",
@@ -53,3 +102,4 @@ class Command(BaseCommand):
                 self.stdout.write(f" → Added image for {vehicle.model_name}: {url}")
 
         self.stdout.write(self.style.SUCCESS("✅ Demo vehicles seeded successfully!"))
+        self.stdout.write("Run `manage.py ingest_vehicle_images` to copy the images locally and build their variants.")
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from rentals.email_utils import send_queued_emails
+
+
+class Command(BaseCommand):
+    help = "Deliver queued booking emails from the outbox, reusing one mail connection per batch"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100, help="Emails per batch/connection")
+        parser.add_argument("--max-attempts", type=int, default=5, help="Give up on an email after this many failures")
+        parser.add_argument("--loop", action="store_true", help="Keep polling instead of exiting when the outbox is drained")
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds to sleep between polls in --loop mode")
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = send_queued_emails(options["batch_size"], options["max_attempts"])
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                self.stdout.write(f"Batch: {sent} sent, {failed} failed")
+            if sent + failed >= options["batch_size"]:
+                continue  # more may be due right away
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Outbox drained: {total_sent} sent, {total_failed} failed"))
@@ -0,0 +1,18 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from rentals.template_warmup import warm_templates
+
+
+class Command(BaseCommand):
+    help = "Compile every template, as gunicorn workers do at start; exits non-zero if any fails"
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        compiled, failed = warm_templates()
+        if failed:
+            raise CommandError(f"❌ {failed} template(s) failed to compile (see the warnings above)")
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Compiled {compiled} template(s) in {time.perf_counter() - started:.2f}s"
+        ))
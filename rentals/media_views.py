@@ -0,0 +1,86 @@
+# rentals/media_views.py
+"""
+Production file serving for MEDIA_URL and STATIC_URL (Render has no front-end
+web server in front of gunicorn). Public files with a content hash in their
+name are cached for a year; everything is revalidated cheaply with
+ETag/Last-Modified and supports byte ranges. License documents are private:
+only their owner and staff may fetch them, and they are never stored by
+shared caches.
+"""
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import Http404
+from django.utils._os import safe_join
+from django.views.decorators.http import require_safe
+from rest_framework.exceptions import APIException
+
+from .authentication import CachedJWTAuthentication
+from .file_serving import serve_file
+from .models import User
+
+# `name.0123456789ab.ext`: collectstatic and the image pipeline both write these
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.[A-Za-z0-9]+$')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# unhashed names can change in place; the short max-age is backed by ETag revalidation
+REVALIDATE = 'public, max-age=3600'
+PRIVATE = 'private, no-cache'
+
+
+def _resolve(root, path):
+    """(name, full path) of an existing file under `root`, else Http404."""
+    name = posixpath.normpath(path).lstrip('/')
+    try:
+        full_path = safe_join(root, name)
+    except SuspiciousFileOperation:
+        raise Http404("Not found")
+    if not os.path.isfile(full_path):
+        raise Http404("Not found")
+    return name, full_path
+
+
+def _request_user(request):
+    """The session user, else the bearer-token user, else None."""
+    if request.user.is_authenticated:
+        return request.user
+    try:
+        result = CachedJWTAuthentication().authenticate(request)
+    except APIException:
+        return None
+    return result[0] if result else None
+
+
+def can_read_private(user, name):
+    if user is None:
+        return False
+    return user.is_staff or User.objects.filter(pk=user.pk, license_doc=name).exists()
+
+
+def _cache_control(name):
+    return IMMUTABLE if HASHED_NAME_RE.search(name) else REVALIDATE
+
+
+@require_safe
+def serve_media(request, path):
+    name, full_path = _resolve(settings.MEDIA_ROOT, path)
+    if name.startswith(settings.MEDIA_PRIVATE_PREFIXES):
+        # 404 rather than 403 so other users cannot probe which documents exist
+        if not can_read_private(_request_user(request), name):
+            raise Http404("Not found")
+        return serve_file(request, full_path, name, PRIVATE, vary=('Authorization', 'Cookie'), offload=True)
+    return serve_file(request, full_path, name, _cache_control(name), offload=True)
+
+
+@require_safe
+def serve_static(request, path):
+    name, full_path = _resolve(settings.STATIC_ROOT, path)
+    compressed = f'{full_path}.gz'
+    if not os.path.isfile(compressed):
+        return serve_file(request, full_path, name, _cache_control(name))
+    # ranges apply to the identity bytes, so a ranged request gets the plain file
+    if 'gzip' in request.headers.get('Accept-Encoding', '') and 'Range' not in request.headers:
+        return serve_file(request, compressed, name, _cache_control(name), encoding='gzip', vary=('Accept-Encoding',))
+    return serve_file(request, full_path, name, _cache_control(name), vary=('Accept-Encoding',))
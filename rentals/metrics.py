@@ -0,0 +1,150 @@
+# rentals/metrics.py
+"""
+In-process request metrics, exposed in Prometheus text format at /metrics.
+
+Counters live in the serving process: with several gunicorn workers each one
+reports its own totals, and Prometheus should scrape/aggregate per instance.
+"""
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+_requests = defaultdict(int)            # (view, method, status) -> count
+_latency = {}                           # view -> [bucket counts..., +Inf count, sum]
+_db_queries = defaultdict(int)          # view -> queries
+_db_seconds = defaultdict(float)        # view -> seconds
+_external_calls = defaultdict(int)      # service -> calls
+_external_seconds = defaultdict(float)  # service -> seconds
+
+# per-request accumulator, set by the middleware; copied into the sync_to_async
+# threads that run sync code under ASGI, so their queries land here too
+_request_stats = ContextVar('request_stats', default=None)
+
+
+class RequestStats:
+    """Timings gathered while one request is handled."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.external = defaultdict(float)  # service -> seconds
+
+    @property
+    def external_seconds(self):
+        return sum(self.external.values())
+
+
+def db_wrapper(execute, sql, params, many, context):
+    """
+    connection.execute_wrapper hook counting queries and their time for the
+    current request. Installed on every connection (see install_db_wrapper):
+    connections are per thread, and under ASGI a view's queries run on a
+    different thread than the middleware.
+    """
+    stats = _request_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.db_seconds += time.perf_counter() - started
+        stats.queries += 1
+
+
+def install_db_wrapper(sender, connection, **kwargs):
+    """connection_created receiver; a reconnect reuses the wrapper list, so add it once."""
+    if db_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(db_wrapper)
+
+
+def begin_request():
+    stats = RequestStats()
+    return stats, _request_stats.set(stats)
+
+
+def end_request(token):
+    _request_stats.reset(token)
+
+
+@contextmanager
+def track_external(service):
+    """Time a call to an external service (Stripe, SMTP, ...)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.external[service] += elapsed
+        with _lock:
+            _external_calls[service] += 1
+            _external_seconds[service] += elapsed
+
+
+def observe_request(view, method, status, duration, stats):
+    with _lock:
+        _requests[(view, method, str(status))] += 1
+        buckets = _latency.setdefault(view, [0] * (len(LATENCY_BUCKETS) + 1) + [0.0])
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if duration <= bound:
+                buckets[i] += 1
+        buckets[len(LATENCY_BUCKETS)] += 1
+        buckets[-1] += duration
+        _db_queries[view] += stats.queries
+        _db_seconds[view] += stats.db_seconds
+
+
+def reset():
+    with _lock:
+        for store in (_requests, _latency, _db_queries, _db_seconds, _external_calls, _external_seconds):
+            store.clear()
+
+
+def _labels(**labels):
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{k}="{escape(v)}"' for k, v in labels.items()) + '}'
+
+
+def render_prometheus():
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        lines.extend(samples)
+
+    with _lock:
+        metric('scootygo_http_requests_total', 'counter', 'HTTP requests handled.', [
+            f'scootygo_http_requests_total{_labels(view=v, method=m, status=s)} {n}'
+            for (v, m, s), n in sorted(_requests.items())
+        ])
+        samples = []
+        for view, buckets in sorted(_latency.items()):
+            for bound, count in zip(LATENCY_BUCKETS, buckets):
+                samples.append(f'scootygo_http_request_duration_seconds_bucket{_labels(view=view, le=bound)} {count}')
+            samples.append(f'scootygo_http_request_duration_seconds_bucket{_labels(view=view, le="+Inf")} {buckets[len(LATENCY_BUCKETS)]}')
+            samples.append(f'scootygo_http_request_duration_seconds_sum{_labels(view=view)} {buckets[-1]:.6f}')
+            samples.append(f'scootygo_http_request_duration_seconds_count{_labels(view=view)} {buckets[len(LATENCY_BUCKETS)]}')
+        metric('scootygo_http_request_duration_seconds', 'histogram', 'Request latency by view.', samples)
+        metric('scootygo_db_queries_total', 'counter', 'SQL queries issued by view.', [
+            f'scootygo_db_queries_total{_labels(view=v)} {n}' for v, n in sorted(_db_queries.items())
+        ])
+        metric('scootygo_db_query_seconds_total', 'counter', 'Time spent in SQL by view.', [
+            f'scootygo_db_query_seconds_total{_labels(view=v)} {s:.6f}' for v, s in sorted(_db_seconds.items())
+        ])
+        metric('scootygo_external_calls_total', 'counter', 'Calls to external services.', [
+            f'scootygo_external_calls_total{_labels(service=k)} {n}' for k, n in sorted(_external_calls.items())
+        ])
+        metric('scootygo_external_call_seconds_total', 'counter', 'Time spent calling external services.', [
+            f'scootygo_external_call_seconds_total{_labels(service=k)} {s:.6f}' for k, s in sorted(_external_seconds.items())
+        ])
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,73 @@
+# rentals/middleware.py
+import logging
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from . import metrics
+
+logger = logging.getLogger('rentals.request')
+
+
+class PerformanceMiddleware:
+    """
+    Measures each request: wall time, SQL query count and time, and time spent
+    in external calls wrapped with metrics.track_external(). Results go to the
+    Server-Timing header, the /metrics registry and one structured log line.
+    """
+
+    sync_capable = True
+    async_capable = True  # under ASGI, async views are not pushed through a sync thread
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    @contextmanager
+    def _measure(self):
+        # queries are counted by metrics.db_wrapper, which every connection carries
+        stats, token = metrics.begin_request()
+        try:
+            yield stats
+        finally:
+            metrics.end_request(token)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        with self._measure() as stats:
+            response = self.get_response(request)
+        return self._record(request, response, stats, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        with self._measure() as stats:
+            response = await self.get_response(request)
+        return self._record(request, response, stats, time.perf_counter() - started)
+
+    def _record(self, request, response, stats, duration):
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unmatched'
+        metrics.observe_request(view, request.method, response.status_code, duration, stats)
+
+        timings = [
+            f'app;dur={duration * 1000:.1f}',
+            f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries"',
+        ]
+        timings += [f'{service};dur={seconds * 1000:.1f}' for service, seconds in stats.external.items()]
+        response['Server-Timing'] = ', '.join(timings)
+
+        logger.info('request', extra={
+            'view': view,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 1),
+            'db_queries': stats.queries,
+            'db_ms': round(stats.db_seconds * 1000, 1),
+            'external_ms': round(stats.external_seconds * 1000, 1),
+        })
+        return response
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-17 21:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rentals', '0005_alter_vehicleimage_image'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['vehicle', 'status', 'start_time', 'end_time'], name='booking_vehicle_window_idx'),
+        ),
+    ]
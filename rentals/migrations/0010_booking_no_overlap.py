@@ -0,0 +1,41 @@
+from django.db import migrations
+
+# tstzrange GiST exclusion over live bookings; btree_gist provides the "=" operator class for vehicle_id.
+# The status list must match Booking.ACTIVE_STATUSES.
+CREATE_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS btree_gist",
+    """
+    ALTER TABLE rentals_booking ADD CONSTRAINT booking_no_overlap
+    EXCLUDE USING gist (
+        vehicle_id WITH =,
+        tstzrange(start_time, end_time, '[)') WITH &&
+    ) WHERE (status IN ('PENDING', 'CONFIRMED', 'ONGOING'))
+    """,
+]
+DROP_SQL = ["ALTER TABLE rentals_booking DROP CONSTRAINT IF EXISTS booking_no_overlap"]
+
+
+def add_constraint(apps, schema_editor):
+    # other backends keep the lock-and-check path in perform_create
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in CREATE_SQL:
+        schema_editor.execute(sql)
+
+
+def drop_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in DROP_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rentals', '0009_stripe_event'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_constraint, drop_constraint),
+    ]
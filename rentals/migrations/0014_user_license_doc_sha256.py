@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-17 21:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rentals', '0013_booking_daily_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='license_doc_sha256',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
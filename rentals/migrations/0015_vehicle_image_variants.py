@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-17 21:49
+
+import rentals.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rentals', '0014_user_license_doc_sha256'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vehicleimage',
+            name='file',
+            field=models.ImageField(blank=True, height_field='height', upload_to=rentals.models.vehicle_image_path, width_field='width'),
+        ),
+        migrations.AddField(
+            model_name='vehicleimage',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='vehicleimage',
+            name='variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='vehicleimage',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='vehicleimage',
+            name='image',
+            field=models.URLField(blank=True, max_length=500),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-17 22:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rentals', '0016_booking_status_start_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='payment',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'PENDING'), ('SUCCESS', 'SUCCESS'), ('FAILED', 'FAILED'), ('REFUNDED', 'REFUNDED'), ('REFUND_DUE', 'REFUND_DUE')], default='PENDING', max_length=30),
+        ),
+    ]
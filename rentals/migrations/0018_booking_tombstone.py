@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-17 22:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rentals', '0017_payment_refund_due'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_time', models.DateTimeField()),
+                ('end_time', models.DateTimeField()),
+                ('recorded_at', models.DateTimeField(auto_now_add=True)),
+                ('vehicle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='rentals.vehicle')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['recorded_at'], name='tombstone_recorded_idx')],
+            },
+        ),
+    ]
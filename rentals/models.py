@@ -8,6 +8,7 @@ class User(AbstractUser):
     phone_number = models.CharField(max_length=15, blank=True, null=True)
     driving_license_number = models.CharField(max_length=50, blank=True, null=True)
     license_doc = models.FileField(upload_to='licenses/', blank=True, null=True)
+    license_doc_sha256 = models.CharField(max_length=64, blank=True, default='')  # set on upload
     is_verified_driver = models.BooleanField(default=False)  # admin toggles
 
     def __str__(self):
@@ -26,13 +27,28 @@ class Vehicle(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # catalog listing / cursor pagination order
+            models.Index(fields=['is_active', '-created_at', '-id'], name='vehicle_active_created_idx'),
+        ]
+
     def __str__(self):
         return f"{self.brand} {self.model_name} ({self.vehicle_type})"
 
+def vehicle_image_path(instance, filename):
+    return f'vehicles/{instance.vehicle_id}/{filename}'
+
+
 class VehicleImage(models.Model):
     vehicle = models.ForeignKey(Vehicle, on_delete=models.CASCADE, related_name='images')
-    # For demo: use URLField instead of ImageField
-    image = models.URLField()
+    # source URL; `manage.py ingest_vehicle_images` fetches it once into `file`
+    image = models.URLField(blank=True, max_length=500)
+    file = models.ImageField(upload_to=vehicle_image_path, width_field='width', height_field='height', blank=True)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    # {"webp": {"320": "<storage name>", ...}, "jpeg": {...}}, filled by rentals.image_pipeline
+    variants = models.JSONField(default=dict, blank=True)
 
     def __str__(self):
         return f"Image for {self.vehicle}"
@@ -45,6 +61,9 @@ class Booking(models.Model):
         ('COMPLETED','Completed'),
         ('CANCELLED','Cancelled'),
     )
+    # statuses that hold the vehicle for their time window
+    ACTIVE_STATUSES = ('PENDING', 'CONFIRMED', 'ONGOING')
+
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='bookings')
     vehicle = models.ForeignKey(Vehicle, on_delete=models.PROTECT, related_name='bookings')
     start_time = models.DateTimeField()
@@ -52,6 +71,23 @@ class Booking(models.Model):
     total_price = models.DecimalField(max_digits=10, decimal_places=2)
     status = models.CharField(max_length=20, choices=STATUS, default='PENDING')
     created_at = models.DateTimeField(auto_now_add=True)
+    # bumped by save(); queryset .update() calls must set it too so rollup_stats sees the change
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # overlap checks and availability search: vehicle + status, then the time window
+            models.Index(fields=['vehicle', 'status', 'start_time', 'end_time'], name='booking_vehicle_window_idx'),
+            # cursor pagination of the admin list and of a user's own bookings
+            models.Index(fields=['-created_at', '-id'], name='booking_created_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='booking_user_created_idx'),
+            # expiry sweep of stale PENDING holds
+            models.Index(fields=['status', 'created_at'], name='booking_status_created_idx'),
+            # advance_bookings: CONFIRMED/ONGOING bookings that are due to start or end
+            models.Index(fields=['status', 'start_time'], name='booking_status_start_idx'),
+            # incremental daily rollup: bookings changed since the last run
+            models.Index(fields=['updated_at'], name='booking_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.vehicle} booked by {self.user} from {self.start_time} to {self.end_time}"
@@ -63,14 +99,122 @@ class Payment(models.Model):
         ('PENDING','PENDING'),
         ('SUCCESS','SUCCESS'),
         ('FAILED','FAILED'),
+        ('REFUNDED','REFUNDED'),
+        # captured by Stripe for a booking that could no longer be confirmed; must be refunded
+        ('REFUND_DUE','REFUND_DUE'),
     )
     booking = models.OneToOneField(Booking, on_delete=models.CASCADE, related_name='payment')
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     transaction_id = models.CharField(max_length=200, blank=True, null=True)
     stripe_session_id = models.CharField(max_length=255, blank=True, null=True)
     stripe_payment_intent = models.CharField(max_length=255, blank=True, null=True)
-    status = models.CharField(max_length=30, choices=STATUS_CHOICES, default='PENDING')  # PENDING / SUCCESS / FAILED
+    status = models.CharField(max_length=30, choices=STATUS_CHOICES, default='PENDING')  # PENDING / SUCCESS / FAILED / REFUNDED
+    # set when a paid booking is cancelled; penalty_amount is what was kept for a late cancel
+    refund_amount = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
+    penalty_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    refund_id = models.CharField(max_length=200, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at'], name='payment_updated_idx'),
+        ]
 
     def __str__(self):
         return f"Payment {self.amount} for {self.booking} - {self.status}"
+
+
+class StripeEvent(models.Model):
+    """Stripe webhook events already handled; redeliveries of the same id are acknowledged and skipped."""
+    event_id = models.CharField(max_length=255, primary_key=True)
+    type = models.CharField(max_length=100)
+    received_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.type} {self.event_id}"
+
+
+class EmailOutbox(models.Model):
+    """
+    Emails queued in the same transaction as the change that triggers them;
+    delivered by `manage.py send_queued_emails`.
+    """
+    STATUS_CHOICES = (
+        ('PENDING','PENDING'),
+        ('SENT','SENT'),
+        ('FAILED','FAILED'),
+    )
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255)
+    to = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            # worker picks up due PENDING rows in next_attempt_at order
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
+
+
+class BookingDailyStats(models.Model):
+    """
+    Per-vehicle, per-day booking totals (days in settings.TIME_ZONE), maintained
+    by `manage.py rollup_stats`. Bookings, revenue and cancellations count on the
+    day a booking starts; booked hours are split across the days they cover.
+    """
+    vehicle = models.ForeignKey(Vehicle, on_delete=models.CASCADE, related_name='daily_stats')
+    day = models.DateField()
+    bookings = models.PositiveIntegerField(default=0)
+    cancellations = models.PositiveIntegerField(default=0)
+    booked_hours = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['vehicle', 'day'], name='daily_stats_vehicle_day_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['day'], name='daily_stats_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.vehicle} on {self.day}"
+
+
+class BookingTombstone(models.Model):
+    """
+    A vehicle and time window a booking has left, by moving to another vehicle
+    or window or by being deleted. The next incremental rollup recomputes those
+    vehicle-days too, then clears the tombstones it has processed.
+    """
+    vehicle = models.ForeignKey(Vehicle, on_delete=models.CASCADE, related_name='+')
+    start_time = models.DateTimeField()
+    end_time = models.DateTimeField()
+    recorded_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['recorded_at'], name='tombstone_recorded_idx'),
+        ]
+
+    def __str__(self):
+        return f"Vehicle {self.vehicle_id} {self.start_time} - {self.end_time}"
+
+
+class RollupWatermark(models.Model):
+    """How far each incremental job has processed; rows changed after `processed_until` are picked up next run."""
+    name = models.CharField(max_length=50, primary_key=True)
+    processed_until = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.name} @ {self.processed_until}"
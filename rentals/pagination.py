@@ -0,0 +1,90 @@
+# rentals/pagination.py
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+
+POSITION_SEPARATOR = '|'
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Keyset pagination on (-created_at, -id): each page is an index range scan
+    from the cursor position, so page N costs the same as page 1.
+    Page size defaults to REST_FRAMEWORK['PAGE_SIZE']; clients may ask for a
+    different one with ?limit=, capped at max_page_size.
+
+    DRF's CursorPagination keys the cursor on the first ordering field only and
+    walks rows sharing its value with an OFFSET; bulk-created rows share
+    created_at by the thousand. Here the cursor holds every ordering field, so
+    positions are unique and the offset stays 0.
+    """
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'limit'
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        offset, reverse, current_position = self.cursor or (0, False, None)
+
+        ordering = _reverse_ordering(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if current_position is not None:
+            queryset = queryset.filter(self._after(queryset.model, ordering, current_position))
+
+        # one extra row tells whether a page follows
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = results[:self.page_size]
+        following_position = (
+            self._get_position_from_instance(results[-1], self.ordering) if len(results) > len(self.page) else None
+        )
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = current_position is not None or offset > 0
+            self.has_previous = following_position is not None
+            self.next_position, self.previous_position = current_position, following_position
+        else:
+            self.has_next = following_position is not None
+            self.has_previous = current_position is not None or offset > 0
+            self.next_position, self.previous_position = following_position, current_position
+
+        self.display_page_controls = (self.has_previous or self.has_next) and self.template is not None
+        return self.page
+
+    def _after(self, model, ordering, position):
+        """Rows strictly after `position` in `ordering`: (a, b) < (x, y) spelled out for the ORM."""
+        values = position.split(POSITION_SEPARATOR)
+        if len(values) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+        keys = []
+        for order, value in zip(ordering, values):
+            name = order.lstrip('-')
+            try:
+                value = model._meta.get_field(name).to_python(value)
+            except ValidationError:
+                raise NotFound(self.invalid_cursor_message)
+            keys.append((name, 'lt' if order.startswith('-') else 'gt', value))
+
+        after, equal = Q(), Q()
+        for name, lookup, value in keys:
+            after |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        # the leading bound alone lets the database start the index scan at the cursor
+        name, lookup, value = keys[0]
+        return Q(**{f'{name}__{lookup}e': value}) & after
+
+    def _get_position_from_instance(self, instance, ordering):
+        fields = [order.lstrip('-') for order in ordering]
+        if isinstance(instance, dict):
+            values = [instance[name] for name in fields]
+        else:
+            values = [getattr(instance, name) for name in fields]
+        return POSITION_SEPARATOR.join(str(value) for value in values)
@@ -0,0 +1,113 @@
+# rentals/pricing.py
+"""
+Booking prices.
+
+The base price is the cheapest mix of whole days (price_per_day) and started
+hours (price_per_hour) covering the rental. Rules listed in
+settings.PRICING_RULES then add adjustments on top of the base; each is a
+callable rule(vehicle, start, end, base) -> Decimal. The two shipped rules
+(weekend, surge) are neutral until their multipliers are configured.
+
+Everything that does not depend on the vehicle row itself is memoized on its
+inputs (prices and billed hours, the booking window, the vehicle type), so
+quoting a batch of vehicles over the same window costs a few dict lookups
+per vehicle.
+"""
+import math
+from datetime import datetime, time, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+CENT = Decimal('0.01')
+HOURS_PER_DAY = 24
+# Python weekday() numbers
+WEEKEND_DAYS = (5, 6)
+# longest rental that can be quoted or booked; weekend_share walks the window day by day
+MAX_RENTAL_DAYS = 92
+
+
+def billed_hours(start, end):
+    """Every started hour is billed."""
+    return math.ceil((end - start).total_seconds() / 3600.0)
+
+
+@lru_cache(maxsize=4096)
+def base_price(price_per_hour, price_per_day, hours):
+    """(amount, plan) for `hours` billed hours at the cheaper of hourly and daily rates."""
+    days, rest = divmod(hours, HOURS_PER_DAY)
+    # a part day costs whichever is less: its hours, or one more day
+    rest_price = min(price_per_hour * rest, price_per_day) if rest else Decimal('0')
+    amount = price_per_day * days + rest_price
+    hourly = price_per_hour * hours
+    if hourly <= amount:
+        return hourly, 'hourly'
+    return amount, 'daily' if rest_price in (0, price_per_day) else 'mixed'
+
+
+@lru_cache(maxsize=4096)
+def weekend_share(start, end):
+    """Fraction of [start, end) that falls on a local Saturday or Sunday."""
+    total = (end - start).total_seconds()
+    if total <= 0:
+        return 0.0
+    weekend = 0.0
+    current, end = timezone.localtime(start), timezone.localtime(end)
+    while current < end:
+        next_day = timezone.make_aware(datetime.combine(current.date() + timedelta(days=1), time.min))
+        slice_end = min(end, next_day)
+        if current.weekday() in WEEKEND_DAYS:
+            weekend += (slice_end - current).total_seconds()
+        current = slice_end
+    return weekend / total
+
+
+def weekend_rule(vehicle, start, end, base):
+    """PRICING_WEEKEND_MULTIPLIER applied to the weekend share of the rental."""
+    multiplier = Decimal(str(settings.PRICING_WEEKEND_MULTIPLIER))
+    if multiplier == 1:
+        return Decimal('0')
+    share = weekend_share(start, end)
+    return base * (multiplier - 1) * Decimal(share) if share else Decimal('0')
+
+
+def surge_rule(vehicle, start, end, base):
+    """PRICING_SURGE_MULTIPLIERS[vehicle_type] applied to the whole rental."""
+    multiplier = settings.PRICING_SURGE_MULTIPLIERS.get(vehicle.vehicle_type)
+    if not multiplier:
+        return Decimal('0')
+    return base * (Decimal(str(multiplier)) - 1)
+
+
+@lru_cache(maxsize=None)
+def _load_rules(paths):
+    return tuple((path.rsplit('.', 1)[-1].removesuffix('_rule'), import_string(path)) for path in paths)
+
+
+def pricing_rules():
+    """(name, callable) for every configured rule, in order."""
+    return _load_rules(tuple(settings.PRICING_RULES))
+
+
+def quote(vehicle, start, end):
+    """Price breakdown for renting `vehicle` over [start, end)."""
+    hours = billed_hours(start, end)
+    base, plan = base_price(vehicle.price_per_hour, vehicle.price_per_day, hours)
+    adjustments = {}
+    total = base
+    for name, rule in pricing_rules():
+        amount = rule(vehicle, start, end, base)
+        if amount:
+            amount = amount.quantize(CENT, rounding=ROUND_HALF_UP)
+            adjustments[name] = amount
+            total += amount
+    return {
+        'hours': hours,
+        'plan': plan,
+        'base': base.quantize(CENT),
+        'adjustments': adjustments,
+        'total_price': total.quantize(CENT),
+    }
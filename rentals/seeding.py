@@ -0,0 +1,178 @@
+# rentals/seeding.py
+"""
+Synthetic fleet and booking-history generator for demos, capacity tests and
+benchmarks. Everything is written with chunked bulk_create and driven by a
+seeded RNG, so the same arguments always produce the same data.
+"""
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from .booking_utils import calculate_total_price
+from .catalog_cache import invalidate_catalog
+from .vehicle_calendar import invalidate_vehicle_calendars
+from .models import Booking, Payment, User, Vehicle, VehicleImage
+
+DEMO_PASSWORD = 'scootygo-demo'
+
+CATALOGUE = {
+    'scooty': [('Honda', 'Activa 6G'), ('TVS', 'Jupiter'), ('Suzuki', 'Access 125'), ('Ather', '450X')],
+    'bike': [('Royal Enfield', 'Bullet 350'), ('Bajaj', 'Pulsar 150'), ('Hero', 'Splendor Plus'), ('KTM', 'Duke 200')],
+}
+HOURLY_RANGE = {'scooty': (60, 180), 'bike': (120, 300)}
+DURATION_HOURS = (1, 2, 3, 4, 6, 8, 12, 24, 48, 72)
+DURATION_WEIGHTS = (10, 20, 20, 15, 10, 8, 5, 7, 3, 2)
+
+
+def _bulk_create_backdated(model, objs):
+    """
+    bulk_create, then write back the generated created_at: auto_now_add
+    overwrites it with now() during the insert. Only these rows are touched,
+    so saves elsewhere in the process keep their own timestamps. One
+    executemany UPDATE; bulk_update's CASE expressions tripled seeding time.
+    """
+    created_at = [obj.created_at for obj in objs]
+    created = model.objects.bulk_create(objs)
+    connection = connections[router.db_for_write(model)]
+    field, qn = model._meta.get_field('created_at'), connection.ops.quote_name
+    sql = f'UPDATE {qn(model._meta.db_table)} SET {qn(field.column)} = %s WHERE {qn(model._meta.pk.column)} = %s'
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, [
+            (field.get_db_prep_value(value, connection), obj.pk) for obj, value in zip(created, created_at)
+        ])
+    for obj, value in zip(created, created_at):
+        obj.created_at = value
+    return created
+
+
+def parse_mix(value, allowed):
+    """'scooty=0.7,bike=0.3' -> {'scooty': 0.7, 'bike': 0.3}"""
+    mix = {}
+    for part in value.split(','):
+        key, _, weight = part.partition('=')
+        if key.strip() not in allowed:
+            raise ValueError(f"Unknown key {key!r}; expected one of {', '.join(allowed)}")
+        mix[key.strip()] = float(weight)
+    return mix
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def seed_fleet(vehicles, bookings, users=100, seed=0, days=365, future_days=30, cancel_rate=0.15,
+               type_mix=None, chunk_size=5000, prefix=None, log=lambda msg: None):
+    """
+    Create `vehicles` vehicles (one image each), `users` customers and about
+    `bookings` bookings with payments, spread over the last `days` days and
+    the next `future_days` days. Bookings of one vehicle never overlap, so the
+    data is valid under the PostgreSQL exclusion constraint. Existing rows are
+    left alone; bookings are only generated for the vehicles created here.
+    Each chunk commits on its own, rows and back-dating together, so a run
+    that fails part-way keeps what it has written and the transaction log
+    never holds more than one chunk.
+    Returns a summary dict including the new vehicle ids.
+    """
+    rng = random.Random(seed)
+    prefix = prefix or f'seed{seed}'
+    type_mix = type_mix or {'scooty': 0.6, 'bike': 0.4}
+    now = timezone.now()
+
+    # users: reuse any created by an earlier run with the same prefix
+    names = [f'{prefix}-user-{i}' for i in range(users)]
+    existing = {}
+    for chunk in _chunks(names, 500):
+        existing.update(User.objects.filter(username__in=chunk).values_list('username', 'pk'))
+    password = make_password(DEMO_PASSWORD)  # hash once, not per user
+    for chunk in _chunks([n for n in names if n not in existing], chunk_size):
+        created = User.objects.bulk_create([User(username=n, email=f'{n}@example.com', password=password) for n in chunk])
+        existing.update((u.username, u.pk) for u in created)
+    user_ids = [existing[n] for n in names]
+    log(f"Users: {len(user_ids)}")
+
+    # vehicles
+    types, weights = zip(*type_mix.items())
+    vehicle_objs = []
+    for i in range(vehicles):
+        vtype = rng.choices(types, weights)[0]
+        brand, model_name = rng.choice(CATALOGUE[vtype])
+        hourly = rng.randrange(*HOURLY_RANGE[vtype])
+        vehicle_objs.append(Vehicle(
+            vehicle_type=vtype, brand=brand, model_name=model_name,
+            plate_number=f"MH{rng.randrange(1, 50):02d}{rng.choice('ABCDEFGHJK')}{rng.choice('ABCDEFGHJK')}{rng.randrange(10000):04d}",
+            description=f"{brand} {model_name} #{i}",
+            price_per_hour=Decimal(hourly), price_per_day=Decimal(hourly * rng.randrange(8, 12)),
+            created_at=now - timedelta(days=days + rng.uniform(0, 30)),
+        ))
+    for chunk in _chunks(vehicle_objs, chunk_size):
+        with transaction.atomic():
+            created = _bulk_create_backdated(Vehicle, chunk)
+            VehicleImage.objects.bulk_create([
+                VehicleImage(vehicle=v, image=f'https://picsum.photos/seed/{prefix}-{v.pk}/640/480') for v in created
+            ])
+    log(f"Vehicles: {len(vehicle_objs)}")
+
+    # bookings: each vehicle's share is laid out in consecutive, non-overlapping slots
+    span_start = now - timedelta(days=days)
+    span = timedelta(days=days + future_days)
+    per_vehicle, extra = divmod(bookings, max(len(vehicle_objs), 1))
+    total_bookings = total_payments = 0
+    buffer = []
+
+    def flush():
+        nonlocal total_bookings, total_payments
+        if not buffer:
+            return
+        with transaction.atomic():
+            created = _bulk_create_backdated(Booking, buffer)
+            payments = _bulk_create_backdated(Payment, [
+                Payment(booking=b, amount=b.total_price, created_at=b.created_at,
+                        status={'PENDING': 'PENDING', 'CANCELLED': 'FAILED'}.get(b.status, 'SUCCESS'))
+                for b in created
+            ])
+        total_bookings += len(created)
+        total_payments += len(payments)
+        buffer.clear()
+        log(f"Bookings: {total_bookings}")
+
+    for index, vehicle in enumerate(vehicle_objs):
+        count = per_vehicle + (1 if index < extra else 0)
+        if not count:
+            continue
+        slot = span / count
+        for n in range(count):
+            duration = min(timedelta(hours=rng.choices(DURATION_HOURS, DURATION_WEIGHTS)[0]), slot)
+            start = span_start + slot * n + (slot - duration) * rng.random()
+            end = start + duration
+            if rng.random() < cancel_rate:
+                status = 'CANCELLED'
+            elif end <= now:
+                status = 'COMPLETED'
+            elif start <= now:
+                status = 'ONGOING'
+            else:
+                status = 'CONFIRMED' if rng.random() < 0.7 else 'PENDING'
+            buffer.append(Booking(
+                user_id=rng.choice(user_ids), vehicle=vehicle, start_time=start, end_time=end,
+                total_price=calculate_total_price(vehicle, start, end), status=status,
+                created_at=min(start - timedelta(hours=rng.uniform(1, 24 * 30)), now),
+            ))
+            if len(buffer) >= chunk_size:
+                flush()
+    flush()
+
+    # bulk_create skips the cache invalidation signals
+    invalidate_catalog()
+    invalidate_vehicle_calendars(v.pk for v in vehicle_objs)
+    return {
+        'users': len(user_ids),
+        'vehicles': len(vehicle_objs),
+        'vehicle_ids': [v.pk for v in vehicle_objs],
+        'bookings': total_bookings,
+        'payments': total_payments,
+    }
@@ -2,13 +2,38 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from .models import Vehicle, VehicleImage, Booking, Payment
 from django.utils import timezone
+from .image_pipeline import variant_urls
+from .pricing import MAX_RENTAL_DAYS
+from .upload_handlers import LICENSE_MAX_SIZE, SNIFF_BYTES, file_sha256, sniff_content_type
 
 User = get_user_model()
 
+
 # -------------------------
 # User serializers
 # -------------------------
-class UserRegisterSerializer(serializers.ModelSerializer):
+class LicenseDocMixin:
+    """license_doc checks and content hash, shared by registration and profile updates."""
+
+    def validate_license_doc(self, file):
+        # LicenseUploadHandler has usually checked these while streaming;
+        # repeated for files that came in through the default handlers
+        if file.size > LICENSE_MAX_SIZE:
+            raise serializers.ValidationError("File too big. Max size allowed is 5MB.")
+        header = file.read(SNIFF_BYTES)
+        file.seek(0)
+        content_type = sniff_content_type(header)
+        if content_type is None:
+            raise serializers.ValidationError("Unsupported file type. Allowed types: PDF, JPG, PNG.")
+        file.content_type = content_type
+        return file
+
+    def validate(self, attrs):
+        if attrs.get('license_doc'):
+            attrs['license_doc_sha256'] = file_sha256(attrs['license_doc'])
+        return attrs
+
+class UserRegisterSerializer(LicenseDocMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=6)
 
     class Meta:
@@ -22,29 +47,33 @@ class UserRegisterSerializer(serializers.ModelSerializer):
         user.save()
         return user
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(LicenseDocMixin, serializers.ModelSerializer):
     class Meta:
         model = User
-        fields = ('id','username','email','phone_number','driving_license_number','is_verified_driver','license_doc')
-        read_only_fields = ('is_verified_driver',)
-
-    def validate_license_doc(self, file):
-        max_size = 5 * 1024 * 1024  # 5MB limit
-        allowed_types = ['application/pdf', 'image/jpeg', 'image/png']
-
-        if file.size > max_size:
-            raise serializers.ValidationError("File too big. Max size allowed is 5MB.")
-        if file.content_type not in allowed_types:
-            raise serializers.ValidationError("Unsupported file type. Allowed types: PDF, JPG, PNG.")
-        return file
+        fields = ('id','username','email','phone_number','driving_license_number','is_verified_driver','license_doc',
+                  'license_doc_sha256')
+        read_only_fields = ('is_verified_driver','license_doc_sha256')
 
 # -------------------------
 # Vehicle serializers
 # -------------------------
 class VehicleImageSerializer(serializers.ModelSerializer):
+    # src/srcset point at the ingested copies (see image_pipeline); `image` stays the source URL
+    src = serializers.SerializerMethodField()
+    srcset = serializers.SerializerMethodField()
+
     class Meta:
         model = VehicleImage
-        fields = ('id','image')
+        fields = ('id','image','src','srcset','width','height')
+
+    def get_src(self, obj):
+        urls = variant_urls(obj).get('jpeg')
+        if urls:
+            return urls[-1][1]
+        return obj.file.url if obj.file else obj.image
+
+    def get_srcset(self, obj):
+        return {name: ', '.join(f'{url} {width}w' for width, url in urls) for name, urls in variant_urls(obj).items()}
 
 class VehicleSerializer(serializers.ModelSerializer):
     images = VehicleImageSerializer(many=True, read_only=True)
@@ -54,6 +83,13 @@ class VehicleSerializer(serializers.ModelSerializer):
         fields = ('id','vehicle_type','brand','model_name','plate_number','description',
                   'price_per_hour','price_per_day','is_active','images')
 
+def check_rental_window(start, end):
+    """Shared by bookings and quotes: pricing walks the window day by day, so its length is capped."""
+    if end <= start:
+        raise serializers.ValidationError("end_time must be after start_time.")
+    if end - start > timezone.timedelta(days=MAX_RENTAL_DAYS):
+        raise serializers.ValidationError(f"A rental may span at most {MAX_RENTAL_DAYS} days.")
+
 # -------------------------
 # Booking serializer
 # -------------------------
@@ -76,12 +112,51 @@ class BookingSerializer(serializers.ModelSerializer):
 
         if not start or not end:
             raise serializers.ValidationError("start_time and end_time are required.")
-        if end <= start:
-            raise serializers.ValidationError("end_time must be after start_time.")
+        check_rental_window(start, end)
         if start < timezone.now():
             raise serializers.ValidationError("start_time cannot be in the past.")
         return data
 
+# -------------------------
+# Bulk booking serializers
+# -------------------------
+class BulkBookingItemSerializer(serializers.Serializer):
+    # plain id: vehicles are fetched for the whole batch in one query by the view
+    vehicle = serializers.IntegerField()
+    start_time = serializers.DateTimeField()
+    end_time = serializers.DateTimeField()
+
+    def validate(self, data):
+        check_rental_window(data['start_time'], data['end_time'])
+        if data['start_time'] < timezone.now():
+            raise serializers.ValidationError("start_time cannot be in the past.")
+        return data
+
+class BulkBookingSerializer(serializers.Serializer):
+    MAX_ITEMS = 200
+    MODE_CHOICES = (
+        ('atomic', 'All or nothing'),
+        ('best_effort', 'Create whatever is available'),
+    )
+    mode = serializers.ChoiceField(choices=MODE_CHOICES, default='atomic')
+    bookings = serializers.ListField(child=serializers.DictField(), min_length=1, max_length=MAX_ITEMS)
+
+# -------------------------
+# Price quotes
+# -------------------------
+class QuoteWindowSerializer(serializers.Serializer):
+    # validated once per distinct window: a batch usually prices many vehicles over the same one
+    start_time = serializers.DateTimeField()
+    end_time = serializers.DateTimeField()
+
+    def validate(self, data):
+        check_rental_window(data['start_time'], data['end_time'])
+        return data
+
+class QuoteRequestSerializer(serializers.Serializer):
+    MAX_ITEMS = 1000
+    items = serializers.ListField(child=serializers.DictField(), min_length=1, max_length=MAX_ITEMS)
+
 # -------------------------
 # Payment serializer (mock)
 # -------------------------
@@ -0,0 +1,92 @@
+# rentals/signals.py
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from .authentication import invalidate_cached_user
+from .catalog_cache import invalidate_catalog
+from .models import Booking, BookingTombstone, User, Vehicle, VehicleImage
+from .vehicle_calendar import invalidate_vehicle_calendars
+
+
+@receiver([post_save, post_delete], sender=Vehicle)
+@receiver([post_save, post_delete], sender=VehicleImage)
+def vehicle_catalog_changed(sender, **kwargs):
+    # bump now, and again after commit so a read that raced the transaction
+    # cannot leave the pre-commit catalog cached
+    invalidate_catalog()
+    transaction.on_commit(invalidate_catalog)
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, **kwargs):
+    user_id = instance.pk
+    invalidate_cached_user(user_id)
+    transaction.on_commit(lambda: invalidate_cached_user(user_id))
+
+
+@receiver(post_init, sender=Booking)
+def booking_loaded(sender, instance, **kwargs):
+    # remembered so moving a booking to another vehicle also clears the old one's calendar,
+    # and a tombstone tells the rollup which days it left; read from __dict__ so deferred
+    # fields are not fetched
+    fields = instance.__dict__
+    instance._loaded_window = (fields.get('vehicle_id'), fields.get('start_time'), fields.get('end_time'))
+
+
+def _record_vacated_window(window):
+    vehicle_id, start_time, end_time = window
+    if vehicle_id is not None and start_time is not None and end_time is not None:
+        BookingTombstone.objects.create(vehicle_id=vehicle_id, start_time=start_time, end_time=end_time)
+
+
+@receiver(post_save, sender=Booking)
+def booking_saved(sender, instance, created, **kwargs):
+    loaded, current = instance._loaded_window, (instance.vehicle_id, instance.start_time, instance.end_time)
+    if not created and loaded != current:
+        _record_vacated_window(loaded)
+    invalidate_vehicle_calendars({instance.vehicle_id, loaded[0]})
+    instance._loaded_window = current
+
+
+@receiver(post_delete, sender=Booking)
+def booking_deleted(sender, instance, **kwargs):
+    _record_vacated_window((instance.vehicle_id, instance.start_time, instance.end_time))
+    invalidate_vehicle_calendars({instance.vehicle_id, instance._loaded_window[0]})
+
+
+def _delete_files_on_commit(names):
+    def delete_files():
+        for name in names:
+            default_storage.delete(name)
+
+    if names:
+        transaction.on_commit(delete_files)  # only once the row is really saved or gone
+
+
+@receiver(pre_save, sender=VehicleImage)
+def vehicle_image_replaced(sender, instance, raw=False, update_fields=None, **kwargs):
+    # a new file or source URL (e.g. from the admin inline) makes the old variants stale;
+    # store_rendered sets fresh variants in the same save and has removed the old files itself
+    if raw or instance.pk is None or (update_fields is not None and not {'file', 'image'} & set(update_fields)):
+        return
+    old = sender.objects.filter(pk=instance.pk).values('file', 'image', 'variants').first()
+    if old is None or old['variants'] != instance.variants:
+        return
+    file_changed = (old['file'] or '') != (instance.file.name or '')
+    if not file_changed and old['image'] == instance.image:
+        return
+    names = [name for names in old['variants'].values() for name in names.values()]
+    if file_changed and old['file']:
+        names.append(old['file'])
+    instance.variants = {}
+    _delete_files_on_commit(names)
+
+
+@receiver(post_delete, sender=VehicleImage)
+def vehicle_image_deleted(sender, instance, **kwargs):
+    names = [name for names in instance.variants.values() for name in names.values()]
+    if instance.file:
+        names.append(instance.file.name)
+    _delete_files_on_commit(names)
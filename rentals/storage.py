@@ -0,0 +1,53 @@
+# rentals/storage.py
+"""
+Static files storage: content-hashed names (so they can be cached forever)
+plus a gzip copy of every compressible file, written once by collectstatic
+instead of on each request.
+"""
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.txt', '.map', '.html', '.xml')
+# a .gz copy that saves less than this is not worth the extra file
+MIN_COMPRESSION_SAVING = 0.05
+
+
+def gzip_bytes(data):
+    # mtime=0 keeps the output (and so its ETag) stable across collectstatic runs
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    # templates still render before collectstatic has run (tests, a fresh checkout)
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:  # not collected yet: serve it unhashed
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        # unhashed originals stay servable too (short-cached), so compress both
+        for name in sorted({*self.hashed_files, *self.hashed_files.values()}):
+            if self._compress(name):
+                yield name, f'{name}.gz', True
+
+    def _compress(self, name):
+        if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+            return False
+        with self.open(name) as f:
+            data = f.read()
+        compressed = gzip_bytes(data)
+        if len(compressed) > len(data) * (1 - MIN_COMPRESSION_SAVING):
+            return False
+        if self.exists(f'{name}.gz'):
+            self.delete(f'{name}.gz')
+        self._save(f'{name}.gz', ContentFile(compressed))
+        return True
+
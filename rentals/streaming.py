@@ -0,0 +1,28 @@
+# rentals/streaming.py
+"""
+Streaming responses under ASGI. Django serves a StreamingHttpResponse (and so
+a FileResponse) over a synchronous iterator by collecting it into a list
+first, which turns a streamed export or file into one in-memory copy. Under
+ASGI the body is handed over as an async iterator instead, pulling one chunk
+at a time from the blocking iterator in the sync thread; under WSGI the
+response is left as it is.
+"""
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+_DONE = object()
+
+
+async def _async_chunks(chunks):
+    chunks = iter(chunks)
+    # thread-sensitive, like the view: a database cursor stays on the thread that opened it
+    next_chunk = sync_to_async(next)
+    while (chunk := await next_chunk(chunks, _DONE)) is not _DONE:
+        yield chunk
+
+
+def stream_for(request, response):
+    """Give `response` a body its server can stream; `request` may be a DRF Request."""
+    if isinstance(getattr(request, '_request', request), ASGIRequest) and response.streaming and not response.is_async:
+        response.streaming_content = _async_chunks(response.streaming_content)
+    return response
@@ -1,7 +1,19 @@
+import logging
 import stripe
 import environ
+from decimal import Decimal
 from pathlib import Path
 
+from django.db import transaction
+from django.utils import timezone
+
+from .email_utils import queue_booking_confirmation_email
+from .metrics import track_external
+from .models import Booking, Payment, StripeEvent
+from .transitions import InvalidTransition, transition
+
+logger = logging.getLogger(__name__)
+
 # -------------------------------------------------------------------
 # Load environment variables from project root (.env next to manage.py)
 # -------------------------------------------------------------------
@@ -57,3 +69,128 @@ def retrieve_event(payload, sig_header):
         payload, sig_header, STRIPE_WEBHOOK_SECRET
     )
     return event
+
+# -------------------------------------------------------------------
+# Shared by the sync (DRF) and async payment views
+# -------------------------------------------------------------------
+def create_booking_checkout_session(booking, payment):
+    """Blocking Stripe API call; async callers run it in a worker thread."""
+    with track_external('stripe'):
+        return stripe.checkout.Session.create(
+            payment_method_types=['card'],
+            line_items=[{
+                'price_data': {
+                    'currency': 'inr',
+                    'product_data': {
+                        'name': f'Booking #{booking.id} - {booking.vehicle}',
+                    },
+                    'unit_amount': int(round(float(payment.amount) * 100)),  # paise
+                },
+                'quantity': 1,
+            }],
+            mode='payment',
+            success_url=f"{DOMAIN}/my-bookings/?payment=success",
+            cancel_url=f"{DOMAIN}/my-bookings/?payment=cancel",
+            metadata={'booking_id': str(booking.id), 'payment_id': str(payment.id)}
+        )
+
+
+def expire_checkout_session(session_id):
+    """
+    Close a Checkout session so it can no longer be paid. True once it cannot
+    be paid (expired now or earlier), False if it was completed or Stripe
+    could not be reached; the caller must then leave the payment alone.
+    """
+    with track_external('stripe'):
+        try:
+            stripe.checkout.Session.expire(session_id)
+            return True
+        except stripe.InvalidRequestError:
+            # only open sessions can be expired: see which state it is in
+            try:
+                return stripe.checkout.Session.retrieve(session_id).status == 'expired'
+            except stripe.StripeError:
+                return False
+        except stripe.StripeError:
+            return False
+
+
+def refund_payment(payment_id):
+    """
+    Refund a REFUND_DUE payment in full through Stripe and mark it REFUNDED.
+    Safe to repeat: the idempotency key lets Stripe refund an intent only
+    once. Returns True once refunded; on failure the payment stays REFUND_DUE
+    for `manage.py refund_due_payments` to retry.
+    """
+    payment = Payment.objects.filter(pk=payment_id, status='REFUND_DUE').first()
+    if payment is None or not payment.stripe_payment_intent:
+        return False
+    intent = payment.stripe_payment_intent
+    try:
+        with track_external('stripe'):
+            refund = stripe.Refund.create(payment_intent=intent, idempotency_key=f'refund-{intent}')
+    except stripe.StripeError:
+        logger.exception("stripe.refund_failed", extra={"payment_id": payment_id})
+        return False
+    Payment.objects.filter(pk=payment_id, status='REFUND_DUE').update(
+        status='REFUNDED', refund_amount=payment.amount, penalty_amount=Decimal('0.00'), refund_id=refund.id,
+        updated_at=timezone.now(),
+    )
+    logger.info("stripe.refunded", extra={"payment_id": payment_id, "refund_id": refund.id})
+    return True
+
+
+def handle_stripe_event(event):
+    """Apply a verified webhook event exactly once."""
+    with transaction.atomic():
+        # claim the event id first: a redelivery finds the row and returns straight away
+        _, created = StripeEvent.objects.get_or_create(event_id=event['id'], defaults={'type': event['type']})
+        if not created:
+            logger.info("stripe_webhook.duplicate", extra={"event_id": event['id']})
+            return
+
+        if event['type'] == 'checkout.session.completed':
+            session = event['data']['object']
+            payment_id = session.get('metadata', {}).get('payment_id')
+
+            # lock the booking so a concurrent cancel cannot interleave with the confirmation
+            booking = (
+                Booking.objects.select_for_update(of=('self',))
+                .select_related('vehicle', 'user')
+                .filter(payment__id=payment_id)
+                .first()
+            )
+            if booking is None:
+                logger.warning("stripe_webhook.payment_missing", extra={"event_id": event['id'], "payment_id": payment_id})
+                return
+
+            intent = session.get('payment_intent')
+            payment = Payment.objects.select_for_update().get(pk=payment_id)
+            # settled by an earlier event for the same session: a later one must not refund again
+            if payment.status in ('SUCCESS', 'REFUND_DUE', 'REFUNDED'):
+                logger.info("stripe_webhook.already_settled", extra={
+                    "booking_id": booking.id, "payment_id": payment_id, "payment_status": payment.status,
+                })
+                return
+
+            # the booking decides: the payment only counts as SUCCESS if the booking could be confirmed
+            changed_at = timezone.now()
+            try:
+                transition(booking, 'CONFIRMED', changed_at)
+            except InvalidTransition:
+                # cancelled or expired while the customer was paying: the money goes back. Flag the
+                # payment now and refund it once the flag is committed, outside the row locks
+                Payment.objects.filter(pk=payment.pk).update(
+                    status='REFUND_DUE', transaction_id=intent, stripe_payment_intent=intent, updated_at=changed_at,
+                )
+                logger.warning("stripe_webhook.refund_due", extra={
+                    "booking_id": booking.id, "payment_id": payment_id, "booking_status": booking.status,
+                })
+                transaction.on_commit(lambda: refund_payment(payment.pk))
+                return
+
+            Payment.objects.filter(pk=payment.pk).update(
+                status='SUCCESS', transaction_id=intent, stripe_payment_intent=intent, updated_at=changed_at,
+            )
+            queue_booking_confirmation_email(booking)
+            logger.info("booking.confirmed", extra={"booking_id": booking.id, "payment_id": payment_id})
@@ -0,0 +1,55 @@
+# rentals/template_warmup.py
+"""
+Compile every template once at worker start so the cached template loader
+already holds them when the first request after a deploy arrives. Called
+from gunicorn's post_worker_init hook and by `manage.py warm_templates`.
+"""
+import logging
+import os
+
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_EXTENSIONS = ('.html', '.txt', '.xml')
+
+
+def _loader_dirs(loaders):
+    for loader in loaders:
+        if hasattr(loader, 'loaders'):  # the cached loader wraps the real ones
+            yield from _loader_dirs(loader.loaders)
+        elif hasattr(loader, 'get_dirs'):
+            yield from loader.get_dirs()
+
+
+def template_names(engine):
+    """Names of the template files its loaders can see, first directory winning."""
+    seen = set()
+    for directory in _loader_dirs(engine.template_loaders):
+        for root, _, files in os.walk(directory):
+            for filename in sorted(files):
+                if not filename.endswith(TEMPLATE_EXTENSIONS):
+                    continue
+                name = os.path.relpath(os.path.join(root, filename), directory).replace(os.sep, '/')
+                if name not in seen:
+                    seen.add(name)
+                    yield name
+
+
+def warm_templates():
+    """Compile all Django templates in this process. Returns (compiled, failed) counts."""
+    compiled = failed = 0
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        for name in template_names(backend.engine):
+            try:
+                backend.get_template(name)
+            except (TemplateDoesNotExist, TemplateSyntaxError) as e:
+                # e.g. a template for an app that is not installed; it fails on request too
+                failed += 1
+                logger.warning("template %s did not compile: %s", name, e)
+                continue
+            compiled += 1
+    return compiled, failed
@@ -0,0 +1,105 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ..models import Booking, Payment, Vehicle
+
+User = get_user_model()
+
+
+class AnalyticsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='u1', password='pass')
+        self.admin = User.objects.create_user(username='admin', password='pass', is_staff=True)
+        self.client.force_authenticate(self.admin)
+
+        self.start = timezone.now().replace(microsecond=0) - timedelta(days=10)
+        self.end = self.start + timedelta(days=10)
+        self.scooty = Vehicle.objects.create(vehicle_type='scooty', brand='Honda', model_name='Activa',
+                                             price_per_hour=50, price_per_day=400)
+        self.scooty2 = Vehicle.objects.create(vehicle_type='scooty', brand='TVS', model_name='Jupiter',
+                                              price_per_hour=50, price_per_day=400)
+        self.bike = Vehicle.objects.create(vehicle_type='bike', brand='RE', model_name='Bullet',
+                                           price_per_hour=100, price_per_day=800)
+
+        # 24h completed, paid
+        self._book(self.scooty, self.start + timedelta(days=1), hours=24, status='COMPLETED', paid='1000.00')
+        # starts 12h before the range: only 12h count towards utilization
+        self._book(self.scooty, self.start - timedelta(hours=12), hours=24, status='COMPLETED', paid='500.00')
+        # late cancel: 40 of 200 kept
+        self._book(self.scooty, self.start + timedelta(days=3), hours=4, status='CANCELLED', paid='200.00',
+                   payment_status='REFUNDED', penalty='40.00')
+        # outside the range entirely
+        self._book(self.scooty, self.start - timedelta(days=5), hours=4, status='COMPLETED', paid='999.00')
+        # 48h on the bike, pending payment: busy time but no revenue
+        self._book(self.bike, self.start + timedelta(days=2), hours=48, status='CONFIRMED', paid='900.00',
+                   payment_status='PENDING')
+
+    def _book(self, vehicle, start, hours, status, paid, payment_status='SUCCESS', penalty='0'):
+        booking = Booking.objects.create(user=self.user, vehicle=vehicle, start_time=start,
+                                         end_time=start + timedelta(hours=hours), total_price=Decimal(paid),
+                                         status=status)
+        Payment.objects.create(booking=booking, amount=Decimal(paid), status=payment_status,
+                               penalty_amount=Decimal(penalty))
+
+    def _params(self, **extra):
+        return {'from': self.start.isoformat(), 'to': self.end.isoformat(), **extra}
+
+    def test_vehicle_report(self):
+        with self.assertNumQueries(1):
+            resp = self.client.get('/api/admin/analytics/vehicles/', self._params())
+        self.assertEqual(resp.status_code, 200)
+        rows = {row['id']: row for row in resp.data['results']}
+
+        scooty = rows[self.scooty.pk]
+        self.assertEqual(scooty['booking_count'], 3)
+        self.assertEqual(scooty['cancelled_count'], 1)
+        self.assertEqual(scooty['late_cancel_count'], 1)
+        self.assertEqual(scooty['cancellation_rate'], round(1 / 3, 4))
+        self.assertEqual(scooty['booked_hours'], 36)
+        self.assertEqual(scooty['utilization_pct'], 15.0)  # 36h of 240h
+        self.assertEqual(scooty['revenue'], Decimal('1540.00'))
+        self.assertEqual(scooty['penalties'], Decimal('40.00'))
+        self.assertEqual(scooty['revenue_rank_in_type'], 1)
+
+        bike = rows[self.bike.pk]
+        self.assertEqual(bike['booked_hours'], 48)
+        self.assertEqual(bike['utilization_pct'], 20.0)
+        self.assertEqual(bike['revenue'], Decimal('0.00'))
+
+        idle = rows[self.scooty2.pk]
+        self.assertEqual((idle['booking_count'], idle['utilization_pct'], idle['cancellation_rate']), (0, 0.0, 0.0))
+        self.assertEqual(idle['revenue_rank_in_type'], 2)
+
+        self.assertEqual([row['id'] for row in resp.data['results']][0], self.scooty.pk)  # -revenue default
+
+    def test_vehicle_report_filters_and_ordering(self):
+        resp = self.client.get('/api/admin/analytics/vehicles/',
+                               self._params(vehicle_type='bike', order_by='-utilization'))
+        self.assertEqual([row['id'] for row in resp.data['results']], [self.bike.pk])
+
+        resp = self.client.get('/api/admin/analytics/vehicles/', self._params(order_by='-utilization', limit=1))
+        self.assertEqual([row['id'] for row in resp.data['results']], [self.bike.pk])
+
+        self.assertEqual(self.client.get('/api/admin/analytics/vehicles/', self._params(order_by='price')).status_code, 400)
+        self.assertEqual(self.client.get('/api/admin/analytics/vehicles/', {'from': 'yesterday'}).status_code, 400)
+
+    def test_type_report(self):
+        with self.assertNumQueries(1):
+            resp = self.client.get('/api/admin/analytics/types/', self._params())
+        rows = {row['vehicle_type']: row for row in resp.data['results']}
+        self.assertEqual(rows['scooty']['vehicles'], 2)
+        self.assertEqual(rows['scooty']['utilization_pct'], 7.5)  # 36h of 2 x 240h
+        self.assertEqual(rows['scooty']['revenue'], Decimal('1540.00'))
+        self.assertEqual(rows['bike']['vehicles'], 1)
+        self.assertEqual(rows['bike']['utilization_pct'], 20.0)
+
+    def test_admin_only(self):
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get('/api/admin/analytics/vehicles/').status_code, 403)
+        self.assertEqual(self.client.get('/api/admin/analytics/types/').status_code, 403)
@@ -0,0 +1,77 @@
+import json
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import AsyncRequestFactory, TestCase
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .. import async_views
+from ..models import Booking, EmailOutbox, Payment, StripeEvent, Vehicle
+
+User = get_user_model()
+
+
+class AsyncPaymentViewTests(TestCase):
+    def setUp(self):
+        self.factory = AsyncRequestFactory()
+        self.user = User.objects.create_user(username='u1', password='pass', email='u1@example.com')
+        self.vehicle = Vehicle.objects.create(
+            vehicle_type='scooty', brand='Honda', model_name='Activa',
+            price_per_hour=50, price_per_day=400, is_active=True
+        )
+        start = timezone.now() + timezone.timedelta(days=2)
+        self.booking = Booking.objects.create(
+            user=self.user, vehicle=self.vehicle, start_time=start,
+            end_time=start + timezone.timedelta(hours=4),
+            total_price=Decimal('200.00'), status='PENDING'
+        )
+        self.payment = Payment.objects.create(booking=self.booking, amount=self.booking.total_price)
+
+    def _checkout(self, token=None):
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        request = self.factory.post(f'/api/payments/create-checkout-session/{self.booking.pk}/', headers=headers)
+        return async_views.create_checkout_session(request, booking_id=self.booking.pk)
+
+    async def test_checkout_requires_token(self):
+        resp = await self._checkout()
+        self.assertEqual(resp.status_code, 401)
+
+    async def test_checkout_creates_session(self):
+        token = str(AccessToken.for_user(self.user))
+        with mock.patch('rentals.stripe_utils.stripe.checkout.Session.create',
+                        return_value=SimpleNamespace(id='cs_test_1')) as create:
+            resp = await self._checkout(token)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(json.loads(resp.content)['sessionId'], 'cs_test_1')
+        self.assertEqual(create.call_args.kwargs['line_items'][0]['price_data']['unit_amount'], 20000)
+        payment = await Payment.objects.aget(pk=self.payment.pk)
+        self.assertEqual(payment.stripe_session_id, 'cs_test_1')
+
+    async def test_checkout_rejects_other_users_booking(self):
+        other = await User.objects.acreate_user(username='u2', password='pass')
+        resp = await self._checkout(str(AccessToken.for_user(other)))
+        self.assertEqual(resp.status_code, 404)
+
+    async def test_webhook_confirms_booking(self):
+        event = {
+            'id': 'evt_async', 'type': 'checkout.session.completed',
+            'data': {'object': {'payment_intent': 'pi_1',
+                                'metadata': {'booking_id': str(self.booking.pk), 'payment_id': str(self.payment.pk)}}},
+        }
+        request = self.factory.post('/api/payments/webhook/', data=b'{}', content_type='application/json',
+                                    headers={'Stripe-Signature': 't=1,v1=sig'})
+        with mock.patch('rentals.async_views.stripe.Webhook.construct_event', return_value=event):
+            resp = await async_views.stripe_webhook(request)
+        self.assertEqual(resp.status_code, 200)
+        booking = await Booking.objects.aget(pk=self.booking.pk)
+        self.assertEqual(booking.status, 'CONFIRMED')
+        self.assertTrue(await StripeEvent.objects.filter(pk='evt_async').aexists())
+        self.assertEqual(await EmailOutbox.objects.acount(), 1)
+
+    async def test_webhook_rejects_bad_signature(self):
+        request = self.factory.post('/api/payments/webhook/', data=b'{}', content_type='application/json')
+        resp = await async_views.stripe_webhook(request)
+        self.assertEqual(resp.status_code, 400)
@@ -0,0 +1,61 @@
+from django.contrib.auth import get_user_model
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import router
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ..authentication import CachedJWTAuthentication
+
+User = get_user_model()
+
+
+class CachedJWTAuthenticationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='u1', password='pass', email='u1@example.com',
+                                             phone_number='12345')
+        self.client = APIClient()
+        token = self.client.post('/api/token/', {'username': 'u1', 'password': 'pass'}, format='json').data['access']
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + token)
+
+    def test_user_row_read_once(self):
+        with self.assertNumQueries(2):  # user + bookings
+            self.assertEqual(self.client.get('/api/bookings/').status_code, 200)
+        with self.assertNumQueries(1):  # bookings only
+            self.assertEqual(self.client.get('/api/bookings/').status_code, 200)
+
+    def test_cached_user_bound_to_routed_alias(self):
+        auth = CachedJWTAuthentication()
+        token = AccessToken.for_user(self.user)
+        auth.get_user(token)  # fills the cache
+        with mock.patch.object(router, 'db_for_read', return_value='replica') as db_for_read:
+            user = auth.get_user(token)
+        db_for_read.assert_called_once_with(User)
+        self.assertEqual(user._state.db, 'replica')
+
+    def test_save_invalidates(self):
+        self.client.get('/api/bookings/')
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/bookings/').status_code, 401)
+
+    def test_delete_invalidates(self):
+        self.client.get('/api/bookings/')
+        self.user.delete()
+        self.assertEqual(self.client.get('/api/bookings/').status_code, 401)
+
+    def test_profile_uses_full_row(self):
+        self.client.get('/api/bookings/')
+        resp = self.client.get('/api/auth/profile/')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data['phone_number'], '12345')
+
+        resp = self.client.patch('/api/auth/profile/', {'phone_number': '999'}, format='multipart')
+        self.assertEqual(resp.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.phone_number, '999')
+        self.assertEqual(self.user.email, 'u1@example.com')
@@ -0,0 +1,81 @@
+from django.test import TestCase
+from django.utils import timezone
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from ..models import Vehicle, Booking
+
+User = get_user_model()
+
+class AvailabilityTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='u1', password='pass', email='u1@example.com')
+
+        self.scooty = Vehicle.objects.create(
+            vehicle_type='scooty', brand='Honda', model_name='Activa',
+            price_per_hour=50, price_per_day=400, is_active=True
+        )
+        self.bike = Vehicle.objects.create(
+            vehicle_type='bike', brand='Royal Enfield', model_name='Bullet',
+            price_per_hour=200, price_per_day=2000, is_active=True
+        )
+        self.inactive = Vehicle.objects.create(
+            vehicle_type='scooty', brand='TVS', model_name='Jupiter',
+            price_per_hour=40, price_per_day=300, is_active=False
+        )
+        self.start = timezone.now() + timezone.timedelta(days=2)
+        self.end = self.start + timezone.timedelta(hours=4)
+
+    def _book(self, vehicle, start, end, status='CONFIRMED'):
+        return Booking.objects.create(
+            user=self.user, vehicle=vehicle, start_time=start, end_time=end,
+            total_price=Decimal('200.00'), status=status
+        )
+
+    def _available(self, **params):
+        params.setdefault('start', self.start.isoformat())
+        params.setdefault('end', self.end.isoformat())
+        resp = self.client.get('/api/vehicles/available/', params)
+        self.assertEqual(resp.status_code, 200)
+        return sorted(v['id'] for v in resp.json()['results'])
+
+    def test_lists_active_vehicles_without_bookings(self):
+        self.assertEqual(self._available(), sorted([self.scooty.id, self.bike.id]))
+
+    def test_overlapping_live_booking_excludes_vehicle(self):
+        self._book(self.scooty, self.start + timezone.timedelta(hours=1), self.end + timezone.timedelta(hours=1))
+        self.assertEqual(self._available(), [self.bike.id])
+
+    def test_cancelled_and_adjacent_bookings_do_not_block(self):
+        self._book(self.scooty, self.start, self.end, status='CANCELLED')
+        self._book(self.bike, self.end, self.end + timezone.timedelta(hours=2))
+        self.assertEqual(self._available(), sorted([self.scooty.id, self.bike.id]))
+
+    def test_filters(self):
+        self.assertEqual(self._available(vehicle_type='bike'), [self.bike.id])
+        self.assertEqual(self._available(max_price='100'), [self.scooty.id])
+
+    def test_max_price_must_be_finite(self):
+        for value in ('NaN', 'Infinity', '-inf', 'cheap'):
+            resp = self.client.get('/api/vehicles/available/', {
+                'start': self.start.isoformat(), 'end': self.end.isoformat(), 'max_price': value,
+            })
+            self.assertEqual(resp.status_code, 400, value)
+
+    def test_huge_max_price_means_no_limit(self):
+        everything = sorted([self.scooty.id, self.bike.id])
+        self.assertEqual(self._available(max_price='1e999'), everything)
+        self.assertEqual(self._available(max_price='99999999999'), everything)
+        self.assertEqual(self._available(max_price='-1e999'), [])
+
+    def test_runs_in_one_query(self):
+        self._book(self.scooty, self.start, self.end)
+        with self.assertNumQueries(2):  # vehicles + images of the single match
+            self._available()
+
+    def test_invalid_window(self):
+        resp = self.client.get('/api/vehicles/available/', {'start': self.end.isoformat(), 'end': self.start.isoformat()})
+        self.assertEqual(resp.status_code, 400)
+        resp = self.client.get('/api/vehicles/available/', {'start': 'tomorrow'})
+        self.assertEqual(resp.status_code, 400)
@@ -0,0 +1,53 @@
+from unittest import mock
+
+from django.db import IntegrityError
+from django.test import TestCase
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from ..models import Vehicle, Booking, Payment
+
+User = get_user_model()
+
+class BookingCreateTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='u1', password='pass', email='u1@example.com')
+        self.client.force_authenticate(self.user)
+        self.vehicle = Vehicle.objects.create(
+            vehicle_type='scooty', brand='Honda', model_name='Activa',
+            price_per_hour=50, price_per_day=400, is_active=True
+        )
+        self.start = timezone.now() + timezone.timedelta(days=2)
+        self.end = self.start + timezone.timedelta(hours=4)
+
+    def _create(self):
+        return self.client.post('/api/bookings/', {
+            'vehicle': self.vehicle.id,
+            'start_time': self.start.isoformat(),
+            'end_time': self.end.isoformat(),
+        }, format='json')
+
+    def test_create_and_reject_overlap(self):
+        self.assertEqual(self._create().status_code, 201)
+        self.assertEqual(Payment.objects.get().status, 'PENDING')
+        resp = self._create()
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_overlap_constraint_violation_is_a_validation_error(self):
+        # PostgreSQL path: the insert itself is what detects a racing booking
+        violation = IntegrityError('conflicting key value violates exclusion constraint "booking_no_overlap"')
+        with mock.patch('rentals.views.uses_overlap_constraint', return_value=True), \
+                mock.patch('rentals.views.has_overlap', return_value=False), \
+                mock.patch('rentals.serializers.BookingSerializer.save', side_effect=violation):
+            resp = self._create()
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn('non_field_errors', resp.json())
+
+    def test_other_integrity_errors_propagate(self):
+        with mock.patch('rentals.views.uses_overlap_constraint', return_value=True), \
+                mock.patch('rentals.views.has_overlap', return_value=False), \
+                mock.patch('rentals.serializers.BookingSerializer.save', side_effect=IntegrityError('other')):
+            with self.assertRaises(IntegrityError):
+                self._create()
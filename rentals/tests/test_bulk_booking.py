@@ -0,0 +1,76 @@
+from django.test import TestCase
+from django.utils import timezone
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from ..models import Vehicle, Booking, Payment
+
+User = get_user_model()
+
+class BulkBookingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='corp', password='pass', email='corp@example.com')
+        self.client.force_authenticate(self.user)
+        self.vehicles = [
+            Vehicle.objects.create(vehicle_type='scooty', brand='Honda', model_name=f'Activa {i}',
+                                   price_per_hour=50, price_per_day=400, is_active=True)
+            for i in range(3)
+        ]
+        self.start = timezone.now() + timezone.timedelta(days=2)
+        self.end = self.start + timezone.timedelta(hours=3)
+
+    def _item(self, vehicle, start=None, end=None):
+        return {'vehicle': vehicle.id if hasattr(vehicle, 'id') else vehicle,
+                'start_time': (start or self.start).isoformat(),
+                'end_time': (end or self.end).isoformat()}
+
+    def _bulk(self, items, mode='atomic'):
+        return self.client.post('/api/bookings/bulk/', {'mode': mode, 'bookings': items}, format='json')
+
+    def test_creates_all_bookings_and_payments(self):
+        resp = self._bulk([self._item(v) for v in self.vehicles])
+        self.assertEqual(resp.status_code, 201)
+        body = resp.json()
+        self.assertEqual(body['created'], 3)
+        self.assertEqual([r['status'] for r in body['results']], ['created'] * 3)
+        self.assertEqual(body['results'][0]['booking']['total_price'], '150.00')
+        self.assertEqual(Booking.objects.filter(status='PENDING').count(), 3)
+        self.assertEqual(Payment.objects.filter(amount=Decimal('150.00')).count(), 3)
+
+    def test_query_count_does_not_grow_with_batch(self):
+        with self.assertNumQueries(7):
+            self._bulk([self._item(v) for v in self.vehicles[:1]])
+        Booking.objects.all().delete()
+        with self.assertNumQueries(7):
+            self._bulk([self._item(v) for v in self.vehicles])
+
+    def test_atomic_mode_creates_nothing_on_conflict(self):
+        Booking.objects.create(user=self.user, vehicle=self.vehicles[1], start_time=self.start,
+                               end_time=self.end, total_price=Decimal('150.00'), status='CONFIRMED')
+        resp = self._bulk([self._item(v) for v in self.vehicles])
+        self.assertEqual(resp.status_code, 400)
+        results = resp.json()['results']
+        self.assertEqual([r['status'] for r in results], ['skipped', 'error', 'skipped'])
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_best_effort_reports_per_item(self):
+        Booking.objects.create(user=self.user, vehicle=self.vehicles[1], start_time=self.start,
+                               end_time=self.end, total_price=Decimal('150.00'), status='CONFIRMED')
+        items = [self._item(v) for v in self.vehicles] + [
+            self._item(self.vehicles[0]),  # overlaps an earlier item in the same batch
+            self._item(999999),
+            self._item(self.vehicles[2], start=self.end, end=self.start),
+        ]
+        resp = self._bulk(items, mode='best_effort')
+        self.assertEqual(resp.status_code, 201)
+        body = resp.json()
+        self.assertEqual([r['status'] for r in body['results']],
+                         ['created', 'error', 'created', 'error', 'error', 'error'])
+        self.assertEqual((body['created'], body['failed']), (2, 4))
+        self.assertIn('vehicle', body['results'][4]['errors'])
+        self.assertEqual(Booking.objects.filter(user=self.user, status='PENDING').count(), 2)
+
+    def test_batch_size_is_capped(self):
+        resp = self._bulk([self._item(self.vehicles[0])] * 201)
+        self.assertEqual(resp.status_code, 400)
@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ..booking_utils import expire_pending_bookings
+from ..models import Booking, Vehicle
+from ..vehicle_calendar import merge_intervals
+
+User = get_user_model()
+
+
+def local(day, hour):
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()) + timedelta(hours=hour))
+
+
+def ts(dt):
+    return int(dt.timestamp())
+
+
+class VehicleCalendarTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='u1', password='pass')
+        self.day = timezone.localdate() + timedelta(days=2)
+        self.scooty = Vehicle.objects.create(vehicle_type='scooty', brand='Honda', model_name='Activa',
+                                             price_per_hour=50, price_per_day=400)
+        self.bike = Vehicle.objects.create(vehicle_type='bike', brand='RE', model_name='Bullet',
+                                           price_per_hour=100, price_per_day=800)
+        # back to back, then one across midnight: a single busy block 09:00 -> 02:00
+        self._book(self.scooty, local(self.day, 9), local(self.day, 12))
+        self._book(self.scooty, local(self.day, 12), local(self.day, 20))
+        self._book(self.scooty, local(self.day, 19), local(self.day, 26))
+        self._book(self.scooty, local(self.day, 14), local(self.day, 15), status='CANCELLED')
+        self.bike_booking = self._book(self.bike, local(self.day, 10), local(self.day, 11))
+
+    def _book(self, vehicle, start, end, status='CONFIRMED'):
+        return Booking.objects.create(user=self.user, vehicle=vehicle, start_time=start, end_time=end,
+                                      total_price=Decimal('100.00'), status=status)
+
+    def _range(self, **extra):
+        return {'from': local(self.day, 0).isoformat(), 'to': local(self.day, 48).isoformat(), **extra}
+
+    def test_merge_intervals(self):
+        self.assertEqual(merge_intervals([(5, 7), (1, 3), (3, 4), (6, 9), (10, 11)]), [[1, 4], [5, 9], [10, 11]])
+
+    def test_busy_intervals_are_merged_and_cached(self):
+        url = f'/api/vehicles/{self.scooty.pk}/calendar/'
+        with self.assertNumQueries(2):  # vehicle exists + one range query
+            resp = self.client.get(url, self._range())
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data['busy'], [[ts(local(self.day, 9)), ts(local(self.day, 26))]])
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url, self._range()).data, resp.data)
+
+        # clipped to the requested window
+        resp = self.client.get(url, {'from': local(self.day, 10).isoformat(), 'to': local(self.day, 11).isoformat()})
+        self.assertEqual(resp.data['busy'], [[ts(local(self.day, 10)), ts(local(self.day, 11))]])
+
+    def test_booking_changes_invalidate(self):
+        url = f'/api/vehicles/{self.bike.pk}/calendar/'
+        self.assertEqual(len(self.client.get(url, self._range()).data['busy']), 1)
+
+        pending = self._book(self.bike, local(self.day, 30), local(self.day, 31), status='PENDING')
+        self.assertEqual(len(self.client.get(url, self._range()).data['busy']), 2)
+
+        # expiry is a queryset update, invalidated explicitly
+        Booking.objects.filter(pk=pending.pk).update(created_at=timezone.now() - timedelta(hours=2))
+        expire_pending_bookings()
+        self.assertEqual(len(self.client.get(url, self._range()).data['busy']), 1)
+
+        # moving a booking clears the old vehicle's calendar too
+        self.bike_booking.vehicle = self.scooty
+        self.bike_booking.save()
+        self.assertEqual(self.client.get(url, self._range()).data['busy'], [])
+
+    def test_batched_calendar(self):
+        self.scooty.is_active = False
+        self.scooty.save()
+        with self.assertNumQueries(2):
+            resp = self.client.get('/api/vehicles/calendar/', self._range(ids=f'{self.bike.pk},{self.scooty.pk},999'))
+        self.assertEqual(resp.data['results'],
+                         [{'vehicle': self.bike.pk, 'busy': [[ts(local(self.day, 10)), ts(local(self.day, 11))]]}])
+
+    def test_validation(self):
+        url = f'/api/vehicles/{self.bike.pk}/calendar/'
+        self.assertEqual(self.client.get(url, {'from': 'tomorrow'}).status_code, 400)
+        self.assertEqual(self.client.get(url, self._range(to=local(self.day, -1).isoformat())).status_code, 400)
+        self.assertEqual(self.client.get(url, self._range(to=local(self.day, 24 * 100).isoformat())).status_code, 400)
+        self.assertEqual(self.client.get('/api/vehicles/calendar/', {'ids': '1,x'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/vehicles/999/calendar/').status_code, 404)
+        self.assertEqual(self.client.get('/api/vehicles/abc/calendar/').status_code, 404)
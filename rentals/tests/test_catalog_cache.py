@@ -0,0 +1,52 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+from ..models import Vehicle, VehicleImage
+
+class CatalogCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.vehicle = Vehicle.objects.create(
+            vehicle_type='scooty', brand='Honda', model_name='Activa',
+            price_per_hour=50, price_per_day=400, is_active=True
+        )
+
+    def test_second_request_is_served_from_cache(self):
+        first = self.client.get('/api/vehicles/')
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/vehicles/')
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(first['ETag'], second['ETag'])
+
+    def test_if_none_match_returns_304(self):
+        etag = self.client.get('/api/vehicles/')['ETag']
+        resp = self.client.get('/api/vehicles/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp['ETag'], etag)
+        self.assertEqual(resp.content, b'')
+
+        resp = self.client.get(f'/api/vehicles/{self.vehicle.id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+
+    def test_query_params_are_cached_separately(self):
+        self.client.get('/api/vehicles/')
+        resp = self.client.get('/api/vehicles/?limit=1')
+        self.assertEqual(len(resp.json()['results']), 1)
+        self.assertIsNone(resp.json()['next'])
+
+    def test_vehicle_changes_invalidate(self):
+        etag = self.client.get('/api/vehicles/')['ETag']
+        self.vehicle.price_per_hour = 60
+        self.vehicle.save()
+        resp = self.client.get('/api/vehicles/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()['results'][0]['price_per_hour'], '60.00')
+
+        etag = resp['ETag']
+        VehicleImage.objects.create(vehicle=self.vehicle, image='https://example.com/a.jpg')
+        resp = self.client.get('/api/vehicles/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(len(resp.json()['results'][0]['images']), 1)
+
+        self.vehicle.delete()
+        self.assertEqual(self.client.get('/api/vehicles/').json()['results'], [])
@@ -0,0 +1,125 @@
+import threading
+from io import StringIO
+from unittest import mock
+
+import stripe
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from ..models import Vehicle, Booking, Payment
+from ..stripe_utils import handle_stripe_event
+from ..booking_utils import expire_pending_bookings
+
+User = get_user_model()
+
+@override_settings(BOOKING_PENDING_HOLD_MINUTES=30)
+class ExpirePendingBookingsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='u1', password='pass', email='u1@example.com')
+        self.vehicle = Vehicle.objects.create(
+            vehicle_type='scooty', brand='Honda', model_name='Activa',
+            price_per_hour=50, price_per_day=400, is_active=True
+        )
+        self.start = timezone.now() + timezone.timedelta(days=2)
+
+    def _booking(self, status='PENDING', age_minutes=0, payment_status='PENDING', slot=0):
+        start = self.start + timezone.timedelta(hours=3 * slot)
+        booking = Booking.objects.create(
+            user=self.user, vehicle=self.vehicle, start_time=start, end_time=start + timezone.timedelta(hours=2),
+            total_price=Decimal('100.00'), status=status
+        )
+        # created_at is auto_now_add; backdate it directly
+        Booking.objects.filter(pk=booking.pk).update(created_at=timezone.now() - timezone.timedelta(minutes=age_minutes))
+        Payment.objects.create(booking=booking, amount=booking.total_price, status=payment_status)
+        return booking
+
+    def test_expires_only_stale_pending(self):
+        stale = self._booking(age_minutes=45, slot=0)
+        fresh = self._booking(age_minutes=5, slot=1)
+        paid = self._booking(status='CONFIRMED', payment_status='SUCCESS', age_minutes=90, slot=2)
+
+        self.assertEqual(expire_pending_bookings(), 1)
+
+        statuses = dict(Booking.objects.values_list('id', 'status'))
+        self.assertEqual(statuses, {stale.id: 'CANCELLED', fresh.id: 'PENDING', paid.id: 'CONFIRMED'})
+        self.assertEqual(Payment.objects.get(booking=stale).status, 'FAILED')
+        self.assertEqual(Payment.objects.get(booking=paid).status, 'SUCCESS')
+
+    def test_batches(self):
+        for slot in range(5):
+            self._booking(age_minutes=60, slot=slot)
+        with self.assertNumQueries(3 * 5):  # 3 batches of: id select, savepoint, 2 UPDATEs, release
+            expired = expire_pending_bookings(batch_size=2)
+        self.assertEqual(expired, 5)
+
+    def test_command(self):
+        self._booking(age_minutes=20)
+        out = StringIO()
+        call_command('expire_pending_bookings', '--hold-minutes', '10', stdout=out)
+        self.assertIn('Expired 1', out.getvalue())
+
+    def _with_session(self, booking, session_id='cs_1'):
+        Payment.objects.filter(booking=booking).update(stripe_session_id=session_id)
+        return booking
+
+    def _completed_event(self, booking):
+        payment = Payment.objects.get(booking=booking)
+        return {'id': 'evt_1', 'type': 'checkout.session.completed', 'data': {'object': {
+            'payment_intent': 'pi_1', 'metadata': {'booking_id': str(booking.id), 'payment_id': str(payment.id)},
+        }}}
+
+    def test_session_paid_before_the_sweep_is_left_for_the_webhook(self):
+        booking = self._with_session(self._booking(age_minutes=45))
+        completed = mock.Mock(status='complete')
+        with mock.patch('rentals.stripe_utils.stripe.checkout.Session.expire',
+                        side_effect=stripe.InvalidRequestError('session is complete', None)), \
+                mock.patch('rentals.stripe_utils.stripe.checkout.Session.retrieve', return_value=completed):
+            self.assertEqual(expire_pending_bookings(batch_size=1), 0)
+        self.assertEqual(Payment.objects.get(booking=booking).status, 'PENDING')
+
+        handle_stripe_event(self._completed_event(booking))
+        self.assertEqual(Booking.objects.get(pk=booking.pk).status, 'CONFIRMED')
+        self.assertEqual(Payment.objects.get(booking=booking).status, 'SUCCESS')
+
+    def test_open_session_is_expired_before_the_booking(self):
+        booking = self._with_session(self._booking(age_minutes=45))
+        with mock.patch('rentals.stripe_utils.stripe.checkout.Session.expire') as expire:
+            self.assertEqual(expire_pending_bookings(), 1)
+        expire.assert_called_once_with('cs_1')
+        self.assertEqual(Payment.objects.get(booking=booking).status, 'FAILED')
+
+        # a completion racing the expiry still cannot keep the customer's money
+        handle_stripe_event(self._completed_event(booking))
+        self.assertEqual(Booking.objects.get(pk=booking.pk).status, 'CANCELLED')
+        self.assertEqual(Payment.objects.get(booking=booking).status, 'REFUND_DUE')
+
+    def test_stripe_unreachable_skips_the_booking(self):
+        booking = self._with_session(self._booking(age_minutes=45))
+        with mock.patch('rentals.stripe_utils.stripe.checkout.Session.expire',
+                        side_effect=stripe.APIConnectionError('down')):
+            self.assertEqual(expire_pending_bookings(), 0)
+        self.assertEqual(Booking.objects.get(pk=booking.pk).status, 'PENDING')
+
+    def test_sessions_are_closed_concurrently_and_skipped_rows_wait_for_the_next_sweep(self):
+        bookings = [self._with_session(self._booking(age_minutes=45, slot=slot), f'cs_{slot}') for slot in range(4)]
+        # both sessions of a batch must be in flight at once to get past the barrier
+        in_flight = threading.Barrier(2, timeout=5)
+
+        def expire(session_id):
+            in_flight.wait()
+            if session_id == 'cs_0':
+                raise stripe.APIConnectionError('down')
+
+        with mock.patch('rentals.stripe_utils.stripe.checkout.Session.expire', side_effect=expire) as stripe_expire:
+            self.assertEqual(expire_pending_bookings(batch_size=2), 3)
+        # the skipped booking is passed over for the rest of the sweep, not asked about again
+        self.assertEqual(stripe_expire.call_count, 4)
+        self.assertEqual(Booking.objects.get(pk=bookings[0].pk).status, 'PENDING')
+
+        with mock.patch('rentals.stripe_utils.stripe.checkout.Session.expire') as stripe_expire:
+            self.assertEqual(expire_pending_bookings(batch_size=2), 1)
+        stripe_expire.assert_called_once_with('cs_0')
+        self.assertEqual(Payment.objects.get(booking=bookings[0]).status, 'FAILED')
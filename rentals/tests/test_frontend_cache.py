@@ -0,0 +1,54 @@
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.template import engines
+from django.test import TestCase
+
+from ..template_warmup import template_names, warm_templates
+
+User = get_user_model()
+
+PAGES = ('/', '/vehicles/', '/login/', '/register/', '/profile/', '/my-bookings/', '/bookings/')
+
+
+class FrontendCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_pages_are_cached_whole(self):
+        for url in PAGES:
+            first = self.client.get(url)
+            self.assertEqual(first.status_code, 200)
+            self.assertIn('public', first['Cache-Control'])
+            self.assertIn('max-age=300', first['Cache-Control'])
+            # identical for every visitor, so nothing per-user in the cache key
+            self.assertNotIn('Cookie', first.get('Vary', ''))
+
+            again = self.client.get(url)
+            self.assertEqual(again.templates, [])  # served from the cache, not rendered
+            self.assertEqual(again.content, first.content)
+
+    def test_logged_in_visitor_shares_the_cached_page(self):
+        anonymous = self.client.get('/my-bookings/')
+        self.client.force_login(User.objects.create_user(username='u1', password='pass'))
+        with self.assertNumQueries(0):
+            shared = self.client.get('/my-bookings/')
+        self.assertEqual((shared.templates, shared.content), ([], anonymous.content))
+
+
+class TemplateWarmupTests(TestCase):
+    def test_compiles_project_and_app_templates(self):
+        names = list(template_names(engines['django'].engine))
+        self.assertIn('vehicles_list.html', names)
+        self.assertIn('admin/base.html', names)
+        self.assertEqual(len(names), len(set(names)))
+
+        compiled, failed = warm_templates()
+        self.assertEqual((compiled, failed), (len(names), 0))
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command('warm_templates', stdout=out)
+        self.assertIn('Compiled', out.getvalue())
@@ -0,0 +1,175 @@
+import io
+import shutil
+import tempfile
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from .. import image_pipeline
+from ..image_pipeline import ImageIngestError, ingest_images, render_variants
+from ..models import Vehicle, VehicleImage
+
+
+def encode(size, fmt='PNG', mode='RGBA', exif=None):
+    out = io.BytesIO()
+    image = Image.new(mode, size, (200, 30, 30, 128) if mode == 'RGBA' else (200, 30, 30))
+    if exif:
+        image.save(out, fmt, exif=exif)
+    else:
+        image.save(out, fmt)
+    return out.getvalue()
+
+
+class RenderVariantsTests(TestCase):
+    def test_widths_and_formats(self):
+        rendered = render_variants(encode((2000, 1000)))
+        self.assertEqual((rendered['format'], rendered['width'], rendered['height']), ('PNG', 2000, 1000))
+        for name, fmt in (('webp', 'WEBP'), ('jpeg', 'JPEG')):
+            self.assertEqual(sorted(rendered['variants'][name]), [320, 640, 1280])
+            small = Image.open(io.BytesIO(rendered['variants'][name][320]))
+            self.assertEqual((small.format, small.size), (fmt, (320, 160)))
+
+    def test_never_upscales(self):
+        rendered = render_variants(encode((500, 250), fmt='JPEG', mode='RGB'))
+        self.assertEqual(sorted(rendered['variants']['jpeg']), [320, 500])
+
+    def test_exif_rotation(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6  # rotate 90 degrees on display
+        rendered = render_variants(encode((800, 400), fmt='JPEG', mode='RGB', exif=exif))
+        self.assertEqual((rendered['width'], rendered['height']), (400, 800))
+        self.assertEqual(Image.open(io.BytesIO(rendered['variants']['jpeg'][320])).size, (320, 640))
+
+    def test_garbage(self):
+        with self.assertRaises(ImageIngestError):
+            render_variants(b'<html>not an image</html>')
+
+
+class IngestTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.vehicle = Vehicle.objects.create(vehicle_type='bike', brand='RE', model_name='Bullet',
+                                              price_per_hour=100, price_per_day=800)
+
+    def _uploaded(self, size=(1600, 900)):
+        image = VehicleImage(vehicle=self.vehicle)
+        image.file.save('upload.png', ContentFile(encode(size)))
+        return image
+
+    def test_ingest_in_process_and_serializer(self):
+        image = self._uploaded()
+        broken = VehicleImage(vehicle=self.vehicle)
+        broken.file.save('broken.png', ContentFile(b'nope'))
+
+        self.assertEqual(ingest_images([image, broken], workers=0, log=lambda message: None), (1, 1))
+        image.refresh_from_db()
+        self.assertEqual((image.width, image.height), (1600, 900))
+        self.assertEqual(sorted(image.variants['webp']), ['1280', '320', '640'])
+        for path in image.variants['jpeg'].values():
+            self.assertTrue(default_storage.exists(path))
+
+        data = APIClient().get(f'/api/vehicles/{self.vehicle.pk}/').json()['images'][0]
+        self.assertRegex(data['src'], rf'/{image.pk}-1280\.[0-9a-f]{{12}}\.jpg$')
+        self.assertRegex(data['srcset']['webp'].split(', ')[0],
+                         rf'^/media/vehicles/{self.vehicle.pk}/{image.pk}-320\.[0-9a-f]{{12}}\.webp 320w$')
+        self.assertRegex(image.file.name, rf'^vehicles/{self.vehicle.pk}/{image.pk}\.[0-9a-f]{{12}}\.png$')
+
+        paths = list(image.variants['webp'].values())
+        with self.captureOnCommitCallbacks(execute=True):
+            image.delete()
+        self.assertFalse(any(default_storage.exists(path) for path in paths))
+
+    def test_process_pool(self):
+        image = self._uploaded(size=(700, 700))
+        self.assertEqual(ingest_images([image], workers=1), (1, 0))
+        image.refresh_from_db()
+        self.assertEqual(sorted(image.variants['jpeg']), ['320', '640', '700'])
+
+    def test_works_through_bounded_windows(self):
+        images = [self._uploaded(size=(400, 300)) for _ in range(3)]
+        fetched, fetched_at_store = [], []
+        source_bytes, store = image_pipeline._source_bytes, image_pipeline.store_rendered
+
+        def counting_fetch(image):
+            fetched.append(image.pk)
+            return source_bytes(image)
+
+        def counting_store(*args):
+            fetched_at_store.append(len(fetched))
+            return store(*args)
+
+        with mock.patch.object(image_pipeline, '_source_bytes', counting_fetch), \
+                mock.patch.object(image_pipeline, 'store_rendered', counting_store):
+            self.assertEqual(ingest_images(images, workers=0, window=2, log=lambda message: None), (3, 0))
+        self.assertEqual(fetched_at_store, [2, 2, 3])  # the third source is read after the first two are stored
+
+    def test_crashed_render_worker_fails_its_window_only(self):
+        pools = []
+
+        class Pool:
+            """First pool behaves like one whose worker was killed; later ones render in-process."""
+            def __init__(self):
+                self.broken = not pools
+                pools.append(self)
+
+            def submit(self, fn, *args):
+                future = Future()
+                if self.broken:
+                    future.set_exception(BrokenProcessPool('A process in the process pool was terminated'))
+                else:
+                    future.set_result(fn(*args))
+                return future
+
+            def shutdown(self, **kwargs):
+                pass
+
+        images = [self._uploaded(size=(400, 300)) for _ in range(3)]
+        with mock.patch.object(image_pipeline, '_render_pool', lambda workers: Pool()):
+            self.assertEqual(ingest_images(images, workers=1, window=2, log=lambda message: None), (1, 2))
+        self.assertEqual(len(pools), 2)
+        images[2].refresh_from_db()
+        self.assertIn('webp', images[2].variants)
+
+    def test_remote_image_without_variants_falls_back_to_its_url(self):
+        VehicleImage.objects.create(vehicle=self.vehicle, image='https://example.com/bike.jpg')
+        data = APIClient().get(f'/api/vehicles/{self.vehicle.pk}/').json()['images'][0]
+        self.assertEqual((data['src'], data['srcset']), ('https://example.com/bike.jpg', {}))
+
+    def test_replacing_the_source_drops_stale_variants(self):
+        image = self._uploaded()
+        ingest_images([image], workers=0, log=lambda message: None)
+        image.refresh_from_db()
+        old = [image.file.name, *image.variants['webp'].values(), *image.variants['jpeg'].values()]
+
+        # what the admin inline does with a new upload
+        image.file = ContentFile(encode((800, 600)), name='replacement.png')
+        with self.captureOnCommitCallbacks(execute=True):
+            image.save()
+        image.refresh_from_db()
+        self.assertEqual(image.variants, {})
+        self.assertFalse(any(default_storage.exists(path) for path in old))
+        self.assertTrue(default_storage.exists(image.file.name))
+
+        ingest_images([image], workers=0, log=lambda message: None)
+        image.refresh_from_db()
+        self.assertEqual((image.width, image.height), (800, 600))
+        self.assertTrue(all(default_storage.exists(path) for path in image.variants['jpeg'].values()))
+
+        kept = image.file.name
+        image.image = 'https://example.com/other.jpg'
+        with self.captureOnCommitCallbacks(execute=True):
+            image.save()
+        image.refresh_from_db()
+        self.assertEqual((image.variants, image.file.name), ({}, kept))
+        self.assertTrue(default_storage.exists(kept))
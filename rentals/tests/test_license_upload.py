@@ -0,0 +1,69 @@
+import hashlib
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import StopFutureHandlers, StopUpload
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from ..upload_handlers import LICENSE_MAX_SIZE, LicenseUploadHandler
+
+User = get_user_model()
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 1000
+
+
+class LicenseUploadTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.user = User.objects.create_user(username='u1', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _upload(self, content, content_type='image/png'):
+        doc = SimpleUploadedFile('license.png', content, content_type=content_type)
+        return self.client.patch('/api/auth/profile/', {'license_doc': doc}, format='multipart')
+
+    def test_upload_is_sniffed_and_hashed(self):
+        # the client's content type is ignored in favour of the file's own signature
+        resp = self._upload(PNG, content_type='application/octet-stream')
+        self.assertEqual(resp.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.license_doc_sha256, hashlib.sha256(PNG).hexdigest())
+        self.assertEqual(resp.data['license_doc_sha256'], self.user.license_doc_sha256)
+        with self.user.license_doc.open('rb') as f:
+            self.assertEqual(f.read(), PNG)
+
+    def test_wrong_type_is_rejected(self):
+        resp = self._upload(b'MZ\x90\x00 not an image at all', content_type='image/png')
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn('Unsupported file type', resp.data['license_doc'][0])
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.license_doc)
+
+    def test_oversized_upload_is_rejected(self):
+        resp = self._upload(PNG + b'\x00' * LICENSE_MAX_SIZE)
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn('File too big', resp.data['license_doc'][0])
+
+    def test_handler_stops_at_the_limit(self):
+        handler = LicenseUploadHandler(max_size=100)
+        handler.new_file('other_file', 'a.txt', 'text/plain', None)
+        self.assertEqual(handler.receive_data_chunk(b'x' * 500, 0), b'x' * 500)  # not ours: passed on
+
+        with self.assertRaises(StopFutureHandlers):  # the default handlers never see it
+            handler.new_file('license_doc', 'l.png', 'image/png', None)
+        self.assertIsNone(handler.receive_data_chunk(PNG[:64], 0))
+        temp_path = handler.upload.temporary_file_path()
+        with self.assertRaises(StopUpload):
+            handler.receive_data_chunk(PNG[64:128], 64)
+        self.assertIsNone(handler.upload)
+        self.assertFalse(os.path.exists(temp_path))
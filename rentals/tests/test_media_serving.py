@@ -0,0 +1,178 @@
+import gzip
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import AsyncClient, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from ..file_serving import RangeNotSatisfiable, parse_range
+
+User = get_user_model()
+
+BODY = bytes(range(256)) * 40  # 10240 bytes
+
+
+def write(root, name, content):
+    path = os.path.join(root, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+
+
+def body(response):
+    return b''.join(response.streaming_content)
+
+
+class ParseRangeTests(TestCase):
+    def test_forms(self):
+        self.assertEqual(parse_range('bytes=0-99', 1000), (0, 99))
+        self.assertEqual(parse_range('bytes=900-', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=-100', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=990-5000', 1000), (990, 999))
+        self.assertEqual(parse_range('bytes=-5000', 1000), (0, 999))
+        # ignored: the whole file is sent
+        for header in (None, '', 'bytes=0-1,5-9', 'items=0-1', 'bytes=-'):
+            self.assertIsNone(parse_range(header, 1000))
+
+    def test_unsatisfiable(self):
+        for header in ('bytes=1000-', 'bytes=5-2', 'bytes=-0'):
+            with self.assertRaises(RangeNotSatisfiable):
+                parse_range(header, 1000)
+
+
+class MediaServingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        write(self.media, 'vehicles/1/7.0123456789ab.jpg', BODY)
+        write(self.media, 'vehicles/1/old.jpg', BODY)
+        write(self.media, 'licenses/owner.png', b'license')
+        self.owner = User.objects.create_user(username='owner', password='pass', license_doc='licenses/owner.png')
+        self.other = User.objects.create_user(username='other', password='pass')
+
+    def test_hashed_file_is_immutable_and_revalidates(self):
+        resp = self.client.get('/media/vehicles/1/7.0123456789ab.jpg')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(body(resp), BODY)
+        self.assertEqual(resp['Content-Type'], 'image/jpeg')
+        self.assertEqual(resp['Content-Length'], str(len(BODY)))
+        self.assertEqual(resp['Cache-Control'], 'public, max-age=31536000, immutable')
+
+        again = self.client.get('/media/vehicles/1/7.0123456789ab.jpg', HTTP_IF_NONE_MATCH=resp['ETag'])
+        self.assertEqual(again.status_code, 304)
+        since = self.client.get('/media/vehicles/1/7.0123456789ab.jpg', HTTP_IF_MODIFIED_SINCE=resp['Last-Modified'])
+        self.assertEqual(since.status_code, 304)
+
+        self.assertEqual(self.client.get('/media/vehicles/1/old.jpg')['Cache-Control'], 'public, max-age=3600')
+
+    def test_ranges(self):
+        resp = self.client.get('/media/vehicles/1/old.jpg', HTTP_RANGE='bytes=100-199')
+        self.assertEqual(resp.status_code, 206)
+        self.assertEqual(resp['Content-Range'], f'bytes 100-199/{len(BODY)}')
+        self.assertEqual(body(resp), BODY[100:200])
+
+        etag = resp['ETag']
+        stale = self.client.get('/media/vehicles/1/old.jpg', HTTP_RANGE='bytes=100-199', HTTP_IF_RANGE='"stale"')
+        self.assertEqual((stale.status_code, body(stale)), (200, BODY))
+        fresh = self.client.get('/media/vehicles/1/old.jpg', HTTP_RANGE='bytes=-10', HTTP_IF_RANGE=etag)
+        self.assertEqual((fresh.status_code, body(fresh)), (206, BODY[-10:]))
+
+        resp = self.client.get('/media/vehicles/1/old.jpg', HTTP_RANGE=f'bytes={len(BODY)}-')
+        self.assertEqual(resp.status_code, 416)
+        self.assertEqual(resp['Content-Range'], f'bytes */{len(BODY)}')
+
+    async def test_async_body_under_asgi(self):
+        client = AsyncClient()
+        whole = await client.get('/media/vehicles/1/old.jpg')
+        part = await client.get('/media/vehicles/1/old.jpg', headers={'Range': 'bytes=100-199'})
+        self.assertEqual((whole.is_async, part.is_async), (True, True))
+        self.assertEqual(b''.join([chunk async for chunk in whole.streaming_content]), BODY)
+        self.assertEqual(b''.join([chunk async for chunk in part.streaming_content]), BODY[100:200])
+
+    def test_missing_and_traversal(self):
+        self.assertEqual(self.client.get('/media/vehicles/1/nope.jpg').status_code, 404)
+        self.assertEqual(self.client.get('/media/vehicles/../../manage.py').status_code, 404)
+        self.assertEqual(self.client.get('/media/vehicles/1').status_code, 404)
+        self.assertEqual(self.client.post('/media/vehicles/1/old.jpg').status_code, 405)
+
+    @override_settings(MEDIA_OFFLOAD='x-accel-redirect', MEDIA_ACCEL_REDIRECT_PREFIX='/protected-media/')
+    def test_accel_redirect(self):
+        resp = self.client.get('/media/vehicles/1/old.jpg')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp['X-Accel-Redirect'], '/protected-media/vehicles/1/old.jpg')
+        self.assertEqual(resp.content, b'')
+        self.assertIn('ETag', resp)
+
+    @override_settings(MEDIA_OFFLOAD='x-sendfile')
+    def test_sendfile(self):
+        resp = self.client.get('/media/vehicles/1/old.jpg')
+        self.assertEqual(resp['X-Sendfile'], os.path.join(self.media, 'vehicles/1/old.jpg'))
+
+    def test_license_owner_and_staff_only(self):
+        url = '/media/licenses/owner.png'
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.get('/media/vehicles/../licenses/owner.png').status_code, 404)
+
+        self.client.force_login(self.other)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        self.client.force_login(self.owner)  # session, as in the admin
+        resp = self.client.get(url)
+        self.assertEqual((resp.status_code, body(resp)), (200, b'license'))
+        self.assertEqual(resp['Cache-Control'], 'private, no-cache')
+        self.assertIn('Authorization', resp['Vary'])
+
+        api = APIClient()
+        token = api.post('/api/token/', {'username': 'owner', 'password': 'pass'}, format='json').data['access']
+        api.credentials(HTTP_AUTHORIZATION='Bearer ' + token)
+        self.assertEqual(api.get(url).status_code, 200)
+        api.credentials(HTTP_AUTHORIZATION='Bearer garbage')
+        self.assertEqual(api.get(url).status_code, 404)
+
+        staff = User.objects.create_user(username='staff', password='pass', is_staff=True)
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+
+class StaticServingTests(TestCase):
+    def setUp(self):
+        self.static = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.static, ignore_errors=True)
+        override = override_settings(STATIC_ROOT=self.static)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_collectstatic_hashes_and_compresses(self):
+        call_command('collectstatic', interactive=False, verbosity=0)
+        hashed = [name for name in os.listdir(os.path.join(self.static, 'js'))
+                  if name.startswith('stripe_payment.') and name.endswith('.js') and name.count('.') == 2]
+        self.assertEqual(len(hashed), 1)
+        name = f'js/{hashed[0]}'
+        with open(os.path.join(self.static, name), 'rb') as f:
+            original = f.read()
+        with open(os.path.join(self.static, f'{name}.gz'), 'rb') as f:
+            self.assertEqual(gzip.decompress(f.read()), original)
+
+        resp = self.client.get(f'/static/{name}', HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(resp['Content-Encoding'], 'gzip')
+        self.assertEqual(resp['Content-Type'], 'text/javascript')
+        self.assertEqual(resp['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertIn('Accept-Encoding', resp['Vary'])
+        self.assertEqual(gzip.decompress(body(resp)), original)
+
+        plain = self.client.get(f'/static/{name}')
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertEqual(body(plain), original)
+        ranged = self.client.get(f'/static/{name}', HTTP_ACCEPT_ENCODING='gzip', HTTP_RANGE='bytes=0-9')
+        self.assertEqual((ranged.status_code, body(ranged)), (206, original[:10]))
+
+        self.assertEqual(self.client.get('/static/js/stripe_payment.js')['Cache-Control'], 'public, max-age=3600')
@@ -0,0 +1,60 @@
+import json
+import logging
+
+from django.test import AsyncClient, TestCase, override_settings
+from rest_framework.test import APIClient
+from ..models import Vehicle
+from .. import metrics
+from ..logging_utils import JsonFormatter
+
+class PerformanceMiddlewareTests(TestCase):
+    def setUp(self):
+        metrics.reset()
+        self.client = APIClient()
+        Vehicle.objects.create(
+            vehicle_type='scooty', brand='Honda', model_name='Activa',
+            price_per_hour=50, price_per_day=400, is_active=True
+        )
+
+    def test_server_timing_header(self):
+        resp = self.client.get('/api/vehicles/available/', {'start': '2099-01-01T10:00', 'end': '2099-01-01T12:00'})
+        timing = resp['Server-Timing']
+        self.assertIn('app;dur=', timing)
+        self.assertIn('db;dur=', timing)
+        self.assertIn('desc="2 queries"', timing)
+
+    async def test_server_timing_header_under_asgi(self):
+        # the view's queries run on a sync_to_async thread, not the middleware's
+        resp = await AsyncClient().get('/api/vehicles/available/',
+                                       {'start': '2099-01-01T10:00', 'end': '2099-01-01T12:00'})
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn('desc="2 queries"', resp['Server-Timing'])
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_metrics_endpoint(self):
+        self.client.get('/api/vehicles/available/', {'start': '2099-01-01T10:00', 'end': '2099-01-01T12:00'})
+        with metrics.track_external('stripe'):
+            pass
+        body = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer s3cret').content.decode()
+        self.assertIn('scootygo_http_requests_total{view="vehicles-available",method="GET",status="200"} 1', body)
+        self.assertIn('scootygo_http_request_duration_seconds_count{view="vehicles-available"} 1', body)
+        self.assertIn('scootygo_db_queries_total{view="vehicles-available"} 2', body)
+        self.assertIn('scootygo_external_calls_total{service="stripe"} 1', body)
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 401)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer s3cret').status_code, 200)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_metrics_without_token_only_in_debug(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+    def test_json_log_format(self):
+        record = logging.LogRecord('rentals.views', logging.INFO, __file__, 1, 'booking.confirmed', (), None)
+        record.booking_id = 7
+        line = json.loads(JsonFormatter().format(record))
+        self.assertEqual((line['level'], line['message'], line['booking_id']), ('INFO', 'booking.confirmed', 7))
@@ -0,0 +1,122 @@
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from ..models import Vehicle, Booking, Payment, EmailOutbox
+from ..email_utils import _claim_due_emails, queue_email, send_queued_emails
+
+User = get_user_model()
+
+
+class FlakyBackend(EmailBackend):
+    """locmem backend that fails the first `failures` sends and counts connection opens."""
+
+    def __init__(self, failures=0, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+        self.opened = 0
+        self.is_open = False
+
+    def open(self):
+        if self.is_open:
+            return False
+        self.is_open = True
+        self.opened += 1
+        return True
+
+    def close(self):
+        self.is_open = False
+
+    def send_messages(self, messages):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("SMTP down")
+        return super().send_messages(messages)
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class EmailOutboxTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='u1', password='pass', email='u1@example.com')
+        self.vehicle = Vehicle.objects.create(
+            vehicle_type='scooty', brand='Honda', model_name='Activa',
+            price_per_hour=50, price_per_day=400, is_active=True
+        )
+        start = timezone.now() + timezone.timedelta(days=2)
+        self.booking = Booking.objects.create(
+            user=self.user, vehicle=self.vehicle, start_time=start,
+            end_time=start + timezone.timedelta(hours=4),
+            total_price=Decimal('200.00'), status='PENDING'
+        )
+        Payment.objects.create(booking=self.booking, amount=self.booking.total_price, status='PENDING')
+
+    def test_cancel_queues_email_instead_of_sending(self):
+        self.client.force_authenticate(self.user)
+        resp = self.client.post(reverse('bookings-detail', kwargs={'pk': self.booking.id}) + 'cancel/')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(mail.outbox), 0)
+        queued = EmailOutbox.objects.get()
+        self.assertEqual(queued.to, ['u1@example.com'])
+        self.assertTrue(queued.subject.startswith('Booking Cancelled'))
+
+        self.assertEqual(send_queued_emails(), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, 'SENT')
+        self.assertIsNotNone(queued.sent_at)
+
+    def test_batch_reuses_one_connection(self):
+        for i in range(5):
+            queue_email(f'Hello {i}', 'body', ['x@example.com'])
+        backend = FlakyBackend()
+        self.assertEqual(send_queued_emails(batch_size=3, connection=backend), (3, 0))
+        self.assertEqual(backend.opened, 1)
+        self.assertEqual(EmailOutbox.objects.filter(status='PENDING').count(), 2)
+
+    def test_failed_send_is_retried_with_backoff(self):
+        email = queue_email('Hello', 'body', ['x@example.com'])
+        self.assertEqual(send_queued_emails(connection=FlakyBackend(failures=1)), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('PENDING', 1))
+        self.assertGreater(email.next_attempt_at, timezone.now())
+        self.assertIn('SMTP down', email.last_error)
+
+        # not due yet
+        self.assertEqual(send_queued_emails(connection=FlakyBackend()), (0, 0))
+
+        EmailOutbox.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(send_queued_emails(connection=FlakyBackend()), (1, 0))
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('SENT', 2))
+
+    def test_gives_up_after_max_attempts(self):
+        email = queue_email('Hello', 'body', ['x@example.com'])
+        send_queued_emails(max_attempts=1, connection=FlakyBackend(failures=1))
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'FAILED')
+
+    def test_claimed_rows_are_leased_not_locked_while_sending(self):
+        queue_email('Hello', 'body', ['x@example.com'])
+        seen_by_other_worker = []
+
+        class PeekingBackend(FlakyBackend):
+            def send_messages(self, messages):
+                # a second worker running now finds nothing due
+                seen_by_other_worker.extend(_claim_due_emails(batch_size=10))
+                return super().send_messages(messages)
+
+        self.assertEqual(send_queued_emails(connection=PeekingBackend()), (1, 0))
+        self.assertEqual(seen_by_other_worker, [])
+
+    def test_worker_that_dies_mid_send_leaves_the_row_to_its_lease(self):
+        email = queue_email('Hello', 'body', ['x@example.com'])
+        self.assertEqual(_claim_due_emails(batch_size=10), [email])  # claimed, then the worker is killed
+        self.assertEqual(send_queued_emails(connection=FlakyBackend()), (0, 0))
+
+        EmailOutbox.objects.update(next_attempt_at=timezone.now())  # the lease ran out
+        self.assertEqual(send_queued_emails(connection=FlakyBackend()), (1, 0))
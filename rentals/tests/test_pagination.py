@@ -0,0 +1,96 @@
+from base64 import b64decode, b64encode
+from urllib.parse import parse_qs, urlparse
+
+from django.test import TestCase
+from django.utils import timezone
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from ..models import Vehicle, Booking
+from ..pagination import CreatedAtCursorPagination
+
+User = get_user_model()
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='u1', password='pass', email='u1@example.com')
+        self.admin = User.objects.create_user(username='admin', password='pass', email='a@example.com', is_staff=True)
+        self.vehicle = Vehicle.objects.create(
+            vehicle_type='scooty', brand='Honda', model_name='Activa',
+            price_per_hour=50, price_per_day=400, is_active=True
+        )
+        start = timezone.now() + timezone.timedelta(days=1)
+        # bulk_create can give many rows the same created_at; the id tiebreaker keeps pages stable
+        self.bookings = Booking.objects.bulk_create([
+            Booking(user=self.user, vehicle=self.vehicle,
+                    start_time=start + timezone.timedelta(hours=3 * i),
+                    end_time=start + timezone.timedelta(hours=3 * i + 2),
+                    total_price=Decimal('100.00'), status='PENDING')
+            for i in range(45)
+        ])
+
+    def _walk(self, url):
+        seen = []
+        while url:
+            resp = self.client.get(url)
+            self.assertEqual(resp.status_code, 200)
+            data = resp.json()
+            self.assertNotIn('count', data)
+            seen.extend(b['id'] for b in data['results'])
+            url = data['next']
+        return seen
+
+    def test_walks_every_booking_once_newest_first(self):
+        self.client.force_authenticate(self.user)
+        seen = self._walk('/api/bookings/?limit=10')
+        expected = list(Booking.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_rows_sharing_created_at_are_walked_by_key_not_offset(self):
+        Booking.objects.update(created_at=timezone.now())
+        self.client.force_authenticate(self.user)
+        expected = list(Booking.objects.order_by('-id').values_list('id', flat=True))
+
+        url, pages = '/api/bookings/?limit=10', []
+        while url:
+            data = self.client.get(url).json()
+            pages.append(data)
+            url = data['next']
+            if url:
+                cursor = b64decode(parse_qs(urlparse(url).query)['cursor'][0]).decode()
+                self.assertNotIn('o=', cursor)
+        self.assertEqual([b['id'] for page in pages for b in page['results']], expected)
+
+        # and back again from the last page
+        seen, url = [], pages[-1]['previous']
+        while url:
+            data = self.client.get(url).json()
+            seen = [b['id'] for b in data['results']] + seen
+            url = data['previous']
+        self.assertEqual(seen + [b['id'] for b in pages[-1]['results']], expected)
+
+    def test_bad_cursor(self):
+        self.client.force_authenticate(self.user)
+        bad = b64encode(b'p=yesterday|1').decode()
+        self.assertEqual(self.client.get(f'/api/bookings/?cursor={bad}').status_code, 404)
+
+    def test_admin_list_is_paginated(self):
+        self.client.force_authenticate(self.admin)
+        resp = self.client.get('/api/admin/bookings/')
+        self.assertEqual(len(resp.json()['results']), 20)
+        self.assertIsNotNone(resp.json()['next'])
+
+    def test_limit_is_capped(self):
+        self.client.force_authenticate(self.admin)
+        Booking.objects.bulk_create([
+            Booking(user=self.user, vehicle=self.vehicle, start_time=b.start_time, end_time=b.end_time,
+                    total_price=b.total_price, status='CANCELLED')
+            for b in self.bookings * 3
+        ])
+        resp = self.client.get('/api/admin/bookings/?limit=100000')
+        self.assertEqual(len(resp.json()['results']), CreatedAtCursorPagination.max_page_size)
+
+    def test_vehicle_list_is_paginated(self):
+        resp = self.client.get('/api/vehicles/')
+        self.assertEqual([v['id'] for v in resp.json()['results']], [self.vehicle.id])
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ..booking_utils import calculate_total_price
+from ..models import Vehicle
+from ..pricing import MAX_RENTAL_DAYS, base_price, quote, weekend_share
+
+
+def local(day, hour=0):
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()) + timedelta(hours=hour))
+
+
+class PricingTests(TestCase):
+    def setUp(self):
+        self.bike = Vehicle.objects.create(vehicle_type='bike', brand='RE', model_name='Bullet',
+                                           price_per_hour=Decimal('100.00'), price_per_day=Decimal('800.00'))
+        today = timezone.localdate()
+        self.monday = today + timedelta(days=7 - today.weekday())
+        self.saturday = self.monday + timedelta(days=5)
+
+    def test_base_price_takes_the_cheaper_plan(self):
+        hourly, day = Decimal('100'), Decimal('800')
+        self.assertEqual(base_price(hourly, day, 3), (Decimal('300'), 'hourly'))
+        self.assertEqual(base_price(hourly, day, 10), (Decimal('800'), 'daily'))
+        self.assertEqual(base_price(hourly, day, 72), (Decimal('2400'), 'daily'))
+        self.assertEqual(base_price(hourly, day, 26), (Decimal('1000'), 'mixed'))  # a day + 2 hours
+        self.assertEqual(base_price(hourly, day, 33), (Decimal('1600'), 'daily'))  # 9 spare hours cost a day
+
+    def test_three_day_rental_is_billed_in_days(self):
+        start = local(self.monday, 10)
+        self.assertEqual(calculate_total_price(self.bike, start, start + timedelta(days=3)), Decimal('2400.00'))
+        # a started hour is still billed
+        self.assertEqual(calculate_total_price(self.bike, start, start + timedelta(minutes=61)), Decimal('200.00'))
+
+    def test_weekend_share(self):
+        self.assertEqual(weekend_share(local(self.monday, 9), local(self.monday, 12)), 0.0)
+        self.assertEqual(weekend_share(local(self.saturday - timedelta(days=1), 12), local(self.saturday, 12)), 0.5)
+
+    @override_settings(PRICING_WEEKEND_MULTIPLIER='1.5', PRICING_SURGE_MULTIPLIERS={'bike': '1.1'})
+    def test_rules(self):
+        result = quote(self.bike, local(self.saturday, 9), local(self.saturday, 12))
+        self.assertEqual(result['base'], Decimal('300.00'))
+        self.assertEqual(result['adjustments'], {'weekend': Decimal('150.00'), 'surge': Decimal('30.00')})
+        self.assertEqual(result['total_price'], Decimal('480.00'))
+
+        weekday = quote(self.bike, local(self.monday, 9), local(self.monday, 12))
+        self.assertEqual(weekday['adjustments'], {'surge': Decimal('30.00')})
+
+    def test_quotes_endpoint(self):
+        scooty = Vehicle.objects.create(vehicle_type='scooty', brand='Honda', model_name='Activa',
+                                        price_per_hour=Decimal('50.00'), price_per_day=Decimal('400.00'))
+        start = local(self.monday, 10)
+        items = [
+            {'vehicle': self.bike.pk, 'start_time': start.isoformat(), 'end_time': (start + timedelta(days=3)).isoformat()},
+            {'vehicle': scooty.pk, 'start_time': start.isoformat(), 'end_time': (start + timedelta(hours=2)).isoformat()},
+            {'vehicle': 999, 'start_time': start.isoformat(), 'end_time': (start + timedelta(hours=2)).isoformat()},
+            {'vehicle': scooty.pk, 'start_time': start.isoformat(), 'end_time': start.isoformat()},
+        ]
+        with self.assertNumQueries(1):
+            resp = APIClient().post('/api/quotes/', {'items': items}, format='json')
+        self.assertEqual(resp.status_code, 200)
+        bike, scooty_quote, unknown, invalid = resp.json()['results']
+        self.assertEqual((bike['status'], bike['plan'], bike['hours'], bike['total_price']), ('quoted', 'daily', 72, '2400.00'))
+        self.assertEqual(scooty_quote['total_price'], '100.00')
+        self.assertIn('vehicle', unknown['errors'])
+        self.assertEqual(invalid['status'], 'error')
+
+        self.assertEqual(APIClient().post('/api/quotes/', {'items': []}, format='json').status_code, 400)
+
+    @override_settings(PRICING_WEEKEND_MULTIPLIER=1.5)
+    def test_rental_length_is_capped(self):
+        start = local(self.monday, 10)
+        items = [
+            {'vehicle': self.bike.pk, 'start_time': start.isoformat(),
+             'end_time': (start + timedelta(days=MAX_RENTAL_DAYS)).isoformat()},
+            {'vehicle': self.bike.pk, 'start_time': start.isoformat(), 'end_time': '9999-12-31T00:00:00Z'},
+        ]
+        longest, endless = APIClient().post('/api/quotes/', {'items': items}, format='json').json()['results']
+        self.assertEqual(longest['status'], 'quoted')
+        self.assertEqual(endless['status'], 'error')
+        self.assertIn(f'at most {MAX_RENTAL_DAYS} days', str(endless['errors']))
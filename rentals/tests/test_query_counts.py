@@ -0,0 +1,77 @@
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from ..models import Vehicle, VehicleImage, Booking
+from .. import api_views
+
+User = get_user_model()
+
+PAGE_SIZE = settings.REST_FRAMEWORK['PAGE_SIZE']
+# lists are paginated: a full page, and one row more so a next page exists
+ROW_COUNTS = (1, PAGE_SIZE, PAGE_SIZE + 1)
+
+
+@override_settings(CATALOG_CACHE_TIMEOUT=0)  # measure the database path, not catalog cache hits
+class ListQueryCountTests(TestCase):
+    """List endpoints must issue a constant number of queries however many rows they return."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create_user(username='u1', password='pass', email='u1@example.com')
+        self.admin = User.objects.create_user(username='admin', password='pass', email='a@example.com', is_staff=True)
+
+    def _seed(self, n):
+        Booking.objects.all().delete()
+        VehicleImage.objects.all().delete()
+        Vehicle.objects.all().delete()
+        vehicles = Vehicle.objects.bulk_create([
+            Vehicle(vehicle_type='scooty', brand='Honda', model_name=f'Activa {i}',
+                    price_per_hour=50, price_per_day=400, is_active=True)
+            for i in range(n)
+        ])
+        VehicleImage.objects.bulk_create([
+            VehicleImage(vehicle=v, image=f'https://example.com/{v.pk}.jpg') for v in vehicles
+        ])
+        start = timezone.now() + timezone.timedelta(days=1)
+        Booking.objects.bulk_create([
+            Booking(user=self.user, vehicle=v, start_time=start, end_time=start + timezone.timedelta(hours=2),
+                    total_price=Decimal('100.00'), status='PENDING')
+            for v in vehicles
+        ])
+
+    def assertConstantQueries(self, expected, fetch):
+        for n in ROW_COUNTS:
+            with self.subTest(rows=n):
+                self._seed(n)
+                with self.assertNumQueries(expected):
+                    resp = fetch()
+                self.assertEqual(resp.status_code, 200)
+                self.assertEqual(len(resp.data['results']), min(n, PAGE_SIZE))
+                self.assertEqual(resp.data['next'] is not None, n > PAGE_SIZE)
+
+    def test_vehicle_list(self):
+        self.assertConstantQueries(2, lambda: self.client.get('/api/vehicles/'))
+
+    def test_booking_list(self):
+        self.client.force_authenticate(self.user)
+        self.assertConstantQueries(1, lambda: self.client.get('/api/bookings/'))
+
+    def test_admin_booking_list(self):
+        self.client.force_authenticate(self.admin)
+        self.assertConstantQueries(1, lambda: self.client.get('/api/admin/bookings/'))
+
+    def test_api_views_lists(self):
+        vehicle_list = api_views.VehicleViewSet.as_view({'get': 'list'})
+        booking_list = api_views.BookingViewSet.as_view({'get': 'list'})
+
+        def bookings():
+            request = self.factory.get('/bookings/')
+            force_authenticate(request, user=self.user)
+            return booking_list(request)
+
+        self.assertConstantQueries(2, lambda: vehicle_list(self.factory.get('/vehicles/')))
+        self.assertConstantQueries(1, bookings)
@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ..analytics import rollup_daily_stats
+from ..booking_utils import expire_pending_bookings
+from ..models import Booking, BookingDailyStats, BookingTombstone, Payment, Vehicle
+
+User = get_user_model()
+
+
+def local(day, hour):
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()) + timedelta(hours=hour))
+
+
+class DailyRollupTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='u1', password='pass')
+        self.day = timezone.localdate() - timedelta(days=5)
+        self.scooty = Vehicle.objects.create(vehicle_type='scooty', brand='Honda', model_name='Activa',
+                                             price_per_hour=50, price_per_day=400)
+        self.bike = Vehicle.objects.create(vehicle_type='bike', brand='RE', model_name='Bullet',
+                                           price_per_hour=100, price_per_day=800)
+        # 20:00 -> 02:00 next day: 4h on day one, 2h on day two
+        self.overnight = self._book(self.scooty, local(self.day, 20), hours=6, status='COMPLETED', paid='300.00')
+        self._book(self.scooty, local(self.day, 9), hours=2, status='CANCELLED', paid='100.00',
+                   payment_status='REFUNDED', penalty='20.00')
+        self._book(self.bike, local(self.day, 10), hours=3, status='COMPLETED', paid='300.00')
+
+    def _book(self, vehicle, start, hours, status, paid, payment_status='SUCCESS', penalty='0'):
+        booking = Booking.objects.create(user=self.user, vehicle=vehicle, start_time=start,
+                                         end_time=start + timedelta(hours=hours), total_price=Decimal(paid),
+                                         status=status)
+        Payment.objects.create(booking=booking, amount=Decimal(paid), status=payment_status,
+                               penalty_amount=Decimal(penalty))
+        return booking
+
+    def _stats(self, vehicle):
+        return {s.day: (s.bookings, s.cancellations, s.booked_hours, s.revenue)
+                for s in BookingDailyStats.objects.filter(vehicle=vehicle)}
+
+    def test_full_rollup_splits_hours_by_local_day(self):
+        summary = rollup_daily_stats()
+        self.assertEqual(summary['mode'], 'full')
+        self.assertEqual(self._stats(self.scooty), {
+            self.day: (2, 1, Decimal('4.00'), Decimal('320.00')),
+            self.day + timedelta(days=1): (0, 0, Decimal('2.00'), Decimal('0.00')),
+        })
+        self.assertEqual(self._stats(self.bike), {self.day: (1, 0, Decimal('3.00'), Decimal('300.00'))})
+
+    def test_incremental_rollup_reprocesses_only_touched_days(self):
+        rollup_daily_stats()
+        bike_row = BookingDailyStats.objects.get(vehicle=self.bike)
+
+        # an unpaid booking that the expiry sweep cancels through a queryset update
+        pending = self._book(self.scooty, local(self.day, 14), hours=1, status='PENDING', paid='50.00',
+                             payment_status='PENDING')
+        Booking.objects.filter(pk=pending.pk).update(created_at=timezone.now() - timedelta(hours=2))
+        self.assertEqual(expire_pending_bookings(), 1)
+
+        summary = rollup_daily_stats(overlap=timedelta(0))
+        self.assertEqual(summary['mode'], 'incremental')
+        self.assertEqual(summary['bookings_scanned'], 3)  # the scooty's bookings on the touched days only
+        self.assertEqual(self._stats(self.scooty)[self.day], (3, 2, Decimal('4.00'), Decimal('320.00')))
+        self.assertEqual(BookingDailyStats.objects.get(vehicle=self.bike).pk, bike_row.pk)  # not rewritten
+
+    def test_payment_change_alone_is_picked_up(self):
+        rollup_daily_stats()
+        payment = Payment.objects.get(booking__vehicle=self.bike)
+        payment.status = 'REFUNDED'
+        payment.save()
+        rollup_daily_stats()
+        self.assertEqual(self._stats(self.bike)[self.day][3], Decimal('0.00'))
+
+    def test_moved_and_deleted_bookings_leave_no_stale_days(self):
+        rollup_daily_stats()
+        self.overnight.vehicle = self.bike
+        self.overnight.start_time = local(self.day + timedelta(days=2), 9)
+        self.overnight.end_time = self.overnight.start_time + timedelta(hours=2)
+        self.overnight.save()
+
+        rollup_daily_stats(overlap=timedelta(0))
+        self.assertEqual(self._stats(self.scooty), {self.day: (1, 1, Decimal('0.00'), Decimal('20.00'))})
+        self.assertEqual(self._stats(self.bike)[self.day + timedelta(days=2)],
+                         (1, 0, Decimal('2.00'), Decimal('300.00')))
+        self.assertFalse(BookingTombstone.objects.exists())  # processed, with no overlap to keep it for
+
+        self.overnight.delete()
+        rollup_daily_stats()
+        self.assertNotIn(self.day + timedelta(days=2), self._stats(self.bike))
+        self.assertEqual(BookingTombstone.objects.count(), 1)  # still inside the next run's overlap
+
+    def test_nothing_changed(self):
+        rollup_daily_stats()
+        summary = rollup_daily_stats(overlap=timedelta(0))
+        self.assertEqual((summary['bookings_scanned'], summary['rows_written']), (0, 0))
+
+    def test_command_and_daily_endpoint(self):
+        call_command('rollup_stats', stdout=StringIO())
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='admin', password='pass', is_staff=True))
+        with self.assertNumQueries(2):  # watermark + one grouped read
+            resp = client.get('/api/admin/analytics/daily/', {'from': self.day.isoformat(),
+                                                              'to': (self.day + timedelta(days=1)).isoformat()})
+        self.assertEqual(resp.status_code, 200)
+        self.assertIsNotNone(resp.data['processed_until'])
+        first, second = resp.data['results']
+        self.assertEqual((first['day'], first['booking_count'], first['booked_hours'], first['revenue']),
+                         (self.day, 3, Decimal('7.00'), Decimal('620.00')))
+        self.assertEqual((second['booking_count'], second['booked_hours']), (0, Decimal('2.00')))
+
+        resp = client.get('/api/admin/analytics/daily/', {'from': self.day.isoformat(), 'vehicle_type': 'bike'})
+        self.assertEqual(resp.data['results'][0]['revenue'], Decimal('300.00'))
+        self.assertEqual(client.get('/api/admin/analytics/daily/', {'from': 'last week'}).status_code, 400)
@@ -0,0 +1,102 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from ..models import Booking, Payment, User, Vehicle, VehicleImage
+from ..seeding import seed_fleet
+
+
+class SeedFleetTests(TestCase):
+
+    def test_counts_and_payments(self):
+        summary = seed_fleet(vehicles=7, bookings=100, users=5, seed=1, chunk_size=16)
+        self.assertEqual(summary['bookings'], 100)
+        self.assertEqual(Vehicle.objects.count(), 7)
+        self.assertEqual(User.objects.count(), 5)
+        self.assertEqual(Booking.objects.count(), 100)
+        self.assertEqual(Payment.objects.count(), 100)
+        self.assertFalse(Payment.objects.filter(booking__status='CANCELLED').exclude(status='FAILED').exists())
+
+    def test_created_at_is_back_dated(self):
+        seed_fleet(vehicles=2, bookings=20, users=2, seed=1)
+        now = timezone.now()
+        for booking in Booking.objects.all():
+            self.assertLess(booking.created_at, min(booking.start_time, now))
+
+        for payment in Payment.objects.select_related('booking'):
+            self.assertEqual(payment.created_at, payment.booking.created_at)
+        for vehicle in Vehicle.objects.all():
+            self.assertLess(vehicle.created_at, now - timezone.timedelta(days=300))
+
+    def test_other_saves_keep_their_timestamp_while_seeding(self):
+        real_bulk_create = VehicleImage.objects.bulk_create
+        saved = []
+
+        def bulk_create_and_save_elsewhere(objs, *args, **kwargs):
+            # a save made by other code in this process, between seeding's inserts
+            saved.append(Vehicle.objects.create(vehicle_type='bike', brand='X', model_name='Y',
+                                                price_per_hour=1, price_per_day=1))
+            return real_bulk_create(objs, *args, **kwargs)
+
+        before = timezone.now()
+        with mock.patch.object(VehicleImage.objects, 'bulk_create', side_effect=bulk_create_and_save_elsewhere):
+            seed_fleet(vehicles=2, bookings=4, users=1, seed=1)
+        self.assertGreaterEqual(Vehicle.objects.get(pk=saved[0].pk).created_at, before)
+
+    def test_failure_keeps_the_chunks_already_written(self):
+        real_bulk_create = Payment.objects.bulk_create
+        calls = []
+
+        def fail_on_third_chunk(objs, *args, **kwargs):
+            calls.append(len(objs))
+            if len(calls) == 3:
+                raise RuntimeError('disk full')
+            return real_bulk_create(objs, *args, **kwargs)
+
+        with mock.patch.object(Payment.objects, 'bulk_create', side_effect=fail_on_third_chunk), \
+                self.assertRaises(RuntimeError):
+            seed_fleet(vehicles=2, bookings=40, users=2, seed=1, chunk_size=10)
+        # two whole chunks, each booking with its payment; the failed chunk left nothing behind
+        self.assertEqual((Booking.objects.count(), Payment.objects.count()), (20, 20))
+
+    def test_bookings_of_a_vehicle_never_overlap(self):
+        seed_fleet(vehicles=3, bookings=300, users=3, seed=2, days=5, future_days=1)
+        for vehicle in Vehicle.objects.all():
+            windows = list(vehicle.bookings.order_by('start_time').values_list('start_time', 'end_time'))
+            for (_, prev_end), (start, _) in zip(windows, windows[1:]):
+                self.assertLessEqual(prev_end, start)
+
+    def test_same_seed_same_data(self):
+        def snapshot():
+            return list(Booking.objects.order_by('vehicle__plate_number', 'start_time')
+                        .values_list('vehicle__plate_number', 'start_time', 'status', 'total_price'))
+
+        seed_fleet(vehicles=3, bookings=30, users=3, seed=5)
+        first = snapshot()
+        Payment.objects.all().delete()
+        Booking.objects.all().delete()
+        Vehicle.objects.all().delete()
+        seed_fleet(vehicles=3, bookings=30, users=3, seed=5)
+        # timestamps are relative to now(), so compare everything but their absolute values
+        self.assertEqual([(p, s, t) for p, _, s, t in first], [(p, s, t) for p, _, s, t in snapshot()])
+
+
+class SeedDemoCommandTests(TestCase):
+
+    def test_append_keeps_existing_data(self):
+        call_command('seed_demo', stdout=StringIO())
+        self.assertEqual(Vehicle.objects.count(), 2)
+        call_command('seed_demo', '--append', '--vehicles=4', '--bookings=40', '--users=3', stdout=StringIO())
+        call_command('seed_demo', '--append', '--vehicles=4', '--bookings=40', '--users=3', stdout=StringIO())
+        self.assertEqual(Vehicle.objects.count(), 10)
+        self.assertEqual(Booking.objects.count(), 80)
+        self.assertEqual(User.objects.count(), 3)  # same prefix, users reused
+
+    def test_without_append_wipes(self):
+        call_command('seed_demo', '--vehicles=4', '--bookings=10', stdout=StringIO())
+        call_command('seed_demo', stdout=StringIO())
+        self.assertEqual(Vehicle.objects.count(), 2)
+        self.assertEqual(Booking.objects.count(), 0)
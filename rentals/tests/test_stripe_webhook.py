@@ -0,0 +1,135 @@
+import io
+from unittest import mock
+
+import stripe
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from ..models import Vehicle, Booking, Payment, StripeEvent, EmailOutbox
+
+User = get_user_model()
+
+
+class StripeWebhookTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='u1', password='pass', email='u1@example.com')
+        self.vehicle = Vehicle.objects.create(
+            vehicle_type='scooty', brand='Honda', model_name='Activa',
+            price_per_hour=50, price_per_day=400, is_active=True
+        )
+        start = timezone.now() + timezone.timedelta(days=2)
+        self.booking = Booking.objects.create(
+            user=self.user, vehicle=self.vehicle, start_time=start,
+            end_time=start + timezone.timedelta(hours=4),
+            total_price=Decimal('200.00'), status='PENDING'
+        )
+        self.payment = Payment.objects.create(booking=self.booking, amount=self.booking.total_price, status='PENDING')
+
+    def _event(self, event_id='evt_1', event_type='checkout.session.completed'):
+        return {
+            'id': event_id,
+            'type': event_type,
+            'data': {'object': {
+                'payment_intent': 'pi_123',
+                'metadata': {'booking_id': str(self.booking.id), 'payment_id': str(self.payment.id)},
+            }},
+        }
+
+    def _deliver(self, event):
+        with mock.patch('rentals.views.stripe.Webhook.construct_event', return_value=event):
+            return self.client.post(reverse('stripe-webhook'), data=b'{}', content_type='application/json',
+                                    HTTP_STRIPE_SIGNATURE='t=1,v1=sig')
+
+    def test_completed_session_confirms_booking_once(self):
+        resp = self._deliver(self._event())
+        self.assertEqual(resp.status_code, 200)
+        self.booking.refresh_from_db()
+        self.payment.refresh_from_db()
+        self.assertEqual(self.booking.status, 'CONFIRMED')
+        self.assertEqual(self.payment.status, 'SUCCESS')
+        self.assertEqual(self.payment.transaction_id, 'pi_123')
+        self.assertEqual(EmailOutbox.objects.count(), 1)
+        self.assertTrue(StripeEvent.objects.filter(pk='evt_1').exists())
+
+    def test_redelivery_is_acknowledged_without_side_effects(self):
+        self._deliver(self._event())
+        with self.assertNumQueries(3):  # savepoint, event lookup, release
+            resp = self._deliver(self._event())
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(EmailOutbox.objects.count(), 1)
+
+    def test_new_event_for_paid_booking_does_not_resend_email(self):
+        self._deliver(self._event('evt_1'))
+        self._deliver(self._event('evt_2'))
+        self.assertEqual(EmailOutbox.objects.count(), 1)
+
+    def test_cancelled_booking_is_not_revived(self):
+        Booking.objects.filter(pk=self.booking.pk).update(status='CANCELLED')
+        self._deliver(self._event())
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, 'CANCELLED')
+        self.assertEqual(EmailOutbox.objects.count(), 0)
+
+    def test_payment_for_a_booking_cancelled_meanwhile_is_refunded(self):
+        self.payment.stripe_session_id = 'cs_1'
+        self.payment.save()
+        self.client.force_authenticate(self.user)
+        with mock.patch('rentals.stripe_utils.stripe.checkout.Session.expire') as expire, \
+                self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.post(f'/api/bookings/{self.booking.pk}/cancel/').status_code, 200)
+        expire.assert_called_once_with('cs_1')
+        self.assertEqual(Payment.objects.get(pk=self.payment.pk).status, 'FAILED')
+        self.client.force_authenticate(None)
+
+        # the customer paid before the session closed
+        with mock.patch('rentals.stripe_utils.stripe.Refund.create', return_value=mock.Mock(id='re_1')) as refund, \
+                self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self._deliver(self._event()).status_code, 200)
+        refund.assert_called_once_with(payment_intent='pi_123', idempotency_key='refund-pi_123')
+        self.booking.refresh_from_db()
+        self.payment.refresh_from_db()
+        self.assertEqual(self.booking.status, 'CANCELLED')
+        self.assertEqual((self.payment.status, self.payment.refund_id, self.payment.refund_amount),
+                         ('REFUNDED', 're_1', Decimal('200.00')))
+        self.assertFalse(EmailOutbox.objects.filter(subject__icontains='confirm').exists())
+
+    def test_later_event_for_a_refunded_payment_is_ignored(self):
+        self.client.force_authenticate(self.user)
+        self.client.post(f'/api/bookings/{self.booking.pk}/cancel/')
+        self.client.force_authenticate(None)
+        with mock.patch('rentals.stripe_utils.stripe.Refund.create', return_value=mock.Mock(id='re_1')), \
+                self.captureOnCommitCallbacks(execute=True):
+            self._deliver(self._event())
+
+        with mock.patch('rentals.stripe_utils.stripe.Refund.create') as refund, \
+                self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self._deliver(self._event(event_id='evt_2')).status_code, 200)
+        refund.assert_not_called()
+        self.assertEqual(Payment.objects.get(pk=self.payment.pk).status, 'REFUNDED')
+
+    def test_failed_refund_stays_flagged_for_retry(self):
+        self.client.force_authenticate(self.user)
+        self.client.post(f'/api/bookings/{self.booking.pk}/cancel/')
+        self.client.force_authenticate(None)
+
+        with mock.patch('rentals.stripe_utils.stripe.Refund.create', side_effect=stripe.APIConnectionError('down')), \
+                self.captureOnCommitCallbacks(execute=True):
+            self._deliver(self._event())
+        self.assertEqual(Payment.objects.get(pk=self.payment.pk).status, 'REFUND_DUE')
+
+        out = io.StringIO()
+        with mock.patch('rentals.stripe_utils.stripe.Refund.create', return_value=mock.Mock(id='re_1')):
+            call_command('refund_due_payments', stdout=out)
+        self.assertIn('Refunded 1 of 1', out.getvalue())
+        self.assertEqual(Payment.objects.get(pk=self.payment.pk).status, 'REFUNDED')
+
+    def test_bad_signature(self):
+        with mock.patch('rentals.views.stripe.Webhook.construct_event', side_effect=ValueError('bad sig')):
+            resp = self.client.post(reverse('stripe-webhook'), data=b'{}', content_type='application/json')
+        self.assertEqual(resp.status_code, 400)
+        self.assertFalse(StripeEvent.objects.exists())
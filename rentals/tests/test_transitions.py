@@ -0,0 +1,123 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ..models import Booking, Payment, Vehicle
+from ..transitions import InvalidTransition, advance_bookings, transition
+from ..vehicle_calendar import busy_intervals
+
+User = get_user_model()
+
+
+class TransitionTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='u1', password='pass', email='u1@example.com')
+        self.vehicle = Vehicle.objects.create(vehicle_type='bike', brand='RE', model_name='Bullet',
+                                              price_per_hour=100, price_per_day=800)
+        self.now = timezone.now()
+
+    def _booking(self, status, start_hours, hours=2):
+        start = self.now + timezone.timedelta(hours=start_hours)
+        booking = Booking.objects.create(user=self.user, vehicle=self.vehicle, start_time=start,
+                                         end_time=start + timezone.timedelta(hours=hours),
+                                         total_price=Decimal('200.00'), status=status)
+        Payment.objects.create(booking=booking, amount=booking.total_price,
+                               status='SUCCESS' if status != 'PENDING' else 'PENDING')
+        return booking
+
+
+class TransitionTests(TransitionTestCase):
+    def test_allowed_and_refused(self):
+        booking = self._booking('PENDING', 24)
+        transition(booking, 'CONFIRMED')
+        self.assertEqual(Booking.objects.get(pk=booking.pk).status, 'CONFIRMED')
+        with self.assertRaises(InvalidTransition):
+            transition(booking, 'PENDING')
+
+    def test_stale_read_loses(self):
+        booking = self._booking('PENDING', 24)
+        stale = Booking.objects.get(pk=booking.pk)
+        transition(booking, 'CANCELLED')
+        with self.assertRaises(InvalidTransition):
+            transition(stale, 'CONFIRMED')
+        self.assertEqual(Booking.objects.get(pk=booking.pk).status, 'CANCELLED')
+
+    def test_cancel_frees_the_calendar(self):
+        booking = self._booking('CONFIRMED', 24)
+        window = (self.now, self.now + timezone.timedelta(days=3))
+        self.assertEqual(len(busy_intervals([self.vehicle.pk], *window)[self.vehicle.pk]), 1)
+        transition(booking, 'CANCELLED')
+        self.assertEqual(busy_intervals([self.vehicle.pk], *window)[self.vehicle.pk], [])
+
+
+class AdvanceBookingsTests(TransitionTestCase):
+    def test_moves_due_bookings_in_batches(self):
+        started = [self._booking('CONFIRMED', -1 - slot * 0.1, hours=3) for slot in range(3)]
+        ended = self._booking('ONGOING', -5)
+        missed = self._booking('CONFIRMED', -10)  # ended before any run started it
+        future = self._booking('CONFIRMED', 24)
+        pending = self._booking('PENDING', -1)
+        before = Booking.objects.get(pk=ended.pk).updated_at
+
+        with self.assertNumQueries(4 * 4):
+            # batches of: id select, savepoint, UPDATE, release; one each for the two
+            # completions, two for the three starts
+            self.assertEqual(advance_bookings(batch_size=2), (3, 2))
+
+        statuses = dict(Booking.objects.values_list('id', 'status'))
+        self.assertEqual([statuses[b.pk] for b in started], ['ONGOING'] * 3)
+        self.assertEqual((statuses[ended.pk], statuses[missed.pk]), ('COMPLETED', 'COMPLETED'))
+        self.assertEqual((statuses[future.pk], statuses[pending.pk]), ('CONFIRMED', 'PENDING'))
+        self.assertGreater(Booking.objects.get(pk=ended.pk).updated_at, before)
+
+        self.assertEqual(advance_bookings(now=self.now + timezone.timedelta(hours=3)), (0, 3))
+        self.assertEqual(advance_bookings(), (0, 0))
+
+    def test_command(self):
+        self._booking('CONFIRMED', -1)
+        out = StringIO()
+        call_command('advance_bookings', stdout=out)
+        self.assertIn('Started 1, completed 0', out.getvalue())
+
+
+class ViewTransitionTests(TransitionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_mock_pay_only_from_pending(self):
+        booking = self._booking('PENDING', 24)
+        resp = self.client.post(f'/api/payments/mock/{booking.pk}/', {'simulate': 'success'}, format='json')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(Booking.objects.get(pk=booking.pk).status, 'CONFIRMED')
+
+        cancelled = self._booking('CANCELLED', 48)
+        resp = self.client.post(f'/api/payments/mock/{cancelled.pk}/', {'simulate': 'success'}, format='json')
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(Booking.objects.get(pk=cancelled.pk).status, 'CANCELLED')
+
+    def test_mock_pay_failure_cancels(self):
+        booking = self._booking('PENDING', 24)
+        resp = self.client.post(f'/api/payments/mock/{booking.pk}/', {'simulate': 'fail'}, format='json')
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(Booking.objects.get(pk=booking.pk).status, 'CANCELLED')
+        self.assertEqual(Payment.objects.get(booking=booking).status, 'FAILED')
+
+    def test_cancel_refunds(self):
+        booking = self._booking('CONFIRMED', 48)
+        resp = self.client.post(f'/api/bookings/{booking.pk}/cancel/')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data['refund'], {'refunded': 200.0, 'penalty': 0})
+        self.assertEqual(Booking.objects.get(pk=booking.pk).status, 'CANCELLED')
+        self.assertEqual(Payment.objects.get(booking=booking).status, 'REFUNDED')
+
+        ongoing = self._booking('ONGOING', -1)
+        self.assertEqual(self.client.post(f'/api/bookings/{ongoing.pk}/cancel/').status_code, 400)
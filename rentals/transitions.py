@@ -0,0 +1,107 @@
+# rentals/transitions.py
+"""
+Booking status changes, all in one place:
+
+    PENDING ──pay──▶ CONFIRMED ──start──▶ ONGOING ──end──▶ COMPLETED
+       │                │  └──────────── end (advanced late) ────────▲
+       └──── cancel / expire ──▶ CANCELLED ◀── cancel
+
+Every change is a conditional UPDATE (`WHERE status = <from>`), so two
+writers racing on one booking cannot both win. The UPDATE also sets
+updated_at for the incremental rollup. Queryset updates skip post_save,
+so vehicle calendars are invalidated here whenever a booking enters or
+leaves Booking.ACTIVE_STATUSES.
+"""
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Booking
+from .vehicle_calendar import invalidate_vehicle_calendars
+
+TRANSITIONS = {
+    'PENDING': ('CONFIRMED', 'CANCELLED'),
+    'CONFIRMED': ('ONGOING', 'COMPLETED', 'CANCELLED'),
+    'ONGOING': ('COMPLETED',),
+    'COMPLETED': (),
+    'CANCELLED': (),
+}
+
+
+class InvalidTransition(Exception):
+    pass
+
+
+def can_transition(source, target):
+    return target in TRANSITIONS.get(source, ())
+
+
+def check_transition(source, target):
+    if not can_transition(source, target):
+        raise InvalidTransition(f"A {source} booking cannot become {target}.")
+
+
+def _changes_calendar(source, target):
+    return (source in Booking.ACTIVE_STATUSES) != (target in Booking.ACTIVE_STATUSES)
+
+
+def transition(booking, target, now=None):
+    """
+    Move `booking` from the status it was read with to `target`. Raises
+    InvalidTransition if the move is not allowed or the row has changed
+    status since it was read.
+    """
+    source = booking.status
+    check_transition(source, target)
+    changed_at = now or timezone.now()
+    if not Booking.objects.filter(pk=booking.pk, status=source).update(status=target, updated_at=changed_at):
+        raise InvalidTransition(f"Booking {booking.pk} is no longer {source}.")
+    booking.status, booking.updated_at = target, changed_at
+    if _changes_calendar(source, target):
+        invalidate_vehicle_calendars([booking.vehicle_id])
+    return booking
+
+
+def bulk_transition(rows, source, target, now=None):
+    """
+    Move the bookings in `rows`, (id, vehicle_id) pairs, that are still in
+    `source` to `target` with one UPDATE. Returns the number moved.
+    """
+    check_transition(source, target)
+    moved = Booking.objects.filter(pk__in=[booking_id for booking_id, _ in rows], status=source).update(
+        status=target, updated_at=now or timezone.now()
+    )
+    if moved and _changes_calendar(source, target):
+        invalidate_vehicle_calendars({vehicle_id for _, vehicle_id in rows})
+    return moved
+
+
+def _advance(due, source, target, batch_size):
+    moved = 0
+    while True:
+        # read through the (status, start_time) index, oldest first
+        rows = list(
+            Booking.objects.filter(due, status=source)
+            .order_by('start_time').values_list('id', 'vehicle_id')[:batch_size]
+        )
+        if not rows:
+            break
+        with transaction.atomic():
+            moved += bulk_transition(rows, source, target)
+        if len(rows) < batch_size:
+            break
+    return moved
+
+
+def advance_bookings(now=None, batch_size=1000):
+    """
+    Start CONFIRMED bookings whose window has begun and complete those whose
+    window has ended, in batches of `batch_size`. A CONFIRMED booking that
+    ended before it was ever started goes straight to COMPLETED. Returns
+    (started, completed).
+    """
+    now = now or timezone.now()
+    completed = _advance(Q(end_time__lte=now), 'ONGOING', 'COMPLETED', batch_size)
+    completed += _advance(Q(start_time__lte=now, end_time__lte=now), 'CONFIRMED', 'COMPLETED', batch_size)
+    started = _advance(Q(start_time__lte=now, end_time__gt=now), 'CONFIRMED', 'ONGOING', batch_size)
+    return started, completed
@@ -0,0 +1,128 @@
+# rentals/upload_handlers.py
+"""
+Streaming handler for driving-license uploads.
+
+Django's default handlers accept the whole file (in memory below 2.5MB, on
+disk above) before the serializer can look at its size or type. This handler
+checks both while the upload streams: it sniffs the type from the first
+bytes, hashes each chunk as it arrives, writes it straight to a temporary
+file, and stops reading the request as soon as the file passes the limit.
+"""
+import hashlib
+
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopFutureHandlers, StopUpload
+from rest_framework.exceptions import ValidationError
+
+LICENSE_FIELD = 'license_doc'
+LICENSE_MAX_SIZE = 5 * 1024 * 1024  # 5MB
+# leading bytes -> content type; the client's Content-Type header is not trusted
+LICENSE_SIGNATURES = (
+    (b'%PDF-', 'application/pdf'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+)
+SNIFF_BYTES = max(len(signature) for signature, _ in LICENSE_SIGNATURES)
+
+
+def sniff_content_type(header):
+    """Content type whose signature `header` starts with, or None."""
+    for signature, content_type in LICENSE_SIGNATURES:
+        if header.startswith(signature):
+            return content_type
+    return None
+
+
+def file_sha256(file):
+    """Hex SHA-256 of an uploaded file: precomputed by the handler, else read in chunks."""
+    digest = getattr(file, 'sha256', None)
+    if digest:
+        return digest
+    sha = hashlib.sha256()
+    for chunk in file.chunks():
+        sha.update(chunk)
+    file.seek(0)
+    return sha.hexdigest()
+
+
+class LicenseUploadHandler(FileUploadHandler):
+    """
+    Takes over the license_doc part of a multipart body; other files fall
+    through to the default handlers. A rejected upload is recorded in
+    request.upload_errors rather than raised, see StreamingLicenseUploadMixin.
+    """
+    chunk_size = 64 * 1024
+
+    def __init__(self, request=None, max_size=LICENSE_MAX_SIZE):
+        super().__init__(request)
+        self.max_size = max_size
+        # not `file`: the multipart parser closes any handler.file itself, assuming it is set
+        self.upload = None
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        if field_name != LICENSE_FIELD:
+            return
+        if self.content_length is not None and self.content_length > self.max_size:
+            self._reject(f"File too big. Max size allowed is {self.max_size // (1024 * 1024)}MB.")
+        self.upload = TemporaryUploadedFile(self.file_name, self.content_type, 0, self.charset, self.content_type_extra)
+        self.sha = hashlib.sha256()
+        self.header = b''
+        self.size = 0
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.upload is None or self.field_name != LICENSE_FIELD:
+            return raw_data
+        self.size += len(raw_data)
+        if self.size > self.max_size:
+            self._reject(f"File too big. Max size allowed is {self.max_size // (1024 * 1024)}MB.")
+        if len(self.header) < SNIFF_BYTES:
+            self.header += raw_data[:SNIFF_BYTES - len(self.header)]
+            if len(self.header) == SNIFF_BYTES and sniff_content_type(self.header) is None:
+                self._reject("Unsupported file type. Allowed types: PDF, JPG, PNG.")
+        self.sha.update(raw_data)
+        self.upload.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if self.upload is None or self.field_name != LICENSE_FIELD:
+            return None
+        detected = sniff_content_type(self.header)
+        if detected is None:  # shorter than every signature
+            self._reject("Unsupported file type. Allowed types: PDF, JPG, PNG.")
+        file, self.upload = self.upload, None
+        file.seek(0)
+        file.size = file_size
+        file.content_type = detected
+        file.sha256 = self.sha.hexdigest()
+        return file
+
+    def upload_interrupted(self):
+        self._discard()
+
+    def _discard(self):
+        if self.upload is not None:
+            self.upload.close()  # deletes the temporary file
+            self.upload = None
+
+    def _reject(self, message):
+        self._discard()
+        if self.request is not None:
+            self.request.upload_errors = {LICENSE_FIELD: [message]}
+        # connection_reset: leave the rest of the body unread
+        raise StopUpload(connection_reset=True)
+
+
+class StreamingLicenseUploadMixin:
+    """For DRF views accepting license_doc: install the handler and turn its rejections into a 400."""
+
+    def initial(self, request, *args, **kwargs):
+        # must run before anything reads the body (authentication may, for the CSRF check)
+        request._request.upload_handlers.insert(0, LicenseUploadHandler(request._request))
+        super().initial(request, *args, **kwargs)
+        if request.method in ('POST', 'PUT', 'PATCH'):
+            request.data  # parse now, so a rejected upload fails before the view runs
+            errors = getattr(request._request, 'upload_errors', None)
+            if errors:
+                raise ValidationError(errors)
@@ -1,11 +1,15 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework import routers
 from .views import (
     VehicleViewSet, BookingViewSet, RegisterView, ProfileView,
-    mock_pay, AdminBookingListView,
-    create_checkout_session, stripe_webhook
+    mock_pay, quotes, AdminBookingListView, vehicle_analytics, vehicle_type_analytics, daily_analytics,
+    export_bookings, metrics
 )
-from . import frontend_views
+from . import async_views, frontend_views, views
+
+# the Stripe-facing endpoints block on network I/O; serve the async versions under ASGI
+payment_views = async_views if settings.SERVER_MODE == 'asgi' else views
 
 router = routers.DefaultRouter()
 router.register(r'vehicles', VehicleViewSet, basename='vehicles')
@@ -18,10 +22,16 @@ urlpatterns = [
     path('api/', include(router.urls)),
     path('api/auth/register/', RegisterView.as_view(), name='register'),
     path('api/auth/profile/', ProfileView.as_view(), name='profile'),
+    path('api/quotes/', quotes, name='quotes'),
     path('api/payments/mock/<int:pk>/', mock_pay, name='mock-pay'),
     path('api/admin/bookings/', AdminBookingListView.as_view(), name='admin-bookings'),
-    path('api/payments/create-checkout-session/<int:booking_id>/', create_checkout_session, name='create-checkout-session'),
-    path('api/payments/webhook/', stripe_webhook, name='stripe-webhook'),
+    path('api/admin/analytics/vehicles/', vehicle_analytics, name='admin-analytics-vehicles'),
+    path('api/admin/analytics/types/', vehicle_type_analytics, name='admin-analytics-types'),
+    path('api/admin/analytics/daily/', daily_analytics, name='admin-analytics-daily'),
+    path('api/admin/export/bookings.<str:export_format>', export_bookings, name='admin-export-bookings'),
+    path('api/payments/create-checkout-session/<int:booking_id>/', payment_views.create_checkout_session, name='create-checkout-session'),
+    path('api/payments/webhook/', payment_views.stripe_webhook, name='stripe-webhook'),
+    path('metrics', metrics, name='metrics'),
 
     # ====================
     # FRONTEND ROUTES
@@ -0,0 +1,138 @@
+# rentals/vehicle_calendar.py
+"""
+Busy intervals per vehicle, as merged [start, end) pairs of unix seconds.
+
+Each (vehicle, local day) is cached separately, so overlapping calendar windows
+share entries and a miss costs one range query (on booking_vehicle_window_idx)
+for all the missing vehicle-days at once. Entries are keyed under a
+per-vehicle generation that booking changes bump, as catalog_cache does for
+the whole catalog.
+"""
+import time
+from datetime import datetime, timedelta
+from datetime import time as dtime
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Booking
+
+
+def _cache():
+    return caches[settings.CALENDAR_CACHE_ALIAS]
+
+
+def _generation_key(vehicle_id):
+    return f'calendar:generation:{vehicle_id}'
+
+
+def _generations(vehicle_ids):
+    cache = _cache()
+    keys = {vehicle_id: _generation_key(vehicle_id) for vehicle_id in vehicle_ids}
+    found = cache.get_many(keys.values())
+    generations = {}
+    for vehicle_id, key in keys.items():
+        if key not in found:
+            # start from the clock so a lost counter never reuses an old generation
+            cache.add(key, int(time.time() * 1000), timeout=None)
+            found[key] = cache.get(key)
+        generations[vehicle_id] = found[key]
+    return generations
+
+
+def _bump(vehicle_ids):
+    cache = _cache()
+    for vehicle_id in vehicle_ids:
+        try:
+            cache.incr(_generation_key(vehicle_id))
+        except ValueError:
+            pass  # no generation yet: the next read starts a fresh one
+
+
+def invalidate_vehicle_calendars(vehicle_ids):
+    """Drop cached calendars of these vehicles, now and again once the transaction commits."""
+    vehicle_ids = {vehicle_id for vehicle_id in vehicle_ids if vehicle_id is not None}
+    if not vehicle_ids:
+        return
+    _bump(vehicle_ids)
+    # a read that raced the transaction may have cached the pre-commit bookings
+    transaction.on_commit(lambda: _bump(vehicle_ids))
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, dtime.min))
+
+
+def _days(start, end):
+    day, last = timezone.localdate(start), timezone.localdate(end - timedelta(microseconds=1))
+    while day <= last:
+        yield day
+        day += timedelta(days=1)
+
+
+def merge_intervals(intervals):
+    """Coalesce overlapping or touching [start, end) pairs; input need not be sorted."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def _load_days(missing):
+    """Busy intervals for {vehicle_id: [days]} that are not cached, in one query."""
+    all_days = [day for days in missing.values() for day in days]
+    span_start = _day_start(min(all_days))
+    span_end = _day_start(max(all_days) + timedelta(days=1))
+    wanted = {(vehicle_id, day): [] for vehicle_id, days in missing.items() for day in days}
+
+    rows = Booking.objects.filter(
+        vehicle_id__in=missing,
+        status__in=Booking.ACTIVE_STATUSES,
+        start_time__lt=span_end,
+        end_time__gt=span_start,
+    ).values_list('vehicle_id', 'start_time', 'end_time')
+    for vehicle_id, start, end in rows:
+        for day in _days(max(start, span_start), min(end, span_end)):
+            intervals = wanted.get((vehicle_id, day))
+            if intervals is not None:
+                day_start, day_end = _day_start(day), _day_start(day + timedelta(days=1))
+                intervals.append((int(max(start, day_start).timestamp()), int(min(end, day_end).timestamp())))
+    return {key: merge_intervals(intervals) for key, intervals in wanted.items()}
+
+
+def busy_intervals(vehicle_ids, start, end):
+    """{vehicle_id: [[start, end], ...]} of merged busy time within [start, end), in unix seconds."""
+    days = list(_days(start, end))
+    generations = _generations(vehicle_ids)
+    keys = {
+        (vehicle_id, day): f'calendar:{vehicle_id}:{generations[vehicle_id]}:{day.isoformat()}'
+        for vehicle_id in vehicle_ids for day in days
+    }
+    cache = _cache()
+    cached = cache.get_many(keys.values())
+
+    missing = {}
+    for (vehicle_id, day), key in keys.items():
+        if key not in cached:
+            missing.setdefault(vehicle_id, []).append(day)
+    entries = {key: cached[key] for key in keys.values() if key in cached}
+    if missing:
+        loaded = _load_days(missing)
+        fresh = {keys[vehicle_day]: intervals for vehicle_day, intervals in loaded.items()}
+        cache.set_many(fresh, settings.CALENDAR_CACHE_TIMEOUT)
+        entries.update(fresh)
+
+    lo, hi = int(start.timestamp()), int(end.timestamp())
+    result = {}
+    for vehicle_id in vehicle_ids:
+        # day entries are split at midnight; merging joins bookings that run across it
+        intervals = merge_intervals(
+            (s, e) for day in days for s, e in entries[keys[(vehicle_id, day)]]
+        )
+        result[vehicle_id] = [[max(s, lo), min(e, hi)] for s, e in intervals if s < hi and e > lo]
+    return result
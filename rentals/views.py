@@ -1,57 +1,202 @@
-from rest_framework import viewsets, generics, status, permissions
+from rest_framework import viewsets, generics, serializers, status, permissions
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import empty
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.parsers import MultiPartParser, FormParser
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.views.decorators.csrf import csrf_exempt
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, Http404, StreamingHttpResponse
 
-import math
+import hmac
+import logging
 import stripe
 import time
+from datetime import date
+from decimal import Decimal, InvalidOperation
 
-from .models import Vehicle, Booking, Payment
+from .models import Vehicle, Booking, Payment, RollupWatermark
 from .serializers import (
     VehicleSerializer, BookingSerializer,
-    UserRegisterSerializer, UserSerializer
+    UserRegisterSerializer, UserSerializer,
+    BulkBookingSerializer, BulkBookingItemSerializer,
+    QuoteRequestSerializer, QuoteWindowSerializer,
 )
-from .email_utils import (
-    send_booking_confirmation_email,
-    send_booking_cancelled_email,
+from . import analytics, exports
+from .catalog_cache import cached_catalog_response
+from .vehicle_calendar import busy_intervals, invalidate_vehicle_calendars
+from .metrics import render_prometheus
+from .pricing import quote
+from .streaming import stream_for
+from .upload_handlers import StreamingLicenseUploadMixin
+from .booking_utils import calculate_total_price, has_overlap, is_overlap_violation, uses_overlap_constraint
+from .email_utils import queue_booking_cancelled_email
+from .transitions import InvalidTransition, can_transition, transition
+from .stripe_utils import (
+    STRIPE_PUBLISHABLE_KEY, STRIPE_WEBHOOK_SECRET, create_booking_checkout_session, expire_checkout_session,
+    handle_stripe_event,
 )
-from .stripe_utils import STRIPE_PUBLISHABLE_KEY, DOMAIN, STRIPE_WEBHOOK_SECRET
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
+
+# share of the payment kept when a booking is cancelled within 24h of its start
+LATE_CANCEL_PENALTY_RATE = Decimal('0.20')
+# largest value Vehicle.price_per_hour (8 digits, 2 decimal places) can hold
+MAX_PRICE_FILTER = Decimal('999999.99')
 
 
 # -------------------------
 # Vehicle list / detail
 # -------------------------
 class VehicleViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Vehicle.objects.filter(is_active=True).order_by('-created_at')
+    queryset = Vehicle.objects.filter(is_active=True).prefetch_related('images').order_by('-created_at', '-id')
     serializer_class = VehicleSerializer
     permission_classes = [AllowAny]
 
+    # list/detail are cached per query string and carry an ETag; see catalog_cache
+    def list(self, request, *args, **kwargs):
+        return cached_catalog_response(request, lambda: super(VehicleViewSet, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return cached_catalog_response(request, lambda: super(VehicleViewSet, self).retrieve(request, *args, **kwargs))
+
+    @action(detail=False, methods=['GET'])
+    def available(self, request):
+        """
+        Vehicles free for the whole [start, end) window, in a single query.
+        Optional filters: vehicle_type, max_price (per hour).
+        """
+        start = _parse_query_datetime(request.query_params.get('start'))
+        end = _parse_query_datetime(request.query_params.get('end'))
+        if not start or not end:
+            return Response({"detail": "start and end are required ISO 8601 datetimes."}, status=status.HTTP_400_BAD_REQUEST)
+        if end <= start:
+            return Response({"detail": "end must be after start."}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = self.get_queryset()
+
+        vehicle_type = request.query_params.get('vehicle_type')
+        if vehicle_type:
+            if vehicle_type not in dict(Vehicle.TYPE_CHOICES):
+                return Response({"detail": "Unknown vehicle_type."}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = queryset.filter(vehicle_type=vehicle_type)
+
+        max_price = request.query_params.get('max_price')
+        if max_price:
+            try:
+                max_price = Decimal(max_price)
+            except InvalidOperation:
+                max_price = None
+            # NaN/Infinity would fail or mislead in SQL
+            if max_price is None or not max_price.is_finite():
+                return Response({"detail": "max_price must be a finite number."}, status=status.HTTP_400_BAD_REQUEST)
+            # a bound past the column's precision means "no limit"; clamp it so SQL never sees it
+            max_price = max(min(max_price, MAX_PRICE_FILTER), -MAX_PRICE_FILTER)
+            queryset = queryset.filter(price_per_hour__lte=max_price)
+
+        # anti-join: drop vehicles with any live booking overlapping the window
+        busy = Booking.objects.filter(
+            vehicle=OuterRef('pk'),
+            status__in=Booking.ACTIVE_STATUSES,
+            start_time__lt=end,
+            end_time__gt=start,
+        )
+        queryset = queryset.filter(~Exists(busy))
+
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['GET'])
+    def calendar(self, request, pk=None):
+        """Merged busy intervals of one vehicle in [from, to), as [start, end] unix seconds."""
+        start, end, error = _calendar_range(request)
+        if error:
+            return error
+        # an existence check only; get_object() would also prefetch the images
+        vehicle_id = pk.isdigit() and self.get_queryset().filter(pk=pk).values_list('pk', flat=True).first()
+        if not vehicle_id:
+            raise Http404
+        return Response({"vehicle": vehicle_id, "from": start, "to": end,
+                         "busy": busy_intervals([vehicle_id], start, end)[vehicle_id]})
+
+    @action(detail=False, methods=['GET'], url_path='calendar')
+    def calendars(self, request):
+        """Busy intervals for ?ids=1,2,3 in one call; unknown or inactive ids are left out."""
+        start, end, error = _calendar_range(request)
+        if error:
+            return error
+        raw_ids = [i for i in request.query_params.get('ids', '').split(',') if i]
+        if not raw_ids or not all(i.isdigit() for i in raw_ids):
+            return Response({"detail": "ids must be a comma-separated list of vehicle ids."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(raw_ids) > CALENDAR_MAX_VEHICLES:
+            return Response({"detail": f"At most {CALENDAR_MAX_VEHICLES} ids per request."}, status=status.HTTP_400_BAD_REQUEST)
+
+        vehicle_ids = sorted(self.get_queryset().filter(pk__in={int(i) for i in raw_ids}).values_list('pk', flat=True))
+        busy = busy_intervals(vehicle_ids, start, end) if vehicle_ids else {}
+        return Response({"from": start, "to": end,
+                         "results": [{"vehicle": vehicle_id, "busy": busy[vehicle_id]} for vehicle_id in vehicle_ids]})
+
+
+CALENDAR_DEFAULT_DAYS = 14
+CALENDAR_MAX_DAYS = 92
+CALENDAR_MAX_VEHICLES = 100
+
+
+def _calendar_range(request):
+    """(start, end, error response) from ?from=&to=, defaulting to the next two weeks."""
+    bounds = {}
+    for param in ('from', 'to'):
+        raw = request.query_params.get(param)
+        bounds[param] = _parse_query_datetime(raw)
+        if raw and bounds[param] is None:
+            return None, None, Response({"detail": f"{param} must be an ISO 8601 datetime."}, status=status.HTTP_400_BAD_REQUEST)
+    start = bounds['from'] or timezone.now().replace(microsecond=0)
+    end = bounds['to'] or start + timezone.timedelta(days=CALENDAR_DEFAULT_DAYS)
+    if end <= start:
+        return None, None, Response({"detail": "to must be after from."}, status=status.HTTP_400_BAD_REQUEST)
+    if end - start > timezone.timedelta(days=CALENDAR_MAX_DAYS):
+        return None, None, Response({"detail": f"The range may span at most {CALENDAR_MAX_DAYS} days."}, status=status.HTTP_400_BAD_REQUEST)
+    return start, end, None
+
+
+def _parse_query_datetime(value):
+    """Parse an ISO 8601 query param; naive values are read in the current timezone."""
+    if not value:
+        return None
+    try:
+        dt = parse_datetime(value)
+    except ValueError:
+        return None
+    if dt is not None and timezone.is_naive(dt):
+        dt = timezone.make_aware(dt)
+    return dt
+
 
 # -------------------------
 # User registration & profile
 # -------------------------
-class RegisterView(generics.CreateAPIView):
+class RegisterView(StreamingLicenseUploadMixin, generics.CreateAPIView):
     serializer_class = UserRegisterSerializer
     permission_classes = [AllowAny]
 
 
-class ProfileView(generics.RetrieveUpdateAPIView):
+class ProfileView(StreamingLicenseUploadMixin, generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]  # allow file uploads
 
     def get_object(self):
-        return self.request.user
+        # request.user only carries the cached auth fields; serialize and update the full row
+        return User.objects.get(pk=self.request.user.pk)
 
 
 # -------------------------
@@ -63,9 +208,10 @@ class BookingViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
+        queryset = Booking.objects.select_related('vehicle')
         if user.is_staff:
-            return Booking.objects.all().order_by('-created_at')
-        return Booking.objects.filter(user=user).order_by('-created_at')
+            return queryset.order_by('-created_at', '-id')
+        return queryset.filter(user=user).order_by('-created_at', '-id')
 
     def perform_create(self, serializer):
         user = self.request.user
@@ -73,25 +219,119 @@ class BookingViewSet(viewsets.ModelViewSet):
         start = serializer.validated_data['start_time']
         end = serializer.validated_data['end_time']
 
-        hours = (end - start).total_seconds() / 3600.0
-        hours_ceil = math.ceil(hours)
-        total_price = vehicle.price_per_hour * hours_ceil
+        total_price = calculate_total_price(vehicle, start, end)
 
+        if uses_overlap_constraint():
+            # PostgreSQL: no pre-lock. A cheap unlocked check fails the common
+            # case fast; the exclusion constraint rejects any insert that races it.
+            if has_overlap(vehicle.pk, start, end):
+                raise ValidationError({"non_field_errors": ["Vehicle is not available for the selected time range."]})
+            try:
+                with transaction.atomic():
+                    booking = serializer.save(user=user, total_price=total_price, status='PENDING')
+                    Payment.objects.create(booking=booking, amount=total_price, status='PENDING')
+            except IntegrityError as e:
+                if not is_overlap_violation(e):
+                    raise
+                raise ValidationError({"non_field_errors": ["Vehicle is not available for the selected time range."]})
+            return
+
+        # portable fallback: serialize on the vehicle row, then check
         with transaction.atomic():
-            v = Vehicle.objects.select_for_update().get(pk=vehicle.pk)
-            overlapping_exists = Booking.objects.filter(
-                vehicle=v,
-                status__in=['PENDING', 'CONFIRMED', 'ONGOING'],
-                start_time__lt=end,
-                end_time__gt=start
-            ).exists()
-            if overlapping_exists:
-                from rest_framework.exceptions import ValidationError
+            Vehicle.objects.select_for_update().get(pk=vehicle.pk)
+            if has_overlap(vehicle.pk, start, end):
                 raise ValidationError({"non_field_errors": ["Vehicle is not available for the selected time range."]})
 
             booking = serializer.save(user=user, total_price=total_price, status='PENDING')
             Payment.objects.create(booking=booking, amount=total_price, status='PENDING')
 
+    @action(detail=False, methods=['POST'])
+    def bulk(self, request):
+        """
+        Book many vehicles in one request.
+        mode=atomic creates nothing unless every item can be booked;
+        mode=best_effort creates the available ones. Results are reported per item.
+        """
+        batch = BulkBookingSerializer(data=request.data)
+        batch.is_valid(raise_exception=True)
+        mode = batch.validated_data['mode']
+        raw_items = batch.validated_data['bookings']
+
+        results = [None] * len(raw_items)
+        items = {}
+        for index, raw in enumerate(raw_items):
+            item = BulkBookingItemSerializer(data=raw)
+            if item.is_valid():
+                items[index] = item.validated_data
+            else:
+                results[index] = {"index": index, "status": "error", "errors": item.errors}
+
+        vehicles = Vehicle.objects.filter(is_active=True).in_bulk({i['vehicle'] for i in items.values()})
+        for index, item in list(items.items()):
+            if item['vehicle'] not in vehicles:
+                results[index] = {"index": index, "status": "error",
+                                  "errors": {"vehicle": [f"Invalid pk \"{item['vehicle']}\" - object does not exist."]}}
+                del items[index]
+
+        unavailable = {"non_field_errors": ["Vehicle is not available for the selected time range."]}
+        try:
+            with transaction.atomic():
+                if items and not uses_overlap_constraint():
+                    # same fallback as perform_create; pk order keeps concurrent batches deadlock-free
+                    list(Vehicle.objects.select_for_update().filter(pk__in={i['vehicle'] for i in items.values()}).order_by('pk'))
+
+                # one range query for the whole batch, matched per item below
+                taken = {}
+                if items:
+                    existing = Booking.objects.filter(
+                        vehicle_id__in={i['vehicle'] for i in items.values()},
+                        status__in=Booking.ACTIVE_STATUSES,
+                        start_time__lt=max(i['end_time'] for i in items.values()),
+                        end_time__gt=min(i['start_time'] for i in items.values()),
+                    ).values_list('vehicle_id', 'start_time', 'end_time')
+                    for vehicle_id, start, end in existing:
+                        taken.setdefault(vehicle_id, []).append((start, end))
+
+                to_create = []
+                for index, item in items.items():
+                    windows = taken.setdefault(item['vehicle'], [])
+                    if any(start < item['end_time'] and end > item['start_time'] for start, end in windows):
+                        results[index] = {"index": index, "status": "error", "errors": unavailable}
+                        continue
+                    windows.append((item['start_time'], item['end_time']))  # later items in the batch see it too
+                    vehicle = vehicles[item['vehicle']]
+                    to_create.append((index, Booking(
+                        user=request.user, vehicle=vehicle,
+                        start_time=item['start_time'], end_time=item['end_time'],
+                        total_price=calculate_total_price(vehicle, item['start_time'], item['end_time']),
+                        status='PENDING',
+                    )))
+
+                failed = sum(1 for r in results if r is not None)
+                if mode == 'atomic' and failed:
+                    return Response({"mode": mode, "created": 0, "failed": failed,
+                                     "results": [r or {"index": i, "status": "skipped"} for i, r in enumerate(results)]},
+                                    status=status.HTTP_400_BAD_REQUEST)
+
+                bookings = Booking.objects.bulk_create([b for _, b in to_create])
+                Payment.objects.bulk_create([
+                    Payment(booking=b, amount=b.total_price, status='PENDING') for b in bookings
+                ])
+                invalidate_vehicle_calendars({b.vehicle_id for b in bookings})  # bulk_create sends no post_save
+        except IntegrityError as e:
+            if not is_overlap_violation(e):
+                raise
+            # a concurrent booking won one of these slots between our check and the insert
+            return Response({"detail": "A vehicle in this batch was booked concurrently; please retry."},
+                            status=status.HTTP_409_CONFLICT)
+
+        for (index, _), booking in zip(to_create, bookings):
+            results[index] = {"index": index, "status": "created",
+                              "booking": BookingSerializer(booking, context=self.get_serializer_context()).data}
+
+        return Response({"mode": mode, "created": len(bookings), "failed": failed, "results": results},
+                        status=status.HTTP_201_CREATED if bookings or not failed else status.HTTP_400_BAD_REQUEST)
+
     @action(detail=True, methods=['POST'])
     def cancel(self, request, pk=None):
         """
@@ -112,7 +352,7 @@ class BookingViewSet(viewsets.ModelViewSet):
         if booking.end_time < timezone.now():
             return Response({"detail": "Past bookings cannot be cancelled."}, status=status.HTTP_400_BAD_REQUEST)
 
-        if booking.status not in ['PENDING', 'CONFIRMED']:
+        if not can_transition(booking.status, 'CANCELLED'):
             return Response({"detail": "Only PENDING or CONFIRMED bookings can be cancelled."}, status=status.HTTP_400_BAD_REQUEST)
 
         # check late cancellation
@@ -124,30 +364,35 @@ class BookingViewSet(viewsets.ModelViewSet):
         refund_info = {"refunded": 0, "penalty": 0}
         payment = getattr(booking, "payment", None)
 
-        if payment and payment.status == "SUCCESS":
-            penalty = 0
-            refund_amount = float(payment.amount)
-            if late:
-                penalty = refund_amount * 0.20
-                refund_amount -= penalty
-
-            payment.status = "REFUNDED"
-            payment.refund_amount = refund_amount
-            payment.refund_id = f"MOCKREF-{payment.id}-{int(time.time())}"
-            payment.save()
-
-            refund_info = {"refunded": refund_amount, "penalty": penalty}
-
-        booking.status = "CANCELLED"
-        booking.save()
-
-        # 🔹 Debug log before sending email
-        print(f"📧 Attempting to send cancellation email to {booking.user.email}")
-        try:
-            send_booking_cancelled_email(booking, refund_info.get("refunded"))
-            print("✅ Cancel email sent successfully")
-        except Exception as e:
-            print(f"❌ Cancel email error: {e}")
+        with transaction.atomic():
+            try:
+                transition(booking, 'CANCELLED')
+            except InvalidTransition:  # paid, started or cancelled since it was read
+                return Response({"detail": "Booking status changed, please retry."}, status=status.HTTP_409_CONFLICT)
+
+            if payment and payment.status == "SUCCESS":
+                penalty = Decimal('0.00')
+                if late:
+                    penalty = (payment.amount * LATE_CANCEL_PENALTY_RATE).quantize(Decimal('0.01'))
+                refund_amount = payment.amount - penalty
+
+                payment.status = "REFUNDED"
+                payment.refund_amount = refund_amount
+                payment.penalty_amount = penalty
+                payment.refund_id = f"MOCKREF-{payment.id}-{int(time.time())}"
+                payment.save()
+
+                refund_info = {"refunded": float(refund_amount), "penalty": float(penalty)}
+            elif payment and payment.status == "PENDING":
+                # unpaid: close its checkout so it can no longer be paid. If the customer pays
+                # first anyway, the webhook finds the booking cancelled and refunds the payment
+                Payment.objects.filter(pk=payment.pk, status='PENDING').update(status='FAILED', updated_at=timezone.now())
+                if payment.stripe_session_id:
+                    session_id = payment.stripe_session_id
+                    transaction.on_commit(lambda: expire_checkout_session(session_id))
+
+            # delivered by `manage.py send_queued_emails`, not inline
+            queue_booking_cancelled_email(booking, refund_info.get("refunded"))
 
         return Response({
             "detail": "Booking cancelled.",
@@ -155,6 +400,57 @@ class BookingViewSet(viewsets.ModelViewSet):
             "refund": refund_info
         })
 
+# -------------------------
+# Price quotes
+# -------------------------
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def quotes(request):
+    """
+    Price many vehicle/time combinations in one call. Items are reported in
+    request order, each either quoted or with its validation errors.
+    """
+    batch = QuoteRequestSerializer(data=request.data)
+    batch.is_valid(raise_exception=True)
+
+    results = []
+    items = {}
+    windows = {}
+    vehicle_field = serializers.IntegerField()
+    for index, raw in enumerate(batch.validated_data['items']):
+        key = (str(raw.get('start_time')), str(raw.get('end_time')))
+        if key not in windows:
+            window = QuoteWindowSerializer(data=raw)
+            windows[key] = (window.validated_data, None) if window.is_valid() else (None, window.errors)
+        window, errors = windows[key]
+        errors = dict(errors or {})
+        try:
+            vehicle_id = vehicle_field.run_validation(raw.get('vehicle', empty))
+        except ValidationError as e:
+            errors['vehicle'] = e.detail
+        if errors:
+            results.append({"index": index, "status": "error", "errors": errors})
+        else:
+            items[index] = {'vehicle': vehicle_id, **window}
+            results.append(None)
+
+    vehicles = Vehicle.objects.filter(is_active=True).in_bulk({i['vehicle'] for i in items.values()})
+    for index, item in items.items():
+        vehicle = vehicles.get(item['vehicle'])
+        if vehicle is None:
+            results[index] = {"index": index, "status": "error",
+                              "errors": {"vehicle": [f"Invalid pk \"{item['vehicle']}\" - object does not exist."]}}
+            continue
+        priced = quote(vehicle, item['start_time'], item['end_time'])
+        # money as strings, like BookingSerializer.total_price
+        results[index] = {"index": index, "status": "quoted", "vehicle": vehicle.pk,
+                          "start_time": item['start_time'], "end_time": item['end_time'],
+                          "hours": priced['hours'], "plan": priced['plan'], "base": str(priced['base']),
+                          "adjustments": {name: str(amount) for name, amount in priced['adjustments'].items()},
+                          "total_price": str(priced['total_price'])}
+    return Response({"results": results})
+
+
 # -------------------------
 # Mock Payment (testing only)
 # -------------------------
@@ -172,18 +468,22 @@ def mock_pay(request, pk):
     except Payment.DoesNotExist:
         return Response({"detail": "Payment not found."}, status=404)
 
-    if simulate == 'success':
-        payment.status = 'SUCCESS'
-        payment.transaction_id = f"MOCKTXN-{payment.id}-{int(timezone.now().timestamp())}"
-        payment.save()
-        booking.status = 'CONFIRMED'
-        booking.save()
-        return Response({"detail": "Payment success, booking confirmed."})
-    else:
+    if booking.status != 'PENDING':
+        return Response({"detail": "Booking must be PENDING to pay."}, status=400)
+
+    with transaction.atomic():
+        try:
+            transition(booking, 'CONFIRMED' if simulate == 'success' else 'CANCELLED')
+        except InvalidTransition:  # expired or cancelled since it was read
+            return Response({"detail": "Booking must be PENDING to pay."}, status=400)
+
+        if simulate == 'success':
+            payment.status = 'SUCCESS'
+            payment.transaction_id = f"MOCKTXN-{payment.id}-{int(timezone.now().timestamp())}"
+            payment.save()
+            return Response({"detail": "Payment success, booking confirmed."})
         payment.status = 'FAILED'
         payment.save()
-        booking.status = 'CANCELLED'
-        booking.save()
         return Response({"detail": "Payment failed, booking cancelled."}, status=400)
 
 
@@ -202,29 +502,8 @@ def create_checkout_session(request, booking_id):
         return JsonResponse({"detail": "Booking must be PENDING to pay."}, status=400)
 
     payment = booking.payment
-    amount_in_paise = int(round(float(payment.amount) * 100))
-
-    success_url = f"{DOMAIN}/my-bookings/?payment=success"
-    cancel_url = f"{DOMAIN}/my-bookings/?payment=cancel"
-
     try:
-        session = stripe.checkout.Session.create(
-            payment_method_types=['card'],
-            line_items=[{
-                'price_data': {
-                    'currency': 'inr',
-                    'product_data': {
-                        'name': f'Booking #{booking.id} - {booking.vehicle}',
-                    },
-                    'unit_amount': amount_in_paise,
-                },
-                'quantity': 1,
-            }],
-            mode='payment',
-            success_url=success_url,
-            cancel_url=cancel_url,
-            metadata={'booking_id': str(booking.id), 'payment_id': str(payment.id)}
-        )
+        session = create_booking_checkout_session(booking, payment)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
@@ -244,41 +523,148 @@ def stripe_webhook(request):
     try:
         event = stripe.Webhook.construct_event(payload, sig_header, STRIPE_WEBHOOK_SECRET)
     except Exception as e:
-        print(f"Webhook error: {e}")
+        logger.warning("stripe_webhook.invalid", extra={"error": str(e)})
         return HttpResponse(status=400)
 
-    print(f"Stripe event received: {event['type']}")
+    logger.info("stripe_webhook.received", extra={"event_id": event['id'], "event_type": event['type']})
 
-    if event['type'] == 'checkout.session.completed':
-        session = event['data']['object']
-        booking_id = session.get('metadata', {}).get('booking_id')
-        payment_id = session.get('metadata', {}).get('payment_id')
-        print(f"Metadata booking_id={booking_id}, payment_id={payment_id}")
+    handle_stripe_event(event)
+    return HttpResponse(status=200)
 
-        try:
-            payment = Payment.objects.get(pk=payment_id)
-            booking = payment.booking
-            print(f"Payment and booking found: Payment ID {payment.id}, Booking ID {booking.id}")
+# -------------------------
+# Admin: list all bookings
+# -------------------------
+class AdminBookingListView(generics.ListAPIView):
+    serializer_class = BookingSerializer
+    permission_classes = [permissions.IsAdminUser]
+    queryset = Booking.objects.select_related('vehicle').order_by('-created_at', '-id')
 
-            payment.status = 'SUCCESS'
-            payment.transaction_id = session.get('payment_intent')
-            payment.save()
 
-            booking.status = 'CONFIRMED'
-            booking.save()
+# -------------------------
+# Admin: fleet analytics
+# -------------------------
+ANALYTICS_DEFAULT_DAYS = 30
+ANALYTICS_MAX_LIMIT = 1000
+
+
+def _analytics_range(request):
+    """(start, end, error response) from ?from=&to=, defaulting to the last 30 days."""
+    bounds = {}
+    for param in ('from', 'to'):
+        raw = request.query_params.get(param)
+        bounds[param] = _parse_query_datetime(raw)
+        if raw and bounds[param] is None:
+            return None, None, Response({"detail": f"{param} must be an ISO 8601 datetime."}, status=status.HTTP_400_BAD_REQUEST)
+    end = bounds['to'] or timezone.now()
+    start = bounds['from'] or end - timezone.timedelta(days=ANALYTICS_DEFAULT_DAYS)
+    if end <= start:
+        return None, None, Response({"detail": "to must be after from."}, status=status.HTTP_400_BAD_REQUEST)
+    return start, end, None
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def vehicle_analytics(request):
+    start, end, error = _analytics_range(request)
+    if error:
+        return error
+
+    vehicle_type = request.query_params.get('vehicle_type')
+    if vehicle_type and vehicle_type not in dict(Vehicle.TYPE_CHOICES):
+        return Response({"detail": "Unknown vehicle_type."}, status=status.HTTP_400_BAD_REQUEST)
+    order_by = request.query_params.get('order_by', '-revenue')
+    if order_by.lstrip('-') not in analytics.VEHICLE_ORDERINGS:
+        return Response({"detail": f"order_by must be one of {', '.join(analytics.VEHICLE_ORDERINGS)} (prefix - for descending)."},
+                        status=status.HTTP_400_BAD_REQUEST)
+    try:
+        limit = min(int(request.query_params.get('limit', 100)), ANALYTICS_MAX_LIMIT)
+    except ValueError:
+        return Response({"detail": "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({
+        "from": start, "to": end,
+        "results": analytics.vehicle_report(start, end, vehicle_type=vehicle_type, order_by=order_by, limit=max(limit, 1)),
+    })
 
-            send_booking_confirmation_email(booking)
-            print(f"Booking confirmed and email sent for booking ID {booking.id}")
 
-        except Payment.DoesNotExist:
-            print(f"Payment with ID {payment_id} does not exist")
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def vehicle_type_analytics(request):
+    start, end, error = _analytics_range(request)
+    if error:
+        return error
+    return Response({"from": start, "to": end, "results": analytics.type_report(start, end)})
+
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def daily_analytics(request):
+    """Per-day fleet totals from the BookingDailyStats rollup (see `manage.py rollup_stats`)."""
+    end_day = timezone.localdate()
+    start_day = end_day - timezone.timedelta(days=ANALYTICS_DEFAULT_DAYS)
+    try:
+        if request.query_params.get('from'):
+            start_day = date.fromisoformat(request.query_params['from'])
+        if request.query_params.get('to'):
+            end_day = date.fromisoformat(request.query_params['to'])
+    except ValueError:
+        return Response({"detail": "from and to must be YYYY-MM-DD dates."}, status=status.HTTP_400_BAD_REQUEST)
+    if end_day < start_day:
+        return Response({"detail": "to must not be before from."}, status=status.HTTP_400_BAD_REQUEST)
+
+    vehicle_type = request.query_params.get('vehicle_type')
+    if vehicle_type and vehicle_type not in dict(Vehicle.TYPE_CHOICES):
+        return Response({"detail": "Unknown vehicle_type."}, status=status.HTTP_400_BAD_REQUEST)
+    vehicle_id = request.query_params.get('vehicle')
+    if vehicle_id and not vehicle_id.isdigit():
+        return Response({"detail": "vehicle must be an id."}, status=status.HTTP_400_BAD_REQUEST)
+
+    watermark = RollupWatermark.objects.filter(name=analytics.ROLLUP_NAME).first()
+    return Response({
+        "from": start_day, "to": end_day,
+        "processed_until": watermark.processed_until if watermark else None,
+        "results": analytics.daily_report(start_day, end_day, vehicle_type=vehicle_type, vehicle_id=vehicle_id),
+    })
 
-    return HttpResponse(status=200)
 
 # -------------------------
-# Admin: list all bookings
+# Admin: streaming exports
 # -------------------------
-class AdminBookingListView(generics.ListAPIView):
-    serializer_class = BookingSerializer
-    permission_classes = [permissions.IsAdminUser]
-    queryset = Booking.objects.all().order_by('-created_at')
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def export_bookings(request, export_format):
+    """
+    Every booking with its user, vehicle and payment as CSV or NDJSON, streamed
+    in chunks. ?from=&to= (ISO 8601) restrict the booking creation time.
+    """
+    if export_format not in exports.EXPORT_FORMATS:
+        raise Http404
+    bounds = {}
+    for param in ('from', 'to'):
+        raw = request.query_params.get(param)
+        bounds[param] = _parse_query_datetime(raw)
+        if raw and bounds[param] is None:
+            return Response({"detail": f"{param} must be an ISO 8601 datetime."}, status=status.HTTP_400_BAD_REQUEST)
+
+    stream, content_type = exports.EXPORT_FORMATS[export_format]
+    response = StreamingHttpResponse(stream(exports.export_rows(bounds['from'], bounds['to'])), content_type=content_type)
+    stamp = timezone.localtime().strftime('%Y%m%d-%H%M')
+    response['Content-Disposition'] = f'attachment; filename="bookings-{stamp}.{export_format}"'
+    response['Cache-Control'] = 'no-store'
+    return stream_for(request, response)
+
+
+# -------------------------
+# Metrics (Prometheus scrape target)
+# -------------------------
+def metrics(request):
+    """Prometheus text exposition of the PerformanceMiddleware counters."""
+    token = settings.METRICS_TOKEN
+    if not token:
+        # without a token the endpoint is only open on a development server
+        if not settings.DEBUG:
+            return HttpResponse(status=403)
+    elif not hmac.compare_digest(request.headers.get('Authorization', '').encode(), f'Bearer {token}'.encode()):
+        return HttpResponse(status=401)
+    return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')